@@ -5,12 +5,20 @@ from shared_header import (
     ACCOUNTS, 
     INDUSTRIES, 
     ACCOUNT_INDUSTRY_MAP,
-    _safe_rerun
+    _safe_rerun,
+    fragment,
+    record_dimension_scores,
 )
 import os
 import pandas as pd
 from datetime import datetime
 import streamlit.components.v1 as components
+from api_client import init_auth_token
+from static_assets import inject_stylesheet
+from analysis_store import AGENT_SESSION_KEYS, store_session_outputs
+from feedback_store import get_feedback_store
+from pipeline import DIMENSION_SESSION_KEYS, run_pipeline, apply_pipeline_results
+from jobs import poll_running_jobs, render_job_progress, session_hedge_budget, submit_agent_job, take_finished_job
 
 # --- Page Config ---
 st.set_page_config(
@@ -59,21 +67,6 @@ if 'current_page' not in st.session_state:
 if 'admin_access_requested' not in st.session_state:
     st.session_state.admin_access_requested = False
 
-# Feedback file configuration
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-FEEDBACK_FILE = os.path.join(BASE_DIR, "feedback.csv")
-
-try:
-    if not os.path.exists(FEEDBACK_FILE):
-        df = pd.DataFrame(columns=["Timestamp", "employee_id", "Feedback", "FeedbackType",
-                          "OffDefinitions", "Suggestions", "Account", "Industry", "ProblemStatement", "Agent"])
-        df.to_csv(FEEDBACK_FILE, index=False)
-except (PermissionError, OSError) as e:
-    if 'feedback_data' not in st.session_state:
-        st.session_state.feedback_data = pd.DataFrame(
-            columns=["Timestamp", "employee_id", "Feedback", "FeedbackType", "OffDefinitions", 
-                    "Suggestions", "Account", "Industry", "ProblemStatement", "Agent"])
-
 # Admin panel URL parameter handling
 try:
     qparams = st.query_params
@@ -115,240 +108,8 @@ def render_login_page():
     )
 
     # 🔥 FIXED CSS - Removed fixed positioning, proper vertical flow
+    inject_stylesheet("login.css")
     st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700;800;900&display=swap');
-    
-    * {
-        font-family: 'Poppins', sans-serif !important;
-    }
-    
-    @keyframes gradientShift {
-        0% { background-position: 0% 50%; }
-        50% { background-position: 100% 50%; }
-        100% { background-position: 0% 50%; }
-    }
-    
-    /* Floating Particles */
-    .particles {
-        position: fixed;
-        top: 0;
-        left: 0;
-        width: 100%;
-        height: 100%;
-        overflow: hidden;
-        z-index: 0;
-        pointer-events: none;
-    }
-    
-    .particle {
-        position: absolute;
-        width: 4px;
-        height: 4px;
-        background: rgba(255, 107, 53, 0.6);
-        border-radius: 50%;
-        animation: float 20s infinite;
-    }
-    
-    @keyframes float {
-        0%, 100% { transform: translateY(0) translateX(0); opacity: 0; }
-        10% { opacity: 1; }
-        90% { opacity: 1; }
-        100% { transform: translateY(-100vh) translateX(50px); opacity: 0; }
-    }
-    
-    /* FIXED: Remove fixed positioning, use normal flow */
-    .block-container {
-        padding-top: 2rem !important;
-        max-width: 600px !important;
-        margin: 0 auto !important;
-    }
-    
-    /* Welcome Card - Normal document flow */
-    .welcome-card-static {
-        position: relative;
-        width: 100%;
-        background: rgba(255, 255, 255, 0.1);
-        backdrop-filter: blur(30px) saturate(180%);
-        border: 2px solid rgba(255, 255, 255, 0.2);
-        border-radius: 25px;
-        padding: 3.5rem 3rem;
-        box-shadow: 
-            0 25px 80px rgba(0, 0, 0, 0.4),
-            0 0 60px rgba(255, 107, 53, 0.3),
-            inset 0 1px 0 rgba(255, 255, 255, 0.3);
-        margin-bottom: 2.5rem;
-    }
-    
-    [data-theme="dark"] .welcome-card-static {
-        background: rgba(20, 20, 30, 0.3);
-        border: 2px solid rgba(255, 107, 53, 0.4);
-    }
-    
-    /* Static Border - NO ANIMATION */
-    .welcome-card-static::before {
-        content: '';
-        position: absolute;
-        inset: -2px;
-        border-radius: 25px;
-        background: linear-gradient(45deg, #ff6b35, #8b1e1e);
-        z-index: -1;
-        opacity: 0.6;
-        filter: blur(8px);
-    }
-    
-    /* Static Title */
-    .static-title {
-        font-size: 3.5rem;
-        font-weight: 900;
-        text-align: center;
-        color: ;
-        margin: 0 0 0.8rem 0;
-        letter-spacing: -1px;
-    }
-    
-    [data-theme="dark"] .static-title {
-        color: #ffffff;
-    }
-    
-    .static-subtitle {
-        text-align: center;
-        color: rgba(255, 255, 255, 0.85);
-        font-size: 1.3rem;
-        font-weight: 500;
-        margin: 0;
-    }
-    
-    [data-theme="dark"] .static-subtitle {
-        color: rgba(255, 255, 255, 0.8);
-    }
-    
-    /* Input Styling */
-    .stTextInput label {
-        color: rgba(255, 255, 255, 0.95) !important;
-        font-weight: 700 !important;
-        font-size: 0.85rem !important;
-        text-transform: uppercase;
-        letter-spacing: 1.5px;
-        margin-bottom: 0.4rem !important;
-    }
-    
-    [data-theme="dark"] .stTextInput label {
-        color: rgba(255, 255, 255, 0.9) !important;
-    }
-    
-    .stTextInput input {
-        background: rgba(255, 255, 255, 0.08) !important;
-        border: 2px solid rgba(255, 107, 53, 0.4) !important;
-        border-radius: 12px !important;
-        color: white !important;
-        font-size: 1rem !important;
-        font-weight: 600 !important;
-        padding: 0.65rem 1rem !important;
-        transition: all 0.3s ease !important;
-        box-shadow: inset 0 2px 8px rgba(0, 0, 0, 0.3);
-        height: 45px !important;
-    }
-    
-    [data-theme="dark"] .stTextInput input {
-        background: rgba(10, 10, 20, 0.4) !important;
-        border: 2px solid rgba(255, 107, 53, 0.5) !important;
-    }
-    
-    .stTextInput input:focus {
-        background: rgba(255, 255, 255, 0.15) !important;
-        border-color: #ff6b35 !important;
-        box-shadow: 
-            inset 0 2px 8px rgba(0, 0, 0, 0.3),
-            0 0 20px rgba(255, 107, 53, 0.5) !important;
-        transform: scale(1.01);
-    }
-    
-    .stTextInput input::placeholder {
-        color: rgba(255, 255, 255, 0.5) !important;
-    }
-    
-    /* Button Styling */
-    .stButton > button {
-        position: relative;
-        background: linear-gradient(135deg, #ff6b35 0%, #8b1e1e 100%) !important;
-        color: white !important;
-        border: none !important;
-        border-radius: 12px !important;
-        padding: 0.8rem 2rem !important;
-        width: 100% !important;
-        font-weight: 800 !important;
-        font-size: 1rem !important;
-        text-transform: uppercase;
-        letter-spacing: 2.5px;
-        overflow: hidden;
-        box-shadow: 
-            0 8px 30px rgba(255, 107, 53, 0.5),
-            inset 0 1px 0 rgba(255, 255, 255, 0.3);
-        transition: all 0.3s ease !important;
-        margin-top: 1rem !important;
-        height: 50px !important;
-    }
-    
-    [data-theme="dark"] .stButton > button {
-        background: linear-gradient(135deg, #ff6b35 0%, #8b1e1e 100%) !important;
-        box-shadow: 
-            0 8px 30px rgba(255, 107, 53, 0.6),
-            inset 0 1px 0 rgba(255, 255, 255, 0.3);
-    }
-    
-    .stButton > button::before {
-        content: '';
-        position: absolute;
-        top: 50%;
-        left: 50%;
-        width: 0;
-        height: 0;
-        border-radius: 50%;
-        background: rgba(255, 255, 255, 0.3);
-        transform: translate(-50%, -50%);
-        transition: width 0.6s, height 0.6s;
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-3px) scale(1.02) !important;
-        box-shadow: 
-            0 12px 40px rgba(255, 107, 53, 0.7),
-            0 0 40px rgba(255, 107, 53, 0.5) !important;
-    }
-    
-    .stButton > button:hover::before {
-        width: 300px;
-        height: 300px;
-    }
-    
-    .stButton > button:active {
-        transform: translateY(-1px) scale(0.99) !important;
-    }
-    
-    /* Hide Streamlit branding */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    
-    /* Error message styling */
-    .stAlert {
-        background: rgba(255, 50, 50, 0.2) !important;
-        backdrop-filter: blur(15px) !important;
-        border: 2px solid rgba(255, 50, 50, 0.5) !important;
-        border-radius: 12px !important;
-        color: white !important;
-        font-weight: 600 !important;
-        margin-top: 1rem !important;
-        padding: 0.8rem !important;
-    }
-    
-    /* Input container spacing */
-    .stTextInput {
-        margin-bottom: 0.8rem !important;
-    }
-    </style>
-    
     <!-- Particle System -->
     <div class="particles">
         <div class="particle" style="left: 10%; animation-delay: 0s;"></div>
@@ -402,409 +163,7 @@ def render_main_app():
         return
 
     # CSS for main app (keeping your existing styles)
-    st.markdown("""
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700;800;900&display=swap');
-        
-        * {
-            font-family: 'Poppins', sans-serif !important;
-        }
-        
-        /* Mesh Gradient Background */
-        .main {
-            background: 
-                radial-gradient(at 0% 0%, rgba(139, 30, 30, 0.15) 0px, transparent 50%),
-                radial-gradient(at 100% 0%, rgba(255, 107, 53, 0.1) 0px, transparent 50%),
-                radial-gradient(at 100% 100%, rgba(139, 30, 30, 0.1) 0px, transparent 50%),
-                radial-gradient(at 0% 100%, rgba(255, 107, 53, 0.15) 0px, transparent 50%);
-            animation: meshMove 20s ease-in-out infinite;
-        }
-        
-        @keyframes meshMove {
-            0%, 100% { background-position: 0% 0%, 100% 0%, 100% 100%, 0% 100%; }
-            50% { background-position: 100% 100%, 0% 100%, 0% 0%, 100% 0%; }
-        }
-        
-        [data-theme="dark"] .main {
-            background: 
-                radial-gradient(at 0% 0%, rgba(139, 30, 30, 0.25) 0px, transparent 50%),
-                radial-gradient(at 100% 0%, rgba(255, 107, 53, 0.2) 0px, transparent 50%),
-                radial-gradient(at 100% 100%, rgba(139, 30, 30, 0.2) 0px, transparent 50%),
-                radial-gradient(at 0% 100%, rgba(255, 107, 53, 0.25) 0px, transparent 50%),
-                #0a0a0f;
-        }
-        
-        /* Hero Banner */
-        .hero-banner {
-            background: rgba(255, 255, 255, 0.7);
-            backdrop-filter: blur(20px) saturate(180%);
-            border: 1px solid rgba(255, 255, 255, 0.3);
-            border-radius: 20px;
-            padding: 1.5rem 2rem;
-            margin: 1.5rem auto 2rem auto;
-            max-width: 1200px;
-            box-shadow: 
-                0 15px 40px rgba(139, 30, 30, 0.15),
-                inset 0 1px 0 rgba(255, 255, 255, 0.8);
-            position: relative;
-            overflow: hidden;
-            animation: bannerFloat 4s ease-in-out infinite;
-        }
-        
-        @keyframes bannerFloat {
-            0%, 100% { transform: translateY(0px); }
-            50% { transform: translateY(-5px); }
-        }
-        
-        .hero-banner::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.4), transparent);
-            animation: shine 3s infinite;
-        }
-        
-        @keyframes shine {
-            0% { left: -100%; }
-            100% { left: 100%; }
-        }
-        
-        [data-theme="dark"] .hero-banner {
-            background: rgba(20, 20, 30, 0.7);
-            border: 1px solid rgba(255, 107, 53, 0.3);
-            box-shadow: 
-                0 15px 40px rgba(0, 0, 0, 0.4),
-                0 0 30px rgba(255, 107, 53, 0.2),
-                inset 0 1px 0 rgba(255, 255, 255, 0.1);
-        }
-        
-        .hero-banner h2 {
-            text-align: center;
-            font-size: 2rem;
-            font-weight: 900;
-            margin: 0;
-            background: linear-gradient(135deg, #8b1e1e, #ff6b35, #8b1e1e);
-            background-size: 200% auto;
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-            animation: gradientText 3s linear infinite;
-            letter-spacing: -1px;
-        }
-        
-        @keyframes gradientText {
-            0%, 100% { background-position: 0% center; }
-            50% { background-position: 100% center; }
-        }
-        
-        .hero-banner p {
-            text-align: center;
-            color: #64748b;
-            font-size: 1rem;
-            font-weight: 500;
-            margin: 0;
-            position: relative;
-            z-index: 1;
-        }
-        
-        [data-theme="dark"] .hero-banner p {
-            color: #cbd5e1;
-        }
-        
-        /* Section Headers */
-        .section-header-magnetic {
-            background: linear-gradient(135deg, rgba(255, 255, 255, 0.9), rgba(248, 250, 252, 0.9));
-            backdrop-filter: blur(15px);
-            border: 2px solid transparent;
-            background-clip: padding-box;
-            border-radius: 15px;
-            padding: 1.5rem 2rem;
-            margin: 2rem 0 1.5rem 0;
-            position: relative;
-            transform: translateY(-5px) scale(1.02);
-            box-shadow: 
-                0 15px 40px rgba(139, 30, 30, 0.2),
-                0 0 30px rgba(255, 107, 53, 0.3);
-            transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-            cursor: pointer;
-        }
-        
-        .section-header-magnetic::before {
-            content: '';
-            position: absolute;
-            inset: -2px;
-            border-radius: 15px;
-            background: linear-gradient(135deg, #ff6b35, #8b1e1e, #ff6b35);
-            background-size: 200% 200%;
-            animation: borderRotate 4s linear infinite;
-            transform: translateY(-5px) scale(1.02);
-            box-shadow: 
-                0 15px 40px rgba(139, 30, 30, 0.2),
-                0 0 30px rgba(255, 107, 53, 0.3);
-            z-index: -1;
-            opacity: 1;
-        }
-        
-        @keyframes borderRotate {
-            0%, 100% { background-position: 0% 50%; }
-            50% { background-position: 100% 50%; }
-        }
-        
-
-        
-        .section-header-magnetic h3 {
-            color: #fff;
-            font-size: 1.5rem;
-            font-weight: 800;
-            margin: 0;
-            display: flex;
-            align-items: center;
-            gap: 0.8rem;
-            letter-spacing: -0.5px;
-        }
-        
-        [data-theme="dark"] .section-header-magnetic {
-            background: linear-gradient(135deg, rgba(30, 30, 40, 0.9), rgba(20, 20, 30, 0.9));
-            box-shadow: 
-                0 8px 25px rgba(0, 0, 0, 0.4),
-                0 0 20px rgba(255, 107, 53, 0.2),
-                inset 0 1px 0 rgba(255, 255, 255, 0.1);
-        }
-        
-        [data-theme="dark"] .section-header-magnetic h3 {
-            color: #f1f5f9;
-        }
-        
-        /* Enhanced Agent Buttons */
-        .stButton > button[kind="secondary"] {
-            position: relative;
-            background: linear-gradient(135deg, #ffffff 0%, #f8fafc 100%) !important;
-            color: #1e293b !important;
-            border: 2px solid rgba(255, 107, 53, 0.3) !important;
-            border-radius: 20px !important;
-            padding: 1.5rem 1rem !important;
-            font-weight: 700 !important;
-            font-size: 1rem !important;
-            box-shadow: 
-                0 8px 20px rgba(0, 0, 0, 0.1),
-                inset 0 1px 0 rgba(255, 255, 255, 0.8) !important;
-            transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1) !important;
-            overflow: hidden;
-            height: auto !important;
-            min-height: 90px !important;
-        }
-        
-        .stButton > button[kind="secondary"]::before {
-            content: '';
-            position: absolute;
-            top: 50%;
-            left: 50%;
-            width: 0;
-            height: 0;
-            border-radius: 50%;
-            background: radial-gradient(circle, rgba(255, 107, 53, 0.4), transparent);
-            transform: translate(-50%, -50%);
-            transition: width 0.6s, height 0.6s;
-        }
-        
-        .stButton > button[kind="secondary"]:hover::before {
-            width: 300px;
-            height: 300px;
-        }
-        
-        .stButton > button[kind="secondary"]:hover:not(:disabled) {
-            transform: translateY(-5px) scale(1.03) rotateZ(-1deg) !important;
-            box-shadow: 
-                0 15px 40px rgba(139, 30, 30, 0.3),
-                0 0 35px rgba(255, 107, 53, 0.4),
-                inset 0 1px 0 rgba(255, 255, 255, 0.9) !important;
-            border-color: #ff6b35 !important;
-            background: linear-gradient(135deg, #8b1e1e 0%, #ff6b35 100%) !important;
-            color: white !important;
-        }
-        
-        .stButton > button[kind="secondary"]:active:not(:disabled) {
-            transform: translateY(-3px) scale(1.01) !important;
-        }
-        
-        [data-theme="dark"] .stButton > button[kind="secondary"] {
-            background: linear-gradient(135deg, rgba(30, 41, 59, 0.8), rgba(15, 23, 42, 0.8)) !important;
-            color: #f1f5f9 !important;
-            border: 2px solid rgba(255, 107, 53, 0.4) !important;
-            box-shadow: 
-                0 8px 20px rgba(0, 0, 0, 0.4),
-                0 0 15px rgba(255, 107, 53, 0.2) !important;
-        }
-        
-        /* Neon Active Agent Box */
-        .active-agent-neon {
-            background: linear-gradient(135deg, rgba(139, 30, 30, 0.15), rgba(255, 107, 53, 0.1));
-            backdrop-filter: blur(15px);
-            border: 2px solid transparent;
-            border-radius: 20px;
-            padding: 1.5rem;
-            margin: 2rem 0;
-            position: relative;
-            overflow: hidden;
-            animation: neonPulse 3s ease-in-out infinite;
-        }
-        
-        .active-agent-neon::before {
-            content: '';
-            position: absolute;
-            inset: -2px;
-            border-radius: 20px;
-            background: linear-gradient(45deg, #ff6b35, #8b1e1e, #ff6b35);
-            background-size: 300% 300%;
-            animation: neonBorder 3s linear infinite;
-            z-index: -1;
-        }
-        
-        @keyframes neonPulse {
-            0%, 100% { box-shadow: 0 0 15px rgba(255, 107, 53, 0.3); }
-            50% { box-shadow: 0 0 25px rgba(255, 107, 53, 0.6), 0 0 40px rgba(139, 30, 30, 0.4); }
-        }
-        
-        @keyframes neonBorder {
-            0%, 100% { background-position: 0% 50%; }
-            50% { background-position: 100% 50%; }
-        }
-        
-        .active-agent-neon .title {
-            color: #8b1e1e;
-            font-weight: 800;
-            font-size: 1.2rem;
-            margin: 0 0 0.5rem 0;
-            text-shadow: 0 0 8px rgba(139, 30, 30, 0.3);
-        }
-        
-        [data-theme="dark"] .active-agent-neon {
-            background: linear-gradient(135deg, rgba(139, 30, 30, 0.3), rgba(255, 107, 53, 0.2));
-        }
-        
-        [data-theme="dark"] .active-agent-neon .title {
-            color: #ff6b35;
-            text-shadow: 0 0 12px rgba(255, 107, 53, 0.5);
-        }
-        
-        /* Cosmic Primary Buttons */
-        .stButton > button[kind="primary"] {
-            position: relative;
-            background: linear-gradient(135deg, #8b1e1e 0%, #ff6b35 50%, #8b1e1e 100%) !important;
-            background-size: 200% auto;
-            animation: cosmicShift 3s linear infinite;
-            border: none !important;
-            border-radius: 15px !important;
-            padding: 1rem 2rem !important;
-            font-weight: 800 !important;
-            font-size: 1rem !important;
-            text-transform: uppercase;
-            letter-spacing: 1.5px;
-            color: white !important;
-            box-shadow: 
-                0 8px 25px rgba(139, 30, 30, 0.5),
-                0 0 20px rgba(255, 107, 53, 0.4),
-                inset 0 1px 0 rgba(255, 255, 255, 0.3) !important;
-            transition: all 0.3s ease !important;
-            overflow: hidden;
-            height: 50px !important;
-        }
-        
-        @keyframes cosmicShift {
-            0%, 100% { background-position: 0% center; }
-            50% { background-position: 100% center; }
-        }
-        
-        .stButton > button[kind="primary"]::after {
-            content: '✨';
-            position: absolute;
-            top: 50%;
-            left: -50px;
-            transform: translateY(-50%);
-            font-size: 1.2rem;
-            animation: sparkleMove 2s ease-in-out infinite;
-        }
-        
-        @keyframes sparkleMove {
-            0% { left: -50px; opacity: 0; }
-            50% { opacity: 1; }
-            100% { left: calc(100% + 50px); opacity: 0; }
-        }
-        
-        .stButton > button[kind="primary"]:hover {
-            transform: translateY(-5px) scale(1.03) !important;
-            box-shadow: 
-                0 15px 40px rgba(139, 30, 30, 0.6),
-                0 0 35px rgba(255, 107, 53, 0.6) !important;
-        }
-        
-        /* Holographic Dividers */
-        hr {
-            margin: 2.5rem 0 !important;
-            border: none !important;
-            height: 1px !important;
-            background: linear-gradient(90deg, transparent, #ff6b35, #8b1e1e, #ff6b35, transparent) !important;
-            background-size: 200% 100%;
-            animation: holoDivider 3s linear infinite;
-        }
-        
-        @keyframes holoDivider {
-            0%, 100% { background-position: 0% center; }
-            50% { background-position: 100% center; }
-        }
-        
-        /* Info Alert */
-        .stAlert {
-            background: rgba(255, 255, 255, 0.8) !important;
-            backdrop-filter: blur(15px) !important;
-            border: 1px solid rgba(255, 107, 53, 0.3) !important;
-            border-radius: 12px !important;
-            border-left: 4px solid #ff6b35 !important;
-            box-shadow: 0 6px 20px rgba(139, 30, 30, 0.15) !important;
-            font-weight: 600 !important;
-            animation: alertGlow 2s ease-in-out infinite;
-            padding: 0.8rem !important;
-        }
-        
-        @keyframes alertGlow {
-            0%, 100% { box-shadow: 0 6px 20px rgba(139, 30, 30, 0.15); }
-            50% { box-shadow: 0 6px 25px rgba(255, 107, 53, 0.3); }
-        }
-        
-        [data-theme="dark"] .stAlert {
-            background: rgba(30, 30, 40, 0.8) !important;
-            border: 1px solid rgba(255, 107, 53, 0.4) !important;
-        }
-        
-        /* Smooth Page Load Animation */
-        .main > .block-container {
-            animation: pageLoad 0.8s cubic-bezier(0.4, 0, 0.2, 1);
-        }
-        
-        @keyframes pageLoad {
-            0% {
-                opacity: 0;
-                transform: translateY(30px) scale(0.98);
-            }
-            100% {
-                opacity: 1;
-                transform: translateY(0) scale(1);
-            }
-        }
-        
-        /* Responsive Grid Gap */
-        .row-widget.stHorizontal {
-            gap: 1.5rem !important;
-        }
-        
-        /* Hide default elements */
-        #MainMenu {visibility: hidden;}
-        footer {visibility: hidden;}
-    </style>
-    """, unsafe_allow_html=True)
+    inject_stylesheet("main.css")
 
     render_header(
         agent_name="Business Problem Discovery Assistant",
@@ -921,6 +280,57 @@ def render_main_app():
             else:
                 st.warning("Please save your business problem details first")
 
+    st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
+
+    # Run every agent in one go; results fill the same session keys each page reads
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col2:
+        if st.button("⚡ Run Full Analysis", width='stretch', type="primary", key="run_full_analysis",
+                     help="Runs all seven agents, sending independent questions in parallel"):
+            if not st.session_state.saved_problem:
+                st.warning("Please save your business problem details first")
+            else:
+                if not st.session_state.get('auth_token'):
+                    st.session_state.auth_token = init_auth_token()
+                problem = st.session_state.saved_problem
+                account = st.session_state.saved_account
+                industry = st.session_state.saved_industry
+                auth_token = st.session_state.auth_token
+                hedge_budget = session_hedge_budget()
+                # Runs in the background so the analysis keeps going while the user opens agent pages
+                submit_agent_job(
+                    "full_analysis", problem, {"account": account, "industry": industry},
+                    lambda on_progress, on_partial, on_queue: run_pipeline(
+                        problem, account, industry,
+                        auth_token=auth_token,
+                        on_progress=on_progress,
+                        on_partial=on_partial,
+                        on_queue=on_queue,
+                        hedge_budget=hedge_budget,
+                    ),
+                )
+
+        # Pick up a finished full analysis (possibly started before a rerun)
+        finished_job = take_finished_job("full_analysis")
+        if finished_job:
+            if finished_job.status == "failed":
+                st.error(f"An unexpected error occurred during analysis: {finished_job.error}")
+            else:
+                results, errors = finished_job.result
+                apply_pipeline_results(st.session_state, results, errors)
+                # Vocabulary and current system keep their previous output when their call failed
+                store_session_outputs(*(agent for agent in AGENT_SESSION_KEYS
+                                        if agent not in ("vocabulary", "current_system") or results.get(agent)))
+                for dimension in DIMENSION_SESSION_KEYS:
+                    record_dimension_scores(dimension)
+                failed = [name for name, error in errors.items() if error]
+                if failed:
+                    st.warning(f"Full analysis finished with errors in: {', '.join(failed)}")
+                else:
+                    st.success("✅ Full analysis complete! Open any agent to review its results.")
+        else:
+            render_job_progress("full_analysis", "🔍 Running all agents...")
+
     st.markdown("---")
     col1, col2, col3 = st.columns([1, 1, 1])
     with col2:
@@ -931,6 +341,9 @@ def render_main_app():
             st.success("Session reset successfully!")
             st.rerun()
 
+    # Keep polling while the full analysis is running
+    poll_running_jobs("full_analysis")
+
 
 def _render_admin_confirmation():
     """Admin confirmation page"""
@@ -941,91 +354,8 @@ def _render_admin_confirmation():
         header_height=85
     )
     
+    inject_stylesheet("admin_confirmation.css")
     st.markdown("""
-    <style>
-        .admin-confirm-container {
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            min-height: 50vh;
-        }
-        
-        .admin-confirm-card {
-            max-width: 500px;
-            background: rgba(255, 255, 255, 0.8);
-            backdrop-filter: blur(25px) saturate(180%);
-            border: 2px solid rgba(139, 30, 30, 0.2);
-            border-radius: 25px;
-            padding: 2.5rem 2.5rem;
-            box-shadow: 
-                0 20px 60px rgba(0, 0, 0, 0.15),
-                0 0 40px rgba(255, 107, 53, 0.2),
-                inset 0 1px 0 rgba(255, 255, 255, 0.9);
-            position: relative;
-            overflow: hidden;
-            animation: confirmEntrance 0.8s cubic-bezier(0.34, 1.56, 0.64, 1);
-        }
-        
-        @keyframes confirmEntrance {
-            0% {
-                opacity: 0;
-                transform: scale(0.9) translateY(30px);
-            }
-            100% {
-                opacity: 1;
-                transform: scale(1) translateY(0);
-            }
-        }
-        
-        .admin-confirm-card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 4px;
-            background: linear-gradient(90deg, #8b1e1e, #ff6b35, #8b1e1e);
-            background-size: 200% 100%;
-            animation: borderFlow 3s linear infinite;
-        }
-        
-        @keyframes borderFlow {
-            0%, 100% { background-position: 0% center; }
-            50% { background-position: 100% center; }
-        }
-        
-        .admin-confirm-card h2 {
-            font-size: 2rem;
-            font-weight: 900;
-            text-align: center;
-            margin: 0 0 0.8rem 0;
-            background: linear-gradient(135deg, #8b1e1e, #ff6b35);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-        }
-        
-        .admin-confirm-card p {
-            text-align: center;
-            color: #64748b;
-            font-size: 1rem;
-            font-weight: 500;
-            margin: 0;
-        }
-        
-        [data-theme="dark"] .admin-confirm-card {
-            background: rgba(20, 20, 30, 0.8);
-            border: 2px solid rgba(255, 107, 53, 0.3);
-            box-shadow: 
-                0 20px 60px rgba(0, 0, 0, 0.4),
-                0 0 40px rgba(255, 107, 53, 0.3);
-        }
-        
-        [data-theme="dark"] .admin-confirm-card p {
-            color: #cbd5e1;
-        }
-    </style>
-    
     <div class="admin-confirm-container">
         <div class="admin-confirm-card">
             <h2>🔐 Admin Portal</h2>
@@ -1061,101 +391,8 @@ def _render_admin_panel():
         header_height=85
     )
     
+    inject_stylesheet("admin_panel.css")
     st.markdown("""
-    <style>
-        .admin-dash-header {
-            background: linear-gradient(135deg, #8b1e1e 0%, #6b1515 50%, #ff6b35 100%);
-            padding: 2rem;
-            border-radius: 20px;
-            margin-bottom: 2rem;
-            box-shadow: 
-                0 12px 40px rgba(139, 30, 30, 0.4),
-                0 0 40px rgba(255, 107, 53, 0.3);
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .admin-dash-header::before {
-            content: '';
-            position: absolute;
-            top: -50%;
-            right: -50%;
-            width: 200%;
-            height: 200%;
-            background: radial-gradient(circle, rgba(255,107,53,0.3), transparent 70%);
-            animation: dashRotate 10s linear infinite;
-        }
-        
-        @keyframes dashRotate {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
-        
-        .admin-dash-header h2 {
-            color: white;
-            font-size: 2rem;
-            font-weight: 900;
-            text-align: center;
-            margin: 0;
-            position: relative;
-            z-index: 1;
-            text-shadow: 0 3px 15px rgba(0, 0, 0, 0.3);
-        }
-        
-        .admin-card {
-            background: rgba(255, 255, 255, 0.8);
-            backdrop-filter: blur(15px);
-            border: 2px solid rgba(139, 30, 30, 0.15);
-            border-radius: 15px;
-            padding: 2rem;
-            margin: 1.5rem 0;
-            box-shadow: 0 8px 25px rgba(0, 0, 0, 0.1);
-            transition: all 0.3s ease;
-        }
-        
-        .admin-card:hover {
-            transform: translateY(-3px);
-            box-shadow: 0 12px 35px rgba(139, 30, 30, 0.2);
-        }
-        
-        [data-theme="dark"] .admin-card {
-            background: rgba(30, 41, 59, 0.8);
-            border: 2px solid rgba(255, 107, 53, 0.25);
-            box-shadow: 0 8px 25px rgba(0, 0, 0, 0.4);
-        }
-        
-        .admin-card h3 {
-            color: #1e293b;
-            font-size: 1.5rem;
-            font-weight: 800;
-            margin: 0 0 1rem 0;
-        }
-        
-        [data-theme="dark"] .admin-card h3 {
-            color: #f1f5f9;
-        }
-        
-        .stat-metric {
-            background: linear-gradient(135deg, rgba(255,107,53,0.1), rgba(139,30,30,0.1));
-            border: 2px solid rgba(255,107,53,0.2);
-            border-radius: 12px;
-            padding: 1.5rem 1rem;
-            text-align: center;
-            transition: all 0.3s ease;
-        }
-        
-        .stat-metric:hover {
-            transform: scale(1.03) translateY(-3px);
-            box-shadow: 0 8px 25px rgba(255,107,53,0.3);
-            border-color: #ff6b35;
-        }
-        
-        [data-theme="dark"] .stat-metric {
-            background: linear-gradient(135deg, rgba(255,107,53,0.2), rgba(139,30,30,0.2));
-            border: 2px solid rgba(255,107,53,0.3);
-        }
-    </style>
-    
     <div class="admin-dash-header">
         <h2> Admin Center</h2>
     </div>
@@ -1205,105 +442,99 @@ def _render_admin_dashboard():
 
     st.markdown("<h3>📋 Feedback Analytics</h3>", unsafe_allow_html=True)
 
-    st.markdown("#### 🔍 Filters")
-
-    col_filter1, col_filter2 = st.columns(2)
-
-    with col_filter1:
-        agent_filter = st.selectbox(
-            "Agent:",
-            options=[
-                "All Agents",
-                "Vocabulary Agent",
-                "Current System Agent",
-                "Volatility Agent",
-                "Ambiguity Agent",
-                "Interconnectedness Agent",
-                "Uncertainty Agent",
-                "Hardness Summary Agent"
-            ],
-            key="admin_agent_filter"
-        )
-
-    with col_filter2:
-        feedback_type_filter = st.selectbox(
-            "📋 Type:",
-            options=[
-                "All Feedback Types",
-                "I have read it, found it useful, thanks.",
-                "I have read it, found some definitions to be off.",
-                "The widget seems interesting, but I have some suggestions on the features."
-            ],
-            key="admin_feedback_type_filter"
-        )
-
-    df = None
-    if os.path.exists(FEEDBACK_FILE):
+    @fragment
+    def render_feedback_filters():
+        """Filters, table and download; changing a filter reruns only this section"""
+        st.markdown("#### 🔍 Filters")
+
+        col_filter1, col_filter2 = st.columns(2)
+
+        with col_filter1:
+            agent_filter = st.selectbox(
+                "Agent:",
+                options=[
+                    "All Agents",
+                    "Vocabulary Agent",
+                    "Current System Agent",
+                    "Volatility Agent",
+                    "Ambiguity Agent",
+                    "Interconnectedness Agent",
+                    "Uncertainty Agent",
+                    "Hardness Summary Agent"
+                ],
+                key="admin_agent_filter"
+            )
+
+        with col_filter2:
+            feedback_type_filter = st.selectbox(
+                "📋 Type:",
+                options=[
+                    "All Feedback Types",
+                    "I have read it, found it useful, thanks.",
+                    "I have read it, found some definitions to be off.",
+                    "The widget seems interesting, but I have some suggestions on the features."
+                ],
+                key="admin_feedback_type_filter"
+            )
+
+        # Filters run as indexed queries against the feedback store
+        agent_value = None if agent_filter == "All Agents" else agent_filter
+        type_value = None if feedback_type_filter == "All Feedback Types" else feedback_type_filter
+        filtered_df = None
+        total_entries = 0
         try:
-            df = pd.read_csv(FEEDBACK_FILE)
+            store = get_feedback_store()
+            total_entries = store.count()
+            if total_entries:
+                filtered_df = pd.DataFrame(
+                    store.query(agent=agent_value, feedback_type=type_value),
+                    columns=store.columns(),
+                )
         except Exception as e:
             st.warning(f"⚠️ Error: {e}")
-            df = None
-
-    if df is None or df.empty:
-        if 'feedback_data' in st.session_state and not st.session_state.feedback_data.empty:
-            df = st.session_state.feedback_data.copy()
-            st.info("Session data (cloud mode)")
-        else:
-            df = None
-
-    if df is not None and not df.empty:
-        filtered_df = df.copy()
-
-        if 'Agent' in df.columns and agent_filter != "All Agents":
-            filtered_df = filtered_df[filtered_df['Agent'] == agent_filter]
 
-        if feedback_type_filter != "All Feedback Types":
-            filtered_df = filtered_df[filtered_df['FeedbackType'] == feedback_type_filter]
+        if total_entries and filtered_df is not None:
+            st.info(f"Showing **{len(filtered_df)}** of **{total_entries}** entries")
 
-        st.info(f"Showing **{len(filtered_df)}** of **{len(df)}** entries")
+            if not filtered_df.empty:
+                st.dataframe(filtered_df, width='stretch', height=350)
 
-        if not filtered_df.empty:
-            st.dataframe(filtered_df, width='stretch', height=350)
+                feedback_csv = filtered_df.to_csv(index=False).encode("utf-8")
 
-            feedback_csv = filtered_df.to_csv(index=False).encode("utf-8")
+                agent_part = agent_filter.replace(' ', '_') if agent_filter != "All Agents" else "AllAgents"
+                download_filename = f"feedback_{agent_part}_{datetime.now().strftime('%Y%m%d')}.csv"
 
-            agent_part = agent_filter.replace(' ', '_') if agent_filter != "All Agents" else "AllAgents"
-            download_filename = f"feedback_{agent_part}_{datetime.now().strftime('%Y%m%d')}.csv"
-
-            col_dl1, col_dl2, col_dl3 = st.columns([1, 2, 1])
-            with col_dl2:
-                st.download_button(
-                    "⬇️ Download Report",
-                    feedback_csv,
-                    download_filename,
-                    "text/csv",
-                    width='stretch',
-                    type="primary"
-                )
+                col_dl1, col_dl2, col_dl3 = st.columns([1, 2, 1])
+                with col_dl2:
+                    st.download_button(
+                        "⬇️ Download Report",
+                        feedback_csv,
+                        download_filename,
+                        "text/csv",
+                        width='stretch',
+                        type="primary"
+                    )
+            else:
+                st.warning("No matching feedback")
         else:
-            st.warning("No matching feedback")
-    else:
-        st.info("No feedback data available")
+            st.info("No feedback data available")
+
+    render_feedback_filters()
 
     # Add reset button
     st.markdown("### Feedback Management")
     if st.button("Reset Feedback Content"):
-        feedback_keys = ["feedback_data", "saved_account", "saved_industry", "saved_problem"]
+        feedback_keys = ["saved_account", "saved_industry", "saved_problem"]
         for key in feedback_keys:
             if key in st.session_state:
                 del st.session_state[key]
         
-        # Clear the feedback file rows while preserving columns
-        if os.path.exists(FEEDBACK_FILE):
-            try:
-                existing = pd.read_csv(FEEDBACK_FILE)
-                existing.iloc[0:0].to_csv(FEEDBACK_FILE, index=False)
-                st.success("Feedback content has been reset while preserving columns.")
-            except Exception as e:
-                st.error(f"Failed to clear feedback file rows: {e}")
-        else:
-            st.info("Feedback file does not exist.")
+        # Clear the stored feedback rows while preserving columns
+        try:
+            get_feedback_store().clear()
+            st.success("Feedback content has been reset while preserving columns.")
+        except Exception as e:
+            st.error(f"Failed to clear feedback rows: {e}")
         
         st.rerun()
 
@@ -0,0 +1,272 @@
+"""
+Endpoint and prompt definitions for every agent.
+Pages, the full-analysis pipeline and offline tools all read their API_CONFIGS
+from here, so a prompt only ever lives in one place.
+"""
+from settings import read_setting
+
+# ================================
+# 🌐 Reasoning API Endpoints
+# ================================
+
+LIVE_REASONING_API_BASE = "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api"
+# Point every agent somewhere else, e.g. the local mock_reasoning_server.py:
+# REASONING_API_BASE=http://127.0.0.1:8765/talos-engine/agency/reasoning_api
+REASONING_API_BASE = read_setting("REASONING_API_BASE", LIVE_REASONING_API_BASE).rstrip("/")
+USING_LIVE_API = REASONING_API_BASE == LIVE_REASONING_API_BASE
+SOCIETY_ID = "1757657318406"
+
+# Bump whenever a prompt or endpoint below changes: stored analyses made with an
+# older version are no longer reused (see analysis_store.py)
+PROMPT_VERSION = "1"
+
+
+def agency_url(agency_id):
+    """Reasoning endpoint for one talos-engine agency."""
+    return f"{REASONING_API_BASE}?society_id={SOCIETY_ID}&agency_id={agency_id}&level=1"
+
+
+def build_full_context(problem, account, industry, extra=""):
+    """Problem + account/industry block sent by the Vocabulary, Ambiguity and Hardness agents."""
+    return f"""
+    Business Problem:
+    {problem.strip()}
+
+    Context:
+    Account: {account}
+    Industry: {industry}
+    {extra}
+    """.strip()
+
+
+# ================================
+# 📖 Vocabulary & Current System
+# ================================
+
+VOCABULARY_API_CONFIGS = [
+    {
+        "name": "vocabulary",
+        "url": agency_url("1758548233201"),
+        "multiround_convo": 3,
+        "description": "vocabulary",
+        "prompt": lambda problem, outputs: (
+            f"{problem}\n\nExtract the vocabulary from this problem statement."
+        )
+    }
+]
+
+
+def current_system_prompt(problem, outputs):
+    return (
+        f"Problem statement - {problem}\n\n"
+        f"Context from vocabulary:\n{outputs.get('vocabulary', '')}\n\n"
+        "Describe the current system, inputs, outputs, and pain points in detail with clear sections."
+    )
+
+
+CURRENT_SYSTEM_API_CONFIGS = [
+    {
+        "name": "current_system",
+        "url": agency_url("1758549095254"),
+        "multiround_convo": 2,
+        "description": "Current System in Place",
+        "prompt": current_system_prompt
+    }
+]
+
+# ================================
+# 📊 Dimension Agents (Q1-Q12)
+# ================================
+
+VOLATILITY_API_CONFIGS = [
+    {
+        "name": "Q1",
+        "url": agency_url("1758555344231"),
+        "multiround_convo": 2,
+        "description": "What is the frequency and pace of change in the key inputs driving the business?",
+        "prompt": lambda problem, outputs: (
+            f"Problem statement - {problem}\n\n"
+            f"Context from vocabulary:\n{outputs.get('vocabulary', '')}\n\n"
+            f"Context from current system:\n{outputs.get('current_system', '')}\n\n"
+            "What is the frequency and pace of change in the key inputs driving the business? Provide detailed analysis, score 0–5, and justification."
+        )
+    },
+    {
+        "name": "Q2",
+        "url": agency_url("1758549615986"),
+        "multiround_convo": 2,
+        "description": "To what extent are these changes cyclical and predictable versus sporadic and unpredictable?",
+        "prompt": lambda problem, outputs: (
+            f"Problem statement - {problem}\n\n"
+            f"Context from vocabulary:\n{outputs.get('vocabulary', '')}\n\n"
+            f"Context from current system:\n{outputs.get('current_system', '')}\n\n"
+            "To what extent are these changes cyclical and predictable versus sporadic and unpredictable? "
+            "Provide detailed analysis, score 0–5, and justification."
+        )
+    },
+    {
+        "name": "Q3",
+        "url": agency_url("1758614550482"),
+        "multiround_convo": 2,
+        "description": "How resilient is the current system in absorbing these changes without requiring significant rework or disruption?",
+        "prompt": lambda problem, outputs: (
+            f"Problem statement - {problem}\n\n"
+            f"Context from vocabulary:\n{outputs.get('vocabulary', '')}\n\n"
+            f"Context from current system:\n{outputs.get('current_system', '')}\n\n"
+            "How resilient is the current system in absorbing these changes without requiring significant rework or disruption? "
+            "Provide detailed analysis, score 0–5, and justification."
+        )
+    }
+]
+
+AMBIGUITY_API_CONFIGS = [
+    {
+        "name": "Q4",
+        "url": agency_url("1758614809984"),
+        "multiround_convo": 2,
+        "description": "To what extent do stakeholders share a common understanding of the key terms and concepts?",
+        "prompt": lambda problem, outputs: (
+            f"Problem statement - {problem}\n\nContext from Vocabulary:\n{outputs.get('vocabulary','')}\n\n"
+            f"Context from Current System:\n{outputs.get('current_system','')}\n\n"
+            "To what extent do stakeholders share a common understanding and goals about the problem? Score 0–5. Provide justification."
+        )
+    },
+    {
+        "name": "Q5",
+        "url": agency_url("1758615038050"),
+        "multiround_convo": 2,
+        "description": "Are there any conflicting definitions or interpretations that could create confusion",
+        "prompt": lambda problem, outputs: (
+            f"Problem statement - {problem}\n\nContext from Vocabulary:\n{outputs.get('vocabulary','')}\n\n"
+            f"Context from Current System:\n{outputs.get('current_system','')}\n\n"
+            "Are there significant conflicts or tradeoffs between stakeholders or system elements? Score 0–5. Provide justification."
+        )
+    },
+    {
+        "name": "Q6",
+        "url": agency_url("1758615386880"),
+        "multiround_convo": 2,
+        "description": "Are objectives, priorities, and constraints clearly communicated and well-defined?",
+        "prompt": lambda problem, outputs: (
+            f"Problem statement - {problem}\n\nContext from Vocabulary:\n{outputs.get('vocabulary','')}\n\n"
+            f"Context from Current System:\n{outputs.get('current_system','')}\n\n"
+            "How clear is the problem definition and scope? Score 0–5. Provide justification."
+        )
+    }
+]
+
+INTERCONNECTEDNESS_API_CONFIGS = [
+    {
+        "name": "Q7",
+        "url": agency_url("1758615778653"),
+        "multiround_convo": 2,
+        "description": "To what extent are key inputs interdependent?",
+        "prompt": lambda problem, outputs: (
+            f"Problem statement - {problem}\n\n"
+            f"Context from vocabulary:\n{outputs.get('vocabulary', '')}\n\n"
+            f"Context from current system:\n{outputs.get('current_system', '')}\n\n"
+            "To what extent are key inputs interdependent? How adequate are current resources (people, budget, technology) to handle the issue? Score 0–5. Provide justification."
+        )
+    },
+    {
+        "name": "Q8",
+        "url": agency_url("1758616081630"),
+        "multiround_convo": 2,
+        "description": "How well are the governing rules, functions, and relationships between inputs understood?",
+        "prompt": lambda problem, outputs: (
+            f"Problem statement - {problem}\n\n"
+            f"Context from vocabulary:\n{outputs.get('vocabulary', '')}\n\n"
+            f"Context from current system:\n{outputs.get('current_system', '')}\n\n"
+            "How complex is the problem in terms of stakeholders, processes, or technology involved? Score 0–5. Provide justification."
+        )
+    },
+    {
+        "name": "Q9",
+        "url": agency_url("1758616793510"),
+        "multiround_convo": 2,
+        "description": "Are there any hidden or latent dependencies that could impact outcomes?",
+        "prompt": lambda problem, outputs: (
+            f"Problem statement - {problem}\n\nContext from Current System:\n"
+            f"Context from vocabulary:\n{outputs.get('vocabulary', '')}\n\n"
+            f"Context from current system:\n{outputs.get('current_system', '')}\n\n"
+            "How dependent is the problem on external factors or third parties? Score 0–5. Provide justification."
+        )
+    }
+]
+
+UNCERTAINTY_API_CONFIGS = [
+    {
+        "name": "Q10",
+        "url": agency_url("1758617140479"),
+        "multiround_convo": 2,
+        "description": "Are there hidden or latent dependencies that could affect outcomes?",
+        "prompt": lambda problem, outputs: (
+            f"Problem statement - {problem}\n\n"
+            f"Context from vocabulary:\n{outputs.get('vocabulary', '')}\n\n"
+            f"Context from current system:\n{outputs.get('current_system', '')}\n\n"
+            "Are there hidden or latent dependencies that could affect outcomes? What is the risk/impact if this problem remains unresolved? Score 0–5. Provide justification."
+        )
+    },
+    {
+        "name": "Q11",
+        "url": agency_url("1758618137301"),
+        "multiround_convo": 2,
+        "description": "Are feedback loops insufficient or missing, limiting our ability to adapt?",
+        "prompt": lambda problem, outputs: (
+            f"Problem statement - {problem}\n\n"
+            f"Context from vocabulary:\n{outputs.get('vocabulary', '')}\n\n"
+            f"Context from current system:\n{outputs.get('current_system', '')}\n\n"
+            "How urgent is it to address this problem? Score 0–5. Provide justification."
+        )
+    },
+    {
+        "name": "Q12",
+        "url": agency_url("1758619317968"),
+        "multiround_convo": 2,
+        "description": "Do we lack established benchmarks or \"gold standards\" to validate results?",
+        "prompt": lambda problem, outputs: (
+            f"Problem statement - {problem}\n\n"
+            f"Context from vocabulary:\n{outputs.get('vocabulary', '')}\n\n"
+            f"Context from current system:\n{outputs.get('current_system', '')}\n\n"
+            "How well does solving this problem align with organizational strategy or goals? Score 0–5. Provide justification."
+        )
+    }
+]
+
+# ================================
+# 🧮 Hardness Summary
+# ================================
+
+def hardness_prompt(problem, outputs):
+    return (
+        f"Problem statement - {problem}\n\n"
+        f"Context from vocabulary:\n{outputs.get('vocabulary', '')}\n\n"
+        f"Context from current system:\n{outputs.get('current_system', '')}\n\n"
+        f"Volatility Analysis:\n{outputs.get('volatility', {}).get('Q1', '')}\n\n"
+        f"Ambiguity Analysis:\n{outputs.get('ambiguity', {}).get('Q4', '')}\n\n"
+        f"Interconnectedness Analysis:\n{outputs.get('interconnectedness', {}).get('Q7', '')}\n\n"
+        f"Uncertainty Analysis:\n{outputs.get('uncertainty', {}).get('Q10', '')}\n\n"
+        "Based on the comprehensive analysis of the business problem, provide a hardness assessment with the following sections IN THIS EXACT FORMAT:\n\n"
+        "Overall Difficulty Score\n"
+        "[Provide a single numerical score between 0-5 based on your assessment of the problem complexity]\n\n"
+        "Hardness Level\n"
+        "[Easy: 0-3.0, Moderate: 3.1-4.0, or Hard: 4.1-5.0]\n\n"
+        "SME Justification\n"
+        "[Provide detailed justification analyzing the problem across multiple dimensions - complexity, ambiguity, interconnectedness, and uncertainty]\n\n"
+        "Summary\n"
+        "[Provide a concise summary of the overall assessment in 2-3 sentences]\n\n"
+        "Key Takeaways\n"
+        "[Provide 3-5 bullet points with actionable insights]\n\n"
+        "IMPORTANT: Make sure each section is clearly labeled with its header as shown above. Provide actual scores and analysis, not placeholders."
+    )
+
+
+HARDNESS_API_CONFIGS = [
+    {
+        "name": "hardness_summary",
+        "url": agency_url("1758619658634"),
+        "multiround_convo": 2,
+        "description": "Hardness Level, Summary & Key Takeaways",
+        "prompt": hardness_prompt
+    }
+]
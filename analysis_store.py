@@ -0,0 +1,235 @@
+"""
+Server-side store of finished analyses, shared by every session.
+Each agent's output is saved under a hash of the normalised (account, industry, problem)
+together with its scores, timestamps and the PROMPT_VERSION it was produced with.
+When a session saves a problem that was analysed before, the stored outputs are
+loaded straight into st.session_state instead of calling every agent again.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import streamlit as st
+
+from agent_configs import PROMPT_VERSION, USING_LIVE_API
+from change_detection import mark_analysed, normalize_problem_text
+from pipeline import AGENT_SESSION_KEYS, DIMENSION_SESSION_KEYS
+from settings import read_setting
+from text_utils import parse_dimension_answers, parse_hardness_summary
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ANALYSIS_STORE_ENABLED = str(read_setting("ANALYSIS_STORE_ENABLED", "true")).lower() in ("1", "true", "yes")
+# Answers from a mock or staging endpoint are kept apart from real analyses
+ANALYSIS_STORE_PATH = read_setting(
+    "ANALYSIS_STORE_PATH",
+    os.path.join(BASE_DIR, ".cache", "analyses.sqlite3" if USING_LIVE_API else "analyses-offline.sqlite3"),
+)
+
+
+def analysis_key(account, industry, problem):
+    """sha256 of the case- and whitespace-normalised (account, industry, problem)."""
+    payload = json.dumps([normalize_problem_text(account), normalize_problem_text(industry),
+                          normalize_problem_text(problem)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def extract_scores(agent, output):
+    """Numeric scores found in an agent's output ({} when it has none)."""
+    if agent in DIMENSION_SESSION_KEYS and isinstance(output, dict):
+        records = parse_dimension_answers(output)
+        return {name: record.score for name, record in records.items() if record.score is not None}
+    if agent == "hardness_summary" and isinstance(output, dict):
+        score = parse_hardness_summary(output.get("hardness_summary") or "").score
+        return {} if score is None else {"hardness_score": score}
+    return {}
+
+
+# ================================
+# 🗃️ Analysis Store
+# ================================
+
+class AnalysisStore:
+    """
+    SQLite table of agent outputs keyed by (analysis key, agent).
+    Safe to share between threads; several processes can use the same file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS analyses ("
+                " key TEXT NOT NULL,"
+                " agent TEXT NOT NULL,"
+                " account TEXT NOT NULL,"
+                " industry TEXT NOT NULL,"
+                " problem TEXT NOT NULL,"
+                " output TEXT NOT NULL,"
+                " scores TEXT NOT NULL,"
+                " prompt_version TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " PRIMARY KEY (key, agent))"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def save(self, account, industry, problem, agent, output, scores=None):
+        """Store (or replace) one agent's output for this problem."""
+        now = time.time()
+        key = analysis_key(account, industry, problem)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO analyses (key, agent, account, industry, problem, output, scores,"
+                " prompt_version, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(key, agent) DO UPDATE SET output = excluded.output, scores = excluded.scores,"
+                " prompt_version = excluded.prompt_version, updated_at = excluded.updated_at",
+                (key, agent, account, industry, problem, json.dumps(output), json.dumps(scores or {}),
+                 PROMPT_VERSION, now, now),
+            )
+            conn.commit()
+
+    def load(self, account, industry, problem, prompt_version=PROMPT_VERSION):
+        """{agent: {"output", "scores", "created_at", "updated_at"}} stored for this problem and prompt version."""
+        key = analysis_key(account, industry, problem)
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT agent, output, scores, created_at, updated_at FROM analyses"
+                " WHERE key = ? AND prompt_version = ?",
+                (key, prompt_version),
+            ).fetchall()
+        return {
+            agent: {
+                "output": json.loads(output),
+                "scores": json.loads(scores),
+                "created_at": created_at,
+                "updated_at": updated_at,
+            }
+            for agent, output, scores, created_at, updated_at in rows
+        }
+
+    def delete(self, account, industry, problem):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM analyses WHERE key = ?", (analysis_key(account, industry, problem),))
+            conn.commit()
+
+    def stats(self):
+        """Stored analyses, agent outputs and outputs from older prompt versions."""
+        with self._lock:
+            analyses, outputs, stale = self._connect().execute(
+                "SELECT COUNT(DISTINCT key), COUNT(*), COALESCE(SUM(prompt_version != ?), 0) FROM analyses",
+                (PROMPT_VERSION,),
+            ).fetchone()
+        return {"analyses": analyses, "outputs": outputs, "stale_outputs": stale}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_analysis_store():
+    """Process-wide analysis store, or None when ANALYSIS_STORE_ENABLED is off."""
+    global _store
+    if not ANALYSIS_STORE_ENABLED:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = AnalysisStore(ANALYSIS_STORE_PATH)
+    return _store
+
+
+# ================================
+# 🖥️ Streamlit Helpers
+# ================================
+
+def _is_usable(output):
+    """Only complete outputs are stored: no question may hold an error or placeholder text."""
+    if isinstance(output, dict):
+        return bool(output) and all(_is_usable(value) for value in output.values())
+    text = str(output or "").strip()
+    return bool(text) and text != "No data available" and not text.startswith(
+        ("API Error", "API Call Failed", "Unexpected error")
+    )
+
+
+def store_agent_output(agent, account, industry, problem, output):
+    """Save a finished agent output for reuse by any session. Storage errors never reach the page."""
+    store = get_analysis_store()
+    if store is None or not _is_usable(output):
+        return
+    try:
+        store.save(account, industry, problem, agent, output, extract_scores(agent, output))
+    except Exception as e:
+        logger.warning("Analysis store write failed: %s", e)
+
+
+def store_session_outputs(*agents):
+    """
+    Call when agents' outputs have landed in the session: fingerprints them for change
+    detection and stores them under the saved problem details.
+    """
+    mark_analysed(*agents)
+    if not st.session_state.get("saved_problem", "").strip():
+        return
+    for agent in agents:
+        outputs_key, _ = AGENT_SESSION_KEYS[agent]
+        store_agent_output(
+            agent,
+            st.session_state.get("saved_account", ""),
+            st.session_state.get("saved_industry", ""),
+            st.session_state.get("saved_problem", ""),
+            st.session_state.get(outputs_key),
+        )
+
+
+def rehydrate_analysis(account, industry, problem):
+    """
+    Load a stored analysis of this problem into the session, once per problem.
+    Stored outputs replace whatever the session held for those agents (typically
+    results for a previous problem). Returns the names of the restored agents.
+    """
+    store = get_analysis_store()
+    if store is None or not str(problem or "").strip():
+        return []
+    key = analysis_key(account, industry, problem)
+    if st.session_state.get("rehydrated_analysis_key") == key:
+        return []
+    st.session_state.rehydrated_analysis_key = key
+
+    try:
+        stored = store.load(account, industry, problem)
+    except Exception as e:
+        logger.warning("Analysis store read failed: %s", e)
+        return []
+
+    restored = []
+    for agent, record in stored.items():
+        if agent not in AGENT_SESSION_KEYS:
+            continue
+        outputs_key, show_key = AGENT_SESSION_KEYS[agent]
+        st.session_state[outputs_key] = record["output"]
+        st.session_state[show_key] = True
+        restored.append(agent)
+    if restored:
+        mark_analysed(*restored, rebase=True)
+    return restored
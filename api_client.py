@@ -0,0 +1,628 @@
+"""
+Shared client for the talos-engine reasoning API.
+Every agent page sends its questions through one process-wide keep-alive
+connection pool instead of opening a new TLS connection per request.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+from hedging import HedgeCancelled, hedge_delay, record_latency, run_hedged
+from metrics import record_attempt, record_cache, record_call, record_response_size
+from resilience import (
+    RETRY_STATUS_CODES,
+    CircuitOpenError,
+    TransientError,
+    call_with_retries,
+    parse_retry_after,
+)
+from response_cache import ResponseCache, cache_key
+from throttle import QueueTimeout, get_governor
+from settings import read_setting
+
+# ================================
+# ⚙️ Client Configuration
+# ================================
+
+TENANT_ID = "talos"
+HEADERS_BASE = {"Content-Type": "application/json"}
+# Separate connect and read timeouts: an unreachable host fails within seconds,
+# while a slow answer still gets the full read window
+CONNECT_TIMEOUT = float(read_setting("REASONING_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(read_setting("REASONING_READ_TIMEOUT", 60))
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+
+def init_auth_token():
+    """Resolve the bearer token used for every reasoning API call."""
+    return read_setting("AUTH_TOKEN", "")
+
+
+# Number of per-host pools kept alive and connections kept per host.
+POOL_CONNECTIONS = int(read_setting("REASONING_POOL_CONNECTIONS", 4))
+POOL_MAXSIZE = int(read_setting("REASONING_POOL_MAXSIZE", 16))
+
+# "concurrent" sends all questions of an agent at once, "sequential" keeps the old one-by-one loop.
+FANOUT_MODE = str(read_setting("REASONING_FANOUT_MODE", "concurrent")).lower()
+FANOUT_WORKERS = int(read_setting("REASONING_FANOUT_WORKERS", POOL_MAXSIZE))
+
+# On-disk response cache; identical (url, prompt, tenant) calls are answered locally until the TTL expires.
+RESPONSE_CACHE_ENABLED = str(read_setting("RESPONSE_CACHE_ENABLED", "true")).lower() in ("1", "true", "yes")
+RESPONSE_CACHE_PATH = read_setting(
+    "RESPONSE_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "reasoning_responses.sqlite3"),
+)
+RESPONSE_CACHE_TTL_SECONDS = float(read_setting("RESPONSE_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+RESPONSE_CACHE_MAX_BYTES = int(float(read_setting("RESPONSE_CACHE_MAX_MB", 256)) * 1024 * 1024)
+
+# Ask the endpoint to stream the answer (SSE or NDJSON) when the caller can show partial text;
+# endpoints that ignore the Accept header still answer with plain JSON.
+STREAMING_ENABLED = str(read_setting("REASONING_STREAMING", "true")).lower() in ("1", "true", "yes")
+STREAM_ACCEPT = "text/event-stream, application/x-ndjson;q=0.9, application/json;q=0.8"
+
+# ================================
+# 🔌 Process-wide Connection Pool
+# ================================
+
+_session = None
+_session_lock = threading.Lock()
+_pool_slots = threading.BoundedSemaphore(POOL_MAXSIZE)
+_stats_lock = threading.Lock()
+_pool_stats = {
+    "requests": 0,
+    "in_flight": 0,
+    "pool_waits": 0,
+    "pool_wait_seconds": 0.0,
+    "coalesced": 0,
+}
+
+
+def get_session():
+    """Return the shared requests.Session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=POOL_CONNECTIONS,
+                    pool_maxsize=POOL_MAXSIZE,
+                    pool_block=True,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _acquire_pool_slot():
+    """Take a pool slot, recording a wait when every connection is busy."""
+    if _pool_slots.acquire(blocking=False):
+        waited = None
+    else:
+        started = time.perf_counter()
+        _pool_slots.acquire()
+        waited = time.perf_counter() - started
+
+    with _stats_lock:
+        _pool_stats["requests"] += 1
+        _pool_stats["in_flight"] += 1
+        if waited is not None:
+            _pool_stats["pool_waits"] += 1
+            _pool_stats["pool_wait_seconds"] += waited
+
+
+def _release_pool_slot():
+    with _stats_lock:
+        _pool_stats["in_flight"] -= 1
+    _pool_slots.release()
+
+
+def get_pool_stats():
+    """Snapshot of pool metrics: requests sent, connections opened vs reused, pool waits and coalesced calls."""
+    with _stats_lock:
+        stats = dict(_pool_stats)
+
+    opened = 0
+    pooled_requests = 0
+    if _session is not None:
+        pools = _session.get_adapter("https://").poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+                pooled_requests += pool.num_requests
+
+    stats["connections_opened"] = opened
+    stats["connections_reused"] = max(pooled_requests - opened, 0)
+    stats["reuse_ratio"] = (stats["connections_reused"] / pooled_requests) if pooled_requests else 0.0
+    return stats
+
+
+# ================================
+# 🗄️ Response Cache
+# ================================
+
+_response_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Process-wide response cache, or None when disabled."""
+    global _response_cache
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        with _cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache(
+                    RESPONSE_CACHE_PATH,
+                    RESPONSE_CACHE_TTL_SECONDS,
+                    RESPONSE_CACHE_MAX_BYTES,
+                )
+    return _response_cache
+
+
+def get_cache_stats():
+    """Hit/miss counters and size of the response cache ({} when disabled)."""
+    cache = get_response_cache()
+    return cache.stats() if cache else {}
+
+
+def _cache_lookup(key):
+    cache = get_response_cache()
+    if cache is None:
+        return None
+    try:
+        return cache.get(key)
+    except Exception:
+        # A broken cache must never block a live API call
+        return None
+
+
+def _cache_store(key, data):
+    cache = get_response_cache()
+    if cache is None:
+        return
+    try:
+        cache.put(key, data)
+    except Exception:
+        pass
+
+
+# ================================
+# 📡 Reasoning API Calls
+# ================================
+
+def build_headers(auth_token="", accept=None):
+    """Tenant and auth headers expected by the talos-engine agency endpoints."""
+    headers = HEADERS_BASE.copy()
+    headers.update({"Tenant-ID": TENANT_ID, "X-Tenant-ID": TENANT_ID})
+    if auth_token:
+        headers["Authorization"] = f"Bearer {auth_token}"
+    if accept:
+        headers["Accept"] = accept
+    return headers
+
+
+def post_agency_goal(url, prompt, auth_token="", timeout=DEFAULT_TIMEOUT):
+    """
+    POST an agency_goal to a reasoning endpoint over the shared pool.
+    Returns the requests.Response; network errors propagate to the caller.
+    Safe to call from worker threads (no Streamlit calls).
+    """
+    session = get_session()
+    _acquire_pool_slot()
+    try:
+        return session.post(
+            url,
+            headers=build_headers(auth_token),
+            json={"agency_goal": prompt},
+            timeout=timeout,
+        )
+    finally:
+        _release_pool_slot()
+
+
+# ================================
+# 🌊 Streamed Responses
+# ================================
+
+def _sse_payloads(lines):
+    """Yield the data of each Server-Sent Event; multi-line data is joined with newlines."""
+    data = []
+    for line in lines:
+        if line is None:
+            continue
+        if not line:
+            if data:
+                yield "\n".join(data)
+                data = []
+        elif line.startswith("data:"):
+            value = line[5:]
+            data.append(value[1:] if value.startswith(" ") else value)
+        # Comments (":") and the event/id/retry fields carry nothing we need
+    if data:
+        yield "\n".join(data)
+
+
+def collect_stream(payloads, on_text=None):
+    """
+    Assemble a streamed answer from its payloads and return the decoded response.
+    Each payload is one of:
+    - a text delta: plain text, a JSON string, or {"delta": ...} / {"token": ...}
+    - the complete response: {"final": {...}}, or any other JSON object
+    - "[DONE]", which ends the stream
+    on_text(text_so_far) is called after every delta. When no complete response
+    arrives, the concatenated deltas are the answer.
+    """
+    text = ""
+    final = None
+    for payload in payloads:
+        if payload.strip() == "[DONE]":
+            break
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            event = payload
+
+        if isinstance(event, dict):
+            delta = event.get("delta", event.get("token"))
+            if delta is None:
+                final = event.get("final", event)
+                continue
+        else:
+            delta = event
+        if isinstance(delta, str) and delta:
+            text += delta
+            if on_text:
+                on_text(text)
+    return final if final is not None else text
+
+
+def read_agency_response(response, on_text=None):
+    """Decode a 200 response, following it as a stream when the endpoint sent SSE or NDJSON."""
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if content_type == "text/event-stream":
+        response.encoding = response.encoding or "utf-8"
+        return collect_stream(_sse_payloads(response.iter_lines(decode_unicode=True)), on_text)
+    if content_type in ("application/x-ndjson", "application/jsonl"):
+        response.encoding = response.encoding or "utf-8"
+        return collect_stream((line for line in response.iter_lines(decode_unicode=True) if line), on_text)
+    # The endpoint does not stream: wait for the whole JSON body as before
+    return response.json()
+
+
+def stream_preview(text, limit=4000):
+    """Markdown for partial streamed text: the latest part of it, with a typing cursor."""
+    if len(text) > limit:
+        text = "…" + text[-limit:]
+    return f"{text} ▌"
+
+
+def response_error(response):
+    """
+    None for a 200, otherwise the error message for the caller.
+    Raises TransientError for statuses worth retrying (429 and 5xx gateway errors).
+    """
+    if response.status_code == 200:
+        return None
+    message = f"API Error: {response.status_code} - {response.text[:200]}"
+    if response.status_code in RETRY_STATUS_CODES:
+        raise TransientError(
+            message,
+            retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            # Being rate limited says nothing about the endpoint's health
+            unhealthy=response.status_code != 429,
+        )
+    return message
+
+
+def queue_message(position):
+    """Status line for a call waiting on the rate limit."""
+    if position == 1:
+        return "⏳ The reasoning service is busy — your request is next in line"
+    return f"⏳ The reasoning service is busy — your request is #{position} in the queue"
+
+
+def stream_agency_goal(url, prompt, on_text, auth_token="", timeout=DEFAULT_TIMEOUT):
+    """
+    POST an agency_goal asking for a streamed answer and read it as it arrives.
+    on_text(text_so_far) runs on this thread for every chunk; the pool slot is held
+    until the body has been read. Returns (decoded_json, error_message); raises
+    TransientError like response_error.
+    """
+    session = get_session()
+    _acquire_pool_slot()
+    try:
+        # timeout applies per read, so a long answer that keeps streaming is not cut off
+        with session.post(
+            url,
+            headers=build_headers(auth_token, accept=STREAM_ACCEPT),
+            json={"agency_goal": prompt},
+            timeout=timeout,
+            stream=True,
+        ) as response:
+            error = response_error(response)
+            if error:
+                return None, error
+            data = read_agency_response(response, on_text)
+            # Bytes taken off the wire, since the body was consumed line by line
+            record_response_size(url, response.raw.tell())
+            return data, None
+    finally:
+        _release_pool_slot()
+
+
+# Requests currently in flight, keyed like the response cache
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+class _InFlight:
+    """One upstream request that identical concurrent callers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.outcome = (None, "API Call Failed: upstream request was abandoned")
+
+
+def _error_status(message):
+    """HTTP status from an "API Error: <code> - ..." message, for the metrics."""
+    code = message[len("API Error: "):].split(" ", 1)[0] if message.startswith("API Error: ") else ""
+    return int(code) if code.isdigit() else "error"
+
+
+def _attempt_request(url, prompt, auth_token, on_text=None, on_queue=None):
+    """
+    One upstream attempt: (decoded_json, error_message), or TransientError for failures worth retrying.
+    Waits for the agency's rate limit first (see throttle.py).
+    """
+    started = time.perf_counter()
+    status = "error"
+    try:
+        with get_governor(url).slot(on_queue):
+            sent = time.perf_counter()
+            if on_text and STREAMING_ENABLED:
+                data, error = stream_agency_goal(url, prompt, on_text, auth_token)
+                status = 200 if error is None else _error_status(error)
+            else:
+                response = post_agency_goal(url, prompt, auth_token)
+                status = response.status_code
+                record_response_size(url, len(response.content))
+                error = response_error(response)
+                data = None if error else response.json()
+            if error is None:
+                record_latency(url, time.perf_counter() - sent)
+            return data, error
+    except TransientError as e:
+        status = _error_status(str(e))
+        raise
+    except requests.exceptions.ReadTimeout as e:
+        status = "read_timeout"
+        # The endpoint accepted the call but did not answer in time; sending it again
+        # would only keep the user waiting another full read window
+        raise TransientError(f"API Call Failed: {str(e)}", retry=False)
+    except requests.exceptions.ConnectTimeout as e:
+        status = "connect_timeout"
+        raise TransientError(f"API Call Failed: {str(e)}")
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+            requests.exceptions.ChunkedEncodingError) as e:
+        status = "connection_error"
+        raise TransientError(f"API Call Failed: {str(e)}")
+    except QueueTimeout:
+        status = "queue_timeout"
+        raise
+    except HedgeCancelled:
+        status = "cancelled"
+        raise
+    finally:
+        record_attempt(url, time.perf_counter() - started, status)
+
+
+def _request_with_retries(url, prompt, auth_token, on_text=None, on_queue=None):
+    """
+    Perform the upstream call and return (decoded_json, error_message).
+    Transient failures are retried with backoff; an agency whose circuit is open fails fast.
+    """
+    try:
+        return call_with_retries(url, lambda: _attempt_request(url, prompt, auth_token, on_text, on_queue))
+    except (TransientError, CircuitOpenError, QueueTimeout) as e:
+        return None, str(e)
+    except Exception as e:
+        return None, f"API Call Failed: {str(e)}"
+
+
+def _request_json(key, url, prompt, auth_token, on_text=None, on_queue=None, hedge_budget=None):
+    """
+    Perform the upstream call, hedging it when a hedge budget is given and the agency
+    has enough latency history, and cache a successful answer.
+    """
+    delay = None
+    if hedge_budget is not None:
+        hedge_budget.note_call()
+        delay = hedge_delay(url)
+
+    if delay is None:
+        data, error = _request_with_retries(url, prompt, auth_token, on_text, on_queue)
+    else:
+        def attempt(cancelled, primary):
+            # Both calls stream so the loser can be stopped mid-answer; only the primary is shown
+            def on_chunk(text):
+                if cancelled.is_set():
+                    raise HedgeCancelled("hedged call lost the race")
+                if primary and on_text:
+                    on_text(text)
+            return _request_with_retries(url, prompt, auth_token, on_chunk, on_queue if primary else None)
+
+        data, error = run_hedged(attempt, delay, hedge_budget)
+
+    if error is None:
+        _cache_store(key, data)
+    return data, error
+
+
+def _request_json_once(key, url, prompt, auth_token, on_text=None, on_queue=None, hedge_budget=None):
+    """
+    Single-flight wrapper around _request_json: while a request for key is in flight,
+    identical calls from any session wait for it and share its outcome.
+    Only the caller that sends the request sees its partial text and queue position.
+    """
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = _InFlight()
+
+    if not leader:
+        with _stats_lock:
+            _pool_stats["coalesced"] += 1
+        record_cache("coalesced")
+        flight.done.wait()
+        return flight.outcome
+
+    record_cache("miss")
+    try:
+        flight.outcome = _request_json(key, url, prompt, auth_token, on_text, on_queue, hedge_budget)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        flight.done.set()
+    return flight.outcome
+
+
+def fetch_agency_result(url, prompt, auth_token="", postprocess=None, on_text=None, on_queue=None,
+                        hedge_budget=None):
+    """
+    Send one question and return (result, error_message); exactly one of them is None.
+    Never raises and never touches Streamlit, so worker threads and the CLI can use it.
+    Successful responses are served from the on-disk cache when the same prompt was sent before,
+    and identical calls already in flight share one upstream request.
+    - on_text: optional callable(text_so_far); when given the answer is streamed and
+      on_text sees the raw text as it arrives (postprocess only runs on the final answer)
+    - on_queue: optional callable(position) while the call waits for the agency's rate limit
+      (1 = next to go, 0 = sent)
+    - hedge_budget: the caller's hedging.HedgeBudget; slow calls are hedged only when one is given
+    """
+    key = cache_key(url, prompt, TENANT_ID)
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        data = _cache_lookup(key)
+        if data is None:
+            data, error = _request_json_once(key, url, prompt, auth_token, on_text, on_queue, hedge_budget)
+            if error:
+                return None, error
+            result_outcome = "ok"
+        else:
+            record_cache("hit")
+            result_outcome = "cached"
+        result = postprocess(data) if postprocess else data
+        outcome = result_outcome
+        return result, None
+    except Exception as e:
+        return None, f"API Call Failed: {str(e)}"
+    finally:
+        record_call(url, time.perf_counter() - started, outcome)
+
+
+def call_reasoning_api(config, problem, outputs, postprocess=None):
+    """
+    Shared implementation behind each page's call_api.
+    - config: one entry of the page's API_CONFIGS (or None if lookup failed)
+    - problem: business problem statement
+    - outputs: dict, previous agent outputs passed to the prompt builder
+    - postprocess: callable applied to the decoded JSON (e.g. json_to_text + sanitize_text)
+    """
+    if not config:
+        st.error("Invalid API configuration.")
+        return None
+
+    prompt = config["prompt"](problem, outputs)
+    # Partial text is shown in place while the answer streams in, then cleared
+    preview = st.empty()
+    result, error = fetch_agency_result(
+        config["url"], prompt, st.session_state.get("auth_token", ""), postprocess,
+        on_text=lambda text: preview.markdown(stream_preview(text)),
+        on_queue=lambda position: preview.info(queue_message(position)) if position else preview.empty(),
+    )
+    preview.empty()
+    if error:
+        st.error(error)
+    return result
+
+
+# ================================
+# 🔀 Concurrent Fan-out
+# ================================
+
+_fanout_executor = None
+_fanout_lock = threading.Lock()
+
+
+def get_fanout_executor():
+    """Process-wide worker pool shared by every session's fan-out."""
+    global _fanout_executor
+    if _fanout_executor is None:
+        with _fanout_lock:
+            if _fanout_executor is None:
+                _fanout_executor = ThreadPoolExecutor(
+                    max_workers=FANOUT_WORKERS,
+                    thread_name_prefix="reasoning-fanout",
+                )
+    return _fanout_executor
+
+
+def fetch_configs_concurrently(configs, problem, outputs, auth_token="", postprocess=None, on_progress=None,
+                               on_partial=None, on_queue=None, hedge_budget=None):
+    """
+    Send every question in configs at once and collect the answers.
+    - configs: an agent's API_CONFIGS
+    - on_progress: optional callable(done, total), invoked on the calling thread as answers arrive
+    - on_partial: optional callable(name, text_so_far) for streamed answers; may run on worker threads
+    - on_queue: optional callable(name, position) while a question waits for its rate limit; may run on worker threads
+    - hedge_budget: optional hedging.HedgeBudget of the user, to hedge slow questions
+    Returns (results, errors), both {name: value or None}. Makes no Streamlit calls,
+    so background jobs can use it.
+    """
+    jobs = [(cfg["name"], cfg["url"], cfg["prompt"](problem, outputs)) for cfg in configs]
+    total = len(jobs)
+    results = {name: None for name, _, _ in jobs}
+    errors = {}
+
+    def callbacks(name):
+        return (partial(on_partial, name) if on_partial else None,
+                partial(on_queue, name) if on_queue else None,
+                hedge_budget)
+
+    if FANOUT_MODE == "sequential" or total <= 1:
+        for done, (name, url, prompt) in enumerate(jobs, start=1):
+            results[name], errors[name] = fetch_agency_result(url, prompt, auth_token, postprocess, *callbacks(name))
+            if on_progress:
+                on_progress(done, total)
+    else:
+        executor = get_fanout_executor()
+        futures = {
+            executor.submit(fetch_agency_result, url, prompt, auth_token, postprocess, *callbacks(name)): name
+            for name, url, prompt in jobs
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            name = futures[future]
+            results[name], errors[name] = future.result()
+            if on_progress:
+                on_progress(done, total)
+    return results, errors
+
+
+def report_errors(errors):
+    """Show one st.error per failed question."""
+    for name, error in errors.items():
+        if error:
+            st.error(f"{name}: {error}")
@@ -0,0 +1,180 @@
+"""
+Headless batch runner: analyse a CSV or JSONL file of problem statements offline.
+
+Each row runs the same full pipeline as the "Run Full Analysis" button (same prompts,
+same response parsing) and produces one result row with the 12 question scores and
+the hardness score. Progress is checkpointed so an interrupted run resumes where it stopped.
+
+Usage:
+    python batch_analyze.py problems.csv -o results.csv --concurrency 4
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from agent_configs import (
+    VOLATILITY_API_CONFIGS,
+    AMBIGUITY_API_CONFIGS,
+    INTERCONNECTEDNESS_API_CONFIGS,
+    UNCERTAINTY_API_CONFIGS,
+)
+from api_client import init_auth_token
+from pipeline import run_pipeline
+from text_utils import parse_hardness_summary, parse_question_answer
+
+QUESTION_IDS = [
+    cfg["name"]
+    for configs in (VOLATILITY_API_CONFIGS, AMBIGUITY_API_CONFIGS, INTERCONNECTEDNESS_API_CONFIGS, UNCERTAINTY_API_CONFIGS)
+    for cfg in configs
+]
+RESULT_COLUMNS = (
+    ["Account", "Industry", "ProblemStatement"]
+    + QUESTION_IDS
+    + ["HardnessScore", "HardnessLevel", "Errors"]
+)
+
+# Accepted input column names (case-insensitive) for each field
+INPUT_ALIASES = {
+    "account": ("account",),
+    "industry": ("industry",),
+    "problem": ("problem", "problemstatement", "problem_statement", "business_problem"),
+}
+
+# ================================
+# 📥 Input / Checkpoint
+# ================================
+
+def _pick(row, field):
+    lowered = {str(k).strip().lower(): v for k, v in row.items()}
+    for alias in INPUT_ALIASES[field]:
+        value = lowered.get(alias)
+        if value not in (None, ""):
+            return str(value).strip()
+    return ""
+
+
+def load_rows(path):
+    """Read (account, industry, problem) rows from a .csv or .jsonl file."""
+    if path.lower().endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as f:
+            raw_rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            raw_rows = list(csv.DictReader(f))
+
+    rows = []
+    for raw in raw_rows:
+        row = {field: _pick(raw, field) for field in INPUT_ALIASES}
+        if row["problem"]:
+            rows.append(row)
+    return rows
+
+
+def row_key(row):
+    """Content hash of a row, used to resume from the checkpoint."""
+    payload = json.dumps([row["account"], row["industry"], row["problem"]])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def load_checkpoint(path):
+    """Finished result rows from an earlier run, keyed by row_key."""
+    done = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    done[entry["key"]] = entry["result"]
+    return done
+
+
+# ================================
+# 🚀 Analysis
+# ================================
+
+def analyse_row(row, auth_token):
+    """Run the full pipeline for one problem and flatten it into a result row."""
+    results, errors = run_pipeline(row["problem"], row["account"], row["industry"], auth_token=auth_token)
+
+    result = {
+        "Account": row["account"],
+        "Industry": row["industry"],
+        "ProblemStatement": row["problem"],
+    }
+    for question_id in QUESTION_IDS:
+        result[question_id] = parse_question_answer(question_id, results.get(question_id) or "").score
+
+    hardness = parse_hardness_summary(results.get("hardness_summary") or "")
+    result["HardnessScore"] = hardness.score
+    result["HardnessLevel"] = hardness.classification
+    result["Errors"] = "; ".join(f"{name}: {error}" for name, error in errors.items() if error)
+    return result
+
+
+def run_batch(rows, checkpoint_path, concurrency, auth_token):
+    """Analyse every row not yet in the checkpoint, at most `concurrency` problems at a time."""
+    done = load_checkpoint(checkpoint_path)
+    todo = {}
+    for row in rows:
+        key = row_key(row)
+        if key not in done:
+            todo.setdefault(key, row)
+
+    total = len(todo)
+    print(f"{len(rows)} rows, {len(rows) - total} already done, {total} to analyse", file=sys.stderr)
+    if not total:
+        return done
+
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint, \
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch-row") as executor:
+        futures = {executor.submit(analyse_row, row, auth_token): key for key, row in todo.items()}
+        for finished, future in enumerate(as_completed(futures), start=1):
+            key = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"[{finished}/{total}] {key} failed: {e}", file=sys.stderr)
+                continue
+            done[key] = result
+            # Rows with failed calls are written to the output but retried on the next run
+            if not result["Errors"]:
+                checkpoint.write(json.dumps({"key": key, "result": result}) + "\n")
+                checkpoint.flush()
+            print(f"[{finished}/{total}] {key} hardness={result['HardnessScore']}", file=sys.stderr)
+    return done
+
+
+def write_results(rows, done, output_path):
+    """One result row per input row, in input order."""
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            result = done.get(row_key(row))
+            if result:
+                writer.writerow(result)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse a CSV/JSONL file of business problems offline.")
+    parser.add_argument("input", help="CSV or JSONL with account, industry and problem columns")
+    parser.add_argument("-o", "--output", help="result CSV (default: <input>_results.csv)")
+    parser.add_argument("--checkpoint", help="progress file (default: <output>.checkpoint.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=4, help="problems analysed at the same time")
+    args = parser.parse_args(argv)
+
+    output = args.output or f"{os.path.splitext(args.input)[0]}_results.csv"
+    checkpoint = args.checkpoint or f"{output}.checkpoint.jsonl"
+
+    rows = load_rows(args.input)
+    done = run_batch(rows, checkpoint, max(1, args.concurrency), init_auth_token())
+    write_results(rows, done, output)
+    print(f"Wrote {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
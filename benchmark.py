@@ -0,0 +1,325 @@
+"""
+End-to-end benchmarks for the analysis pipeline, run against the local mock reasoning API.
+
+Measures:
+- agent.<name>: one agent's question fan-out (fetch_configs_concurrently)
+- pipeline.full: the whole run_pipeline graph, next to pipeline.critical_path_floor
+  (graph depth x one call) so fan-out overhead shows up as the gap between the two
+- sanitize.per_kb / format.per_kb: sanitize_text and format_dimension_answer cost per KB
+- feedback_submit.<backend>.<rows>: save_feedback_to_file against a store of that size
+- admin_load.<backend>.<rows>: the admin report's count + query against a store of that size
+
+Results are written as JSON; --compare flags metrics whose median got slower than
+--threshold and exits with status 1, so a regression is caught with numbers.
+
+Usage:
+    python benchmark.py -o bench.json --repeat 5
+    python benchmark.py -o bench.json --compare previous_bench.json
+    python benchmark.py --compare old.json new.json      # compare two saved runs only
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from mock_reasoning_server import MockConfig, start_in_thread
+
+BENCH_PROBLEM = "Forecast regional demand for spare parts across 40 service centres."
+BENCH_ACCOUNT = "Benchmark Co"
+BENCH_INDUSTRY = "Manufacturing"
+TEXT_SIZES_KB = (1, 16, 128)
+
+# Settings the app modules read at import; the benchmark measures the call path, not the
+# caches or the rate limits in front of it. Anything already set in the environment wins.
+BENCH_ENVIRONMENT = {
+    "RESPONSE_CACHE_ENABLED": "false",
+    "ANALYSIS_STORE_ENABLED": "false",
+    "REASONING_HEDGING": "false",
+    "REASONING_RATE_PER_SECOND": "0",
+    "REASONING_MAX_IN_FLIGHT": "0",
+}
+
+
+# ================================
+# ⏱️ Timing Helpers
+# ================================
+
+def summarize(samples, unit="s", **extra):
+    """Median, p95, min and max of a list of samples."""
+    ordered = sorted(samples)
+    return {
+        "unit": unit,
+        "samples": len(ordered),
+        "median": statistics.median(ordered),
+        "p95": ordered[min(int(0.95 * len(ordered)), len(ordered) - 1)],
+        "min": ordered[0],
+        "max": ordered[-1],
+        **extra,
+    }
+
+
+def time_call(fn, repeat):
+    """Seconds taken by each of `repeat` calls of fn()."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+# ================================
+# 🌐 Agents & Pipeline (mock API)
+# ================================
+
+def bench_agents(repeat):
+    """Per-agent fan-out time and the full pipeline against the mock."""
+    from api_client import fetch_configs_concurrently
+    from pipeline import DIMENSION_CONFIGS, build_pipeline, node_inputs, run_pipeline
+
+    nodes = build_pipeline(BENCH_PROBLEM, BENCH_ACCOUNT, BENCH_INDUSTRY)
+    agent_of = {cfg["name"]: dimension for dimension, configs in DIMENSION_CONFIGS.items() for cfg in configs}
+    # Upstream outputs of realistic length, so prompts are rendered as in a real run
+    fake_results = {node["id"]: "Upstream answer. " * 40 for node in nodes}
+
+    groups = {}
+    for node in nodes:
+        groups.setdefault(agent_of.get(node["id"], node["id"]), []).append(node)
+
+    results = {}
+    for agent, agent_nodes in groups.items():
+        first = agent_nodes[0]
+        configs = [node["config"] for node in agent_nodes]
+        problem, outputs = node_inputs(first, fake_results)
+        failures = []
+
+        def run_agent():
+            _, errors = fetch_configs_concurrently(configs, problem, outputs, postprocess=first["postprocess"])
+            failures.extend(error for error in errors.values() if error)
+
+        samples = time_call(run_agent, repeat)
+        results[f"agent.{agent}"] = summarize(samples, questions=len(configs), failures=len(failures))
+
+    failures = []
+
+    def run_full():
+        _, errors = run_pipeline(BENCH_PROBLEM, BENCH_ACCOUNT, BENCH_INDUSTRY)
+        failures.extend(error for error in errors.values() if error)
+
+    results["pipeline.full"] = summarize(time_call(run_full, repeat), nodes=len(nodes), failures=len(failures))
+
+    depth = {}
+    for node in nodes:  # build_pipeline lists every node after its dependencies
+        depth[node["id"]] = 1 + max((depth[dep] for dep in node["deps"]), default=0)
+    single_call = results["agent.vocabulary"]["median"]
+    results["pipeline.critical_path_floor"] = summarize([max(depth.values()) * single_call],
+                                                        levels=max(depth.values()))
+    return results
+
+
+# ================================
+# 🧹 Text Processing
+# ================================
+
+def _sample_answer(kb):
+    """Markdown answer of about kb KB, shaped like a dimension answer."""
+    block = (
+        "Q1. **Answer:** The company faces *frequent* changes in `demand` across regions.\n"
+        "- Supplier lead times: vary by season\n"
+        "- Regulation: new rules every quarter\n\n\n"
+        "### Key Takeaway: the industry is volatile. Score (0-5): 4\n"
+        "<p>See [the report](https://example.com) for details.</p>\n"
+    )
+    return (block * (kb * 1024 // len(block) + 1))[:kb * 1024]
+
+
+def bench_text(repeat):
+    """sanitize_text / format_dimension_answer time per KB of response."""
+    from text_utils import format_dimension_answer, sanitize_text
+
+    results = {}
+    for kb in TEXT_SIZES_KB:
+        base = _sample_answer(kb)
+        # A unique suffix per call keeps the memoised helpers from answering from cache
+        texts = iter(f"{base}\n{i}" for i in range(2 * repeat))
+        for name, fn in (
+            ("sanitize", lambda: sanitize_text(next(texts))),
+            ("format", lambda: format_dimension_answer(next(texts), BENCH_ACCOUNT, BENCH_INDUSTRY)),
+        ):
+            samples = [seconds / kb for seconds in time_call(fn, repeat)]
+            results[f"{name}.per_kb.{kb}kb"] = summarize(samples, unit="s/KB")
+    return results
+
+
+# ================================
+# 📝 Feedback & Admin Dashboard
+# ================================
+
+def _feedback_row(i):
+    return {
+        "Timestamp": f"2025-01-01 00:00:{i % 60:02d}",
+        "Employee_id": f"E{i:06d}",
+        "Feedback": "Useful analysis, a few definitions were off.",
+        "FeedbackType": "I have read it, found it useful, thanks.",
+        "Account": BENCH_ACCOUNT,
+        "Industry": BENCH_INDUSTRY,
+        "ProblemStatement": BENCH_PROBLEM,
+        "Agent": ("Vocabulary Agent", "Volatility Agent", "Hardness Agent")[i % 3],
+    }
+
+
+def bench_feedback(repeat, row_counts):
+    """Feedback submit and admin report load time against stores of growing size."""
+    import pandas as pd
+    from streamlit.logger import set_log_level
+
+    import feedback_store
+    from feedback_store import FEEDBACK_COLUMNS, CsvFeedbackStore, SqliteFeedbackStore
+    from shared_header import count_feedback_data, query_feedback_data, save_feedback_to_file
+
+    # Session state is used outside `streamlit run` here; keep its bare-mode warnings quiet
+    set_log_level("error")
+    results = {}
+    previous_store = feedback_store._store
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for backend in ("csv", "sqlite"):
+                for rows in row_counts:
+                    prefix = os.path.join(directory, f"{backend}-{rows}")
+                    store = (CsvFeedbackStore(f"{prefix}.csv") if backend == "csv"
+                             else SqliteFeedbackStore(f"{prefix}.db"))
+                    store.append([_feedback_row(i) for i in range(rows)])
+                    # The app reads the process-wide store; point it at this one
+                    feedback_store._store = store
+
+                    submission = pd.DataFrame([_feedback_row(rows)], columns=FEEDBACK_COLUMNS)
+                    results[f"feedback_submit.{backend}.{rows}"] = summarize(
+                        time_call(lambda: save_feedback_to_file(submission), repeat), rows=rows)
+                    results[f"admin_load.{backend}.{rows}"] = summarize(
+                        time_call(lambda: (count_feedback_data(), query_feedback_data()), repeat), rows=rows)
+    finally:
+        feedback_store._store = previous_store
+    return results
+
+
+# ================================
+# 📊 Comparison
+# ================================
+
+def compare(old, new, threshold):
+    """Rows of (metric, old median, new median, ratio, regressed?) for metrics in both runs."""
+    rows = []
+    for name, result in sorted(new["results"].items()):
+        before = old["results"].get(name)
+        if not before or not before["median"]:
+            continue
+        ratio = result["median"] / before["median"]
+        rows.append((name, before["median"], result["median"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def print_comparison(rows, threshold):
+    print(f"{'metric':<40} {'old':>12} {'new':>12} {'change':>8}", file=sys.stderr)
+    for name, before, after, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<40} {before:>12.6f} {after:>12.6f} {ratio - 1:>+7.1%}{flag}", file=sys.stderr)
+    regressions = sum(1 for row in rows if row[4])
+    print(f"{regressions} of {len(rows)} metrics slower than +{threshold:.0%}", file=sys.stderr)
+    return regressions
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ================================
+# 🚀 Runner
+# ================================
+
+def run_benchmarks(args):
+    config = MockConfig.from_dict({"latency": args.latency, "chunk_delay": 0}, seed=args.seed)
+    server, base_url = start_in_thread(config)
+    os.environ["REASONING_API_BASE"] = base_url
+    for name, value in BENCH_ENVIRONMENT.items():
+        os.environ.setdefault(name, value)
+
+    try:
+        results = {}
+        suites = args.suites.split(",")
+        if "agents" in suites:
+            print("Benchmarking agents and the full pipeline...", file=sys.stderr)
+            results.update(bench_agents(args.repeat))
+        if "text" in suites:
+            print("Benchmarking text processing...", file=sys.stderr)
+            results.update(bench_text(max(args.repeat, 20)))
+        if "feedback" in suites:
+            print("Benchmarking feedback and the admin dashboard...", file=sys.stderr)
+            results.update(bench_feedback(args.repeat, [int(n) for n in args.feedback_rows.split(",")]))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "mock_latency": args.latency,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipeline against the mock reasoning API.")
+    parser.add_argument("-o", "--output", help="write results as JSON here (default: stdout)")
+    parser.add_argument("--compare", nargs="+", metavar="RUN",
+                        help="baseline run to compare against; with two files, compare them without running")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown that counts as a regression")
+    parser.add_argument("--repeat", type=int, default=5, help="samples per metric")
+    parser.add_argument("--suites", default="agents,text,feedback", help="comma-separated subset to run")
+    parser.add_argument("--latency", default="fixed:0.05", help="mock latency spec (see mock_reasoning_server.py)")
+    parser.add_argument("--feedback-rows", default="100,1000,10000", help="feedback store sizes")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes a baseline run, or two runs to compare")
+    if args.compare and len(args.compare) == 2:
+        old, new = (_load(path) for path in args.compare)
+    else:
+        new = run_benchmarks(args)
+        text = json.dumps(new, indent=2)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+            print(f"Wrote {args.output}", file=sys.stderr)
+        else:
+            print(text)
+        if not args.compare:
+            return
+        old = _load(args.compare[0])
+
+    if print_comparison(compare(old, new, args.threshold), args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Change detection between the analysed problem and the saved one.
+Every agent output is fingerprinted with the problem it was produced for and the
+upstream outputs it was given. When the saved problem is edited, the edit is
+classified with a word-level difflib comparison: whitespace, case, punctuation and
+typo fixes are cosmetic and (in quick mode) keep the existing results; anything else
+makes every output stale. An output also goes stale when an upstream output it was
+built from changes, so re-running the Vocabulary agent only invalidates the agents
+that consumed a vocabulary that is now different.
+"""
+import hashlib
+import json
+import re
+from difflib import SequenceMatcher
+
+import streamlit as st
+
+from pipeline import AGENT_SESSION_KEYS
+from settings import read_setting
+
+# ================================
+# ⚙️ Change Detection Configuration
+# ================================
+
+# Keep existing results after a cosmetic edit instead of invalidating them
+QUICK_MODE = str(read_setting("REANALYSIS_QUICK_MODE", "true")).lower() in ("1", "true", "yes")
+# Word-level similarity below which an edit is always substantive
+COSMETIC_MIN_SIMILARITY = float(read_setting("REANALYSIS_COSMETIC_SIMILARITY", 0.8))
+# Character similarity for a replaced word to count as a typo fix
+TYPO_MIN_SIMILARITY = 0.8
+# At most this many words may change in a cosmetic edit
+COSMETIC_MAX_CHANGED_WORDS = 3
+
+# Upstream outputs each agent's prompt is built from (mirrors pipeline.build_pipeline)
+AGENT_DEPENDENCIES = {
+    "vocabulary": (),
+    "current_system": ("vocabulary",),
+    "volatility": ("vocabulary", "current_system"),
+    "ambiguity": (),
+    "interconnectedness": ("vocabulary", "current_system"),
+    "uncertainty": ("vocabulary", "current_system"),
+    "hardness_summary": ("vocabulary", "current_system", "volatility", "ambiguity", "interconnectedness",
+                         "uncertainty"),
+}
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize_problem_text(value):
+    """Case- and whitespace-insensitive form of an account, industry or problem."""
+    return " ".join(str(value or "").split()).casefold()
+
+
+# ================================
+# ✏️ Edit Classification
+# ================================
+
+def classify_edit(old, new):
+    """
+    ("identical" | "cosmetic" | "substantive", word-level similarity) for a problem edit.
+    - identical: only whitespace or case changed
+    - cosmetic: punctuation changed, or at most a few words were replaced by close
+      spellings (typo fixes); no word was added or removed
+    """
+    if normalize_problem_text(old) == normalize_problem_text(new):
+        return "identical", 1.0
+    old_words = _WORD.findall(normalize_problem_text(old))
+    new_words = _WORD.findall(normalize_problem_text(new))
+    if old_words == new_words:
+        return "cosmetic", 1.0
+
+    matcher = SequenceMatcher(None, old_words, new_words, autojunk=False)
+    # Cheap upper bounds first: most substantive edits stop here
+    if matcher.real_quick_ratio() < COSMETIC_MIN_SIMILARITY or matcher.quick_ratio() < COSMETIC_MIN_SIMILARITY:
+        return "substantive", matcher.quick_ratio()
+    similarity = matcher.ratio()
+    if similarity < COSMETIC_MIN_SIMILARITY:
+        return "substantive", similarity
+
+    changed = 0
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        if tag != "replace":
+            return "substantive", similarity
+        before, after = "".join(old_words[i1:i2]), "".join(new_words[j1:j2])
+        if SequenceMatcher(None, before, after).ratio() < TYPO_MIN_SIMILARITY:
+            return "substantive", similarity
+        changed += max(i2 - i1, j2 - j1)
+    if changed > COSMETIC_MAX_CHANGED_WORDS:
+        return "substantive", similarity
+    return "cosmetic", similarity
+
+
+def classify_problem_edit(old, new):
+    """classify_edit for (account, industry, problem) triples; a new account or industry is always substantive."""
+    if any(normalize_problem_text(a) != normalize_problem_text(b) for a, b in zip(old[:2], new[:2])):
+        return "substantive", 0.0
+    return classify_edit(old[2], new[2])
+
+
+# ================================
+# 🧬 Output Fingerprints
+# ================================
+
+def _digest(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def _saved_problem():
+    return (
+        st.session_state.get("saved_account", ""),
+        st.session_state.get("saved_industry", ""),
+        st.session_state.get("saved_problem", ""),
+    )
+
+
+def _basis():
+    """The (account, industry, problem) the session's outputs were produced for."""
+    basis = st.session_state.get("analysis_basis")
+    return tuple(basis) if basis else None
+
+
+def _fingerprint(agent, basis):
+    """Hash of the problem identity and the current upstream outputs an agent depends on."""
+    upstream = [st.session_state.get(AGENT_SESSION_KEYS[dep][0]) for dep in AGENT_DEPENDENCIES[agent]]
+    return _digest([[normalize_problem_text(part) for part in basis], upstream])
+
+
+def mark_analysed(*agents, rebase=False):
+    """
+    Record that agents' current outputs were produced for the analysed problem
+    (the saved problem, when nothing was analysed yet or rebase is set).
+    """
+    if rebase or _basis() is None:
+        st.session_state.analysis_basis = _saved_problem()
+    basis = _basis()
+    fingerprints = st.session_state.setdefault("analysis_fingerprints", {})
+    for agent in agents:
+        fingerprints[agent] = _fingerprint(agent, basis)
+
+
+def stale_agents():
+    """Agents whose output no longer matches the analysed problem or their upstream outputs."""
+    basis = _basis()
+    fingerprints = st.session_state.get("analysis_fingerprints") or {}
+    if basis is None:
+        return []
+    return [
+        agent for agent, fingerprint in fingerprints.items()
+        if st.session_state.get(AGENT_SESSION_KEYS[agent][0]) and _fingerprint(agent, basis) != fingerprint
+    ]
+
+
+def invalidate_stale_outputs():
+    """
+    Drop stale outputs from the session. Agents are checked upstream first, so dropping
+    an output also invalidates everything built from it. Returns the dropped agents.
+    """
+    basis = _basis()
+    fingerprints = st.session_state.get("analysis_fingerprints") or {}
+    dropped = []
+    if basis is None:
+        return dropped
+    for agent in AGENT_DEPENDENCIES:
+        outputs_key, show_key = AGENT_SESSION_KEYS[agent]
+        if agent in fingerprints and st.session_state.get(outputs_key) \
+                and _fingerprint(agent, basis) != fingerprints[agent]:
+            # Keep the type the pages expect ({} for question dicts, "" for text)
+            st.session_state[outputs_key] = {} if isinstance(st.session_state.get(outputs_key), dict) else ""
+            st.session_state[show_key] = False
+            del fingerprints[agent]
+            dropped.append(agent)
+    return dropped
+
+
+def note_problem_saved(new):
+    """
+    Classify a save of the problem details against the analysed problem.
+    Cosmetic edits keep the analysed basis in quick mode; anything else rebases it,
+    which makes every existing output stale. Returns the classification.
+    """
+    basis = _basis()
+    if basis is None:
+        return "identical"
+    kind, similarity = classify_problem_edit(basis, new)
+    if kind == "cosmetic" and QUICK_MODE:
+        st.session_state.quick_edit_similarity = similarity
+    else:
+        st.session_state.pop("quick_edit_similarity", None)
+        if kind == "substantive":
+            st.session_state.analysis_basis = tuple(new)
+    return kind
+
+
+def discard_quick_edit():
+    """Treat the last cosmetic edit as substantive: every existing output becomes stale."""
+    st.session_state.pop("quick_edit_similarity", None)
+    st.session_state.analysis_basis = _saved_problem()
@@ -0,0 +1,468 @@
+"""
+Feedback storage backends.
+- CSV: append-only feedback.csv. Each submission appends one row under a file lock instead
+  of reading the whole file and writing it back.
+- SQLite (default): WAL-mode database with indexes on Agent, FeedbackType, Account and
+  Timestamp, so admin filters are indexed queries and writers never block readers.
+  The first open imports the existing feedback.csv.
+Pick the backend with FEEDBACK_BACKEND=sqlite|csv.
+Every row is stored in the canonical FEEDBACK_COLUMNS schema; older rows written by the
+agent pages under their own column names are rewritten once by normalize().
+
+    python feedback_store.py import feedback.csv   # load a CSV into the active store
+    python feedback_store.py export out.csv        # dump the active store to CSV
+    python feedback_store.py normalize             # rewrite legacy rows to the canonical schema
+"""
+import argparse
+import csv
+import math
+import os
+import sqlite3
+import threading
+
+from settings import read_setting
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
+# ================================
+# 🔒 File Locking
+# ================================
+
+_process_lock = threading.Lock()
+
+
+class _FileLock:
+    """Exclusive lock on <path>.lock, shared by every thread and process writing path."""
+
+    def __init__(self, path):
+        self.lock_path = f"{path}.lock"
+        self._handle = None
+
+    def __enter__(self):
+        _process_lock.acquire()
+        if fcntl is not None:
+            try:
+                self._handle = open(self.lock_path, "a")
+                fcntl.flock(self._handle, fcntl.LOCK_EX)
+            except Exception:
+                _process_lock.release()
+                raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if self._handle is not None:
+                fcntl.flock(self._handle, fcntl.LOCK_UN)
+                self._handle.close()
+                self._handle = None
+        finally:
+            _process_lock.release()
+
+
+# ================================
+# 📝 CSV Append Writer
+# ================================
+
+def _read_header(path):
+    """Column names of an existing CSV (first line only), or [] if missing/empty."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return []
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+def _missing_trailing_newline(path):
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return False
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) not in (b"\n", b"\r")
+
+
+def _rewrite_with_header(path, header):
+    """
+    One-off upgrade when a row brings columns the file does not have yet.
+    Streams the file into a temp copy with the wider header and swaps it in atomically.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(path, newline="", encoding="utf-8") as src, \
+            open(tmp_path, "w", newline="", encoding="utf-8") as dst:
+        reader = csv.DictReader(src)
+        writer = csv.DictWriter(dst, fieldnames=header, extrasaction="ignore", lineterminator="\n")
+        writer.writeheader()
+        for row in reader:
+            writer.writerow(row)
+    os.replace(tmp_path, path)
+
+
+def append_feedback_rows(path, rows, columns=None):
+    """
+    Append rows (dicts) to the feedback CSV at path.
+    - columns: preferred column order when the file has to be created
+    Only the header line is read. The file is rewritten only in the rare case a row
+    carries a column the header lacks. Raises OSError/PermissionError like open() does,
+    so callers can keep their session-state fallback.
+    """
+    rows = [{k: ("" if v is None else v) for k, v in row.items()} for row in rows]
+    if not rows:
+        return
+
+    with _FileLock(path):
+        header = _read_header(path)
+        wanted = list(header or columns or [])
+        for row in rows:
+            for key in row:
+                if key not in wanted:
+                    wanted.append(key)
+
+        if not header:
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                csv.DictWriter(f, fieldnames=wanted, lineterminator="\n").writeheader()
+        elif wanted != header:
+            _rewrite_with_header(path, wanted)
+
+        needs_newline = _missing_trailing_newline(path)
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            if needs_newline:
+                f.write("\n")
+            writer = csv.DictWriter(f, fieldnames=wanted, extrasaction="ignore", lineterminator="\n")
+            writer.writerows(rows)
+            f.flush()
+
+
+def _read_csv_rows(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return [], []
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        return list(reader.fieldnames or []), list(reader)
+
+
+def _write_csv_rows(path_or_file, columns, rows):
+    if hasattr(path_or_file, "write"):
+        writer = csv.DictWriter(path_or_file, fieldnames=columns, extrasaction="ignore", lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+        return
+    with open(path_or_file, "w", newline="", encoding="utf-8") as f:
+        _write_csv_rows(f, columns, rows)
+
+
+# ================================
+# 🗂️ Storage Backends
+# ================================
+
+# Canonical feedback columns, in display order
+FEEDBACK_COLUMNS = ["Timestamp", "Employee_id", "Feedback", "FeedbackType", "OffDefinitions",
+                    "Suggestions", "Account", "Industry", "ProblemStatement", "Agent"]
+# Columns admin views filter on
+INDEXED_COLUMNS = ["Agent", "FeedbackType", "Account", "Timestamp"]
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Column names older page versions wrote, keyed by lower-cased name without spaces/underscores
+FEEDBACK_COLUMN_ALIASES = {
+    "employeeid": "Employee_id",
+    "userid": "Employee_id",
+    "feedbacktext": "Feedback",
+    "additionalfeedback": "Feedback",
+    "problem": "ProblemStatement",
+    "problemstatement": "ProblemStatement",
+}
+
+
+def _alias_key(name):
+    return str(name).strip().lower().replace("_", "").replace(" ", "")
+
+
+_CANONICAL_KEYS = {_alias_key(c): c for c in FEEDBACK_COLUMNS}
+
+
+def _clean_value(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value)
+
+
+def normalize_feedback_row(row):
+    """
+    Map one feedback row (dict) onto FEEDBACK_COLUMNS.
+    - EmployeeID / employee_id / user_id become Employee_id
+    - the Ambiguity page's Name/Email pair becomes Employee_id ("Name <email>")
+    - columns outside the schema are dropped
+    """
+    normalized = {c: "" for c in FEEDBACK_COLUMNS}
+    name = email = ""
+    for key, value in row.items():
+        if not key:
+            continue
+        value = _clean_value(value)
+        alias = _alias_key(key)
+        column = _CANONICAL_KEYS.get(alias) or FEEDBACK_COLUMN_ALIASES.get(alias)
+        if column:
+            normalized[column] = normalized[column] or value
+        elif alias == "name":
+            name = value.strip()
+        elif alias == "email":
+            email = value.strip()
+    if not normalized["Employee_id"] and (name or email):
+        normalized["Employee_id"] = f"{name} <{email}>" if name and email else (name or email)
+    return normalized
+
+
+class CsvFeedbackStore:
+    """feedback.csv with append-only writes; queries scan the file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def append(self, rows):
+        self.normalize()
+        append_feedback_rows(self.path, [normalize_feedback_row(row) for row in rows], columns=FEEDBACK_COLUMNS)
+
+    def normalize(self):
+        """Rewrite the file in the canonical schema if its header is anything else. Returns rows rewritten."""
+        if _read_header(self.path) in ([], FEEDBACK_COLUMNS):
+            return 0
+        with _FileLock(self.path):
+            columns, rows = _read_csv_rows(self.path)
+            if columns == FEEDBACK_COLUMNS:
+                return 0
+            tmp_path = f"{self.path}.tmp"
+            _write_csv_rows(tmp_path, FEEDBACK_COLUMNS, [normalize_feedback_row(row) for row in rows])
+            os.replace(tmp_path, self.path)
+        return len(rows)
+
+    def columns(self):
+        return _read_header(self.path)
+
+    def query(self, agent=None, feedback_type=None, account=None, limit=None):
+        """Rows (dicts) matching every given filter, oldest first."""
+        _, rows = _read_csv_rows(self.path)
+        filters = {"Agent": agent, "FeedbackType": feedback_type, "Account": account}
+        matched = [row for row in rows if all(v is None or row.get(k) == v for k, v in filters.items())]
+        return matched[-limit:] if limit else matched
+
+    def count(self, agent=None, feedback_type=None, account=None):
+        return len(self.query(agent, feedback_type, account))
+
+    def clear(self):
+        """Drop every row but keep the header."""
+        with _FileLock(self.path):
+            columns = _read_header(self.path)
+            if columns:
+                _write_csv_rows(self.path, columns, [])
+
+    def export_csv(self, path_or_file):
+        columns, rows = _read_csv_rows(self.path)
+        _write_csv_rows(path_or_file, columns or FEEDBACK_COLUMNS, rows)
+
+    def import_csv(self, path):
+        _, rows = _read_csv_rows(path)
+        self.append(rows)
+        return len(rows)
+
+
+class SqliteFeedbackStore:
+    """
+    SQLite feedback table in WAL mode, in the canonical FEEDBACK_COLUMNS schema.
+    Every filter column is indexed.
+    """
+
+    def __init__(self, path, legacy_csv=None):
+        self.path = path
+        self.legacy_csv = legacy_csv
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._columns = None
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._init_schema(conn)
+        return conn
+
+    def _init_schema(self, conn):
+        with self._schema_lock:
+            column_sql = ", ".join(f'"{c}" TEXT' for c in FEEDBACK_COLUMNS)
+            conn.execute(f"CREATE TABLE IF NOT EXISTS feedback (id INTEGER PRIMARY KEY AUTOINCREMENT, {column_sql})")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            for column in INDEXED_COLUMNS:
+                conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_feedback_{column}" ON feedback("{column}")')
+            conn.commit()
+            self._columns = None
+        self._migrate_legacy_csv(conn)
+        self._normalize_once(conn)
+
+    def _migrate_legacy_csv(self, conn):
+        """Import the pre-SQLite feedback.csv once."""
+        if not self.legacy_csv or not os.path.exists(self.legacy_csv):
+            return
+        # IMMEDIATE takes the write lock up front so two first-time openers cannot both import
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            done = conn.execute("SELECT value FROM meta WHERE key = 'migrated_csv'").fetchone()
+            if not done:
+                _, rows = _read_csv_rows(self.legacy_csv)
+                self._insert(conn, rows)
+                conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_csv', ?)", (self.legacy_csv,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _normalize_once(self, conn):
+        """Run normalize() the first time this database is opened by a schema-aware version."""
+        if conn.execute("SELECT value FROM meta WHERE key = 'normalized_schema'").fetchone():
+            return
+        self._normalize(conn)
+
+    def normalize(self):
+        """Rebuild the table with only the canonical columns, mapping legacy ones. Returns rows rewritten."""
+        return self._normalize(self._conn())
+
+    def _normalize(self, conn):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT value FROM meta WHERE key = 'normalized_schema'").fetchone() \
+                    and self._table_columns(conn) == FEEDBACK_COLUMNS:
+                conn.commit()
+                return 0
+            rows = [dict(row) for row in conn.execute("SELECT * FROM feedback ORDER BY id").fetchall()]
+            column_defs = ", ".join(f'"{c}" TEXT' for c in FEEDBACK_COLUMNS)
+            column_sql = ", ".join(f'"{c}"' for c in FEEDBACK_COLUMNS)
+            placeholders = ", ".join("?" for _ in FEEDBACK_COLUMNS)
+            conn.execute("DROP TABLE IF EXISTS feedback_normalized")
+            conn.execute(f"CREATE TABLE feedback_normalized (id INTEGER PRIMARY KEY AUTOINCREMENT, {column_defs})")
+            conn.executemany(
+                f"INSERT INTO feedback_normalized (id, {column_sql}) VALUES (?, {placeholders})",
+                [(row["id"],) + tuple(normalize_feedback_row(row)[c] for c in FEEDBACK_COLUMNS) for row in rows],
+            )
+            conn.execute("DROP TABLE feedback")
+            conn.execute("ALTER TABLE feedback_normalized RENAME TO feedback")
+            for column in INDEXED_COLUMNS:
+                conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_feedback_{column}" ON feedback("{column}")')
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('normalized_schema', '1')")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        with self._schema_lock:
+            self._columns = None
+        return len(rows)
+
+    @staticmethod
+    def _table_columns(conn):
+        return [row["name"] for row in conn.execute("PRAGMA table_info(feedback)").fetchall() if row["name"] != "id"]
+
+    def columns(self):
+        if self._columns is None:
+            self._columns = self._table_columns(self._conn())
+        return list(self._columns)
+
+    def _insert(self, conn, rows):
+        rows = [normalize_feedback_row(row) for row in rows]
+        if not rows:
+            return
+        column_sql = ", ".join(f'"{c}"' for c in FEEDBACK_COLUMNS)
+        placeholders = ", ".join("?" for _ in FEEDBACK_COLUMNS)
+        conn.executemany(
+            f"INSERT INTO feedback ({column_sql}) VALUES ({placeholders})",
+            [tuple(row[c] for c in FEEDBACK_COLUMNS) for row in rows],
+        )
+
+    def append(self, rows):
+        conn = self._conn()
+        with conn:
+            self._insert(conn, rows)
+
+    def _where(self, agent, feedback_type, account):
+        clauses, params = [], []
+        for column, value in (("Agent", agent), ("FeedbackType", feedback_type), ("Account", account)):
+            if value is not None:
+                clauses.append(f'"{column}" = ?')
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, agent=None, feedback_type=None, account=None, limit=None):
+        """Rows (dicts) matching every given filter, oldest first; uses the column indexes."""
+        where, params = self._where(agent, feedback_type, account)
+        columns = self.columns()
+        column_sql = ", ".join(f'"{c}"' for c in columns)
+        sql = f"SELECT {column_sql} FROM feedback{where} ORDER BY id"
+        if limit:
+            sql = f"SELECT * FROM (SELECT id, {column_sql} FROM feedback{where} ORDER BY id DESC LIMIT ?) ORDER BY id"
+            params = params + [int(limit)]
+        rows = self._conn().execute(sql, params).fetchall()
+        return [{c: ("" if row[c] is None else row[c]) for c in columns} for row in rows]
+
+    def count(self, agent=None, feedback_type=None, account=None):
+        where, params = self._where(agent, feedback_type, account)
+        return self._conn().execute(f"SELECT COUNT(*) FROM feedback{where}", params).fetchone()[0]
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM feedback")
+
+    def export_csv(self, path_or_file):
+        _write_csv_rows(path_or_file, self.columns(), self.query())
+
+    def import_csv(self, path):
+        _, rows = _read_csv_rows(path)
+        self.append(rows)
+        return len(rows)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_feedback_store():
+    """Process-wide feedback store selected by FEEDBACK_BACKEND (sqlite by default)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                csv_path = read_setting("FEEDBACK_CSV_PATH", os.path.join(BASE_DIR, "feedback.csv"))
+                backend = str(read_setting("FEEDBACK_BACKEND", "sqlite")).lower()
+                if backend == "csv":
+                    _store = CsvFeedbackStore(csv_path)
+                else:
+                    db_path = read_setting("FEEDBACK_DB_PATH", os.path.join(BASE_DIR, "feedback.db"))
+                    _store = SqliteFeedbackStore(db_path, legacy_csv=csv_path)
+    return _store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import, export or normalize feedback in the configured store.")
+    parser.add_argument("action", choices=["import", "export", "normalize"])
+    parser.add_argument("path", nargs="?", help="CSV file to read (import) or write (export)")
+    args = parser.parse_args(argv)
+    if args.action != "normalize" and not args.path:
+        parser.error(f"{args.action} needs a CSV path")
+
+    store = get_feedback_store()
+    if args.action == "normalize":
+        print(f"Rewrote {store.normalize()} rows in {type(store).__name__} to the canonical schema")
+    elif args.action == "import":
+        print(f"Imported {store.import_csv(args.path)} rows into {type(store).__name__}")
+    else:
+        store.export_csv(args.path)
+        print(f"Exported {store.count()} rows to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Hedged requests for the slow tail of reasoning API calls.
+Latency is tracked per agency_id. When hedging is on and a call has not answered by
+that agency's observed p90, a duplicate is sent and the first success wins; the other
+call is cancelled (streamed answers stop being read and their connection is closed,
+a plain JSON answer is simply discarded). Each user has a hedge budget, so duplicates
+stay a small fraction of the load they put on the upstream.
+"""
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from resilience import endpoint_name
+from settings import read_setting
+
+# ================================
+# ⚙️ Hedging Configuration
+# ================================
+
+HEDGING_ENABLED = str(read_setting("REASONING_HEDGING", "false")).lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = float(read_setting("REASONING_HEDGE_PERCENTILE", 0.9))
+# No hedging for an agency until this many latencies have been seen
+HEDGE_MIN_SAMPLES = int(read_setting("REASONING_HEDGE_MIN_SAMPLES", 20))
+# Never hedge earlier than this, whatever the percentile says
+HEDGE_MIN_DELAY_SECONDS = float(read_setting("REASONING_HEDGE_MIN_DELAY_SECONDS", 5))
+# Per user: hedges allowed = burst + ratio * calls made
+HEDGE_BUDGET_RATIO = float(read_setting("REASONING_HEDGE_BUDGET_RATIO", 0.1))
+HEDGE_BUDGET_BURST = int(read_setting("REASONING_HEDGE_BUDGET_BURST", 2))
+HEDGE_WORKERS = int(read_setting("REASONING_HEDGE_WORKERS", 32))
+
+LATENCY_WINDOW = 200
+MAX_TRACKED_BUDGETS = 1000
+
+
+class HedgeCancelled(Exception):
+    """Raised inside the losing call of a hedged pair to stop reading its answer."""
+
+
+# ================================
+# 📈 Latency Tracking
+# ================================
+
+_latencies = {}
+_latencies_lock = threading.Lock()
+
+
+def record_latency(url, seconds):
+    """Remember how long a successful upstream call to url's agency took."""
+    name = endpoint_name(url)
+    with _latencies_lock:
+        window = _latencies.get(name)
+        if window is None:
+            window = _latencies[name] = deque(maxlen=LATENCY_WINDOW)
+        window.append(seconds)
+
+
+def latency_percentile(url, q):
+    """q-quantile of the recent latencies of url's agency, or None with too few samples."""
+    with _latencies_lock:
+        samples = sorted(_latencies.get(endpoint_name(url), ()))
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return None
+    return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+
+def hedge_delay(url):
+    """Seconds to wait before hedging a call to url, or None when it should not be hedged."""
+    p = latency_percentile(url, HEDGE_PERCENTILE)
+    return None if p is None else max(p, HEDGE_MIN_DELAY_SECONDS)
+
+
+def get_latency_stats():
+    """Sample count, p50 and p90 per agency_id."""
+    with _latencies_lock:
+        windows = {name: sorted(window) for name, window in _latencies.items()}
+    return {
+        name: {
+            "samples": len(samples),
+            "p50": samples[len(samples) // 2],
+            "p90": samples[min(int(0.9 * len(samples)), len(samples) - 1)],
+        }
+        for name, samples in windows.items() if samples
+    }
+
+
+# ================================
+# 💰 Per-user Hedge Budget
+# ================================
+
+class HedgeBudget:
+    """Allows burst + ratio * calls hedges for one user."""
+
+    def __init__(self, ratio=HEDGE_BUDGET_RATIO, burst=HEDGE_BUDGET_BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def note_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def try_spend(self):
+        with self._lock:
+            if self.hedges < self.burst + self.ratio * self.calls:
+                self.hedges += 1
+                return True
+            return False
+
+    def note_win(self):
+        with self._lock:
+            self.hedge_wins += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {"calls": self.calls, "hedges": self.hedges, "hedge_wins": self.hedge_wins}
+
+
+_budgets = OrderedDict()
+_budgets_lock = threading.Lock()
+
+
+def get_hedge_budget(user_key):
+    """
+    The hedge budget of one user (e.g. the browser session id), or None when hedging is off.
+    Only the most recently used MAX_TRACKED_BUDGETS users are remembered.
+    """
+    if not HEDGING_ENABLED:
+        return None
+    with _budgets_lock:
+        budget = _budgets.get(user_key)
+        if budget is None:
+            budget = _budgets[user_key] = HedgeBudget()
+            while len(_budgets) > MAX_TRACKED_BUDGETS:
+                _budgets.popitem(last=False)
+        else:
+            _budgets.move_to_end(user_key)
+    return budget
+
+
+# ================================
+# 🏁 Hedged Execution
+# ================================
+
+_hedge_executor = None
+_hedge_lock = threading.Lock()
+
+
+def _get_hedge_executor():
+    global _hedge_executor
+    if _hedge_executor is None:
+        with _hedge_lock:
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="reasoning-hedge")
+    return _hedge_executor
+
+
+def run_hedged(attempt, delay, budget):
+    """
+    Run attempt(cancelled, primary) and, if it has not finished after delay seconds and
+    budget allows, a second attempt(cancelled, primary=False) alongside it.
+    - attempt: returns (data, error_message) and never raises; it should stop reading
+      once its cancelled Event is set (e.g. by raising HedgeCancelled from its stream callback)
+    Returns the first successful outcome, or the primary's failure when both fail.
+    """
+    executor = _get_hedge_executor()
+    primary_cancel = threading.Event()
+    primary = executor.submit(attempt, primary_cancel, True)
+    cancels = {primary: primary_cancel}
+
+    done, _ = wait([primary], timeout=delay)
+    if not done and budget.try_spend():
+        hedge_cancel = threading.Event()
+        cancels[executor.submit(attempt, hedge_cancel, False)] = hedge_cancel
+
+    pending = set(cancels)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            data, error = future.result()
+            if error is None:
+                for other in pending:
+                    cancels[other].set()
+                if future is not primary:
+                    budget.note_win()
+                return data, error
+    return primary.result()
@@ -0,0 +1,279 @@
+"""
+Background analysis jobs.
+Agent pages submit their API work here instead of running it inside the button-press
+rerun, so an analysis keeps going when the user touches a widget or switches pages.
+Jobs live in a process-wide registry keyed by (session, problem hash, agent); pages
+poll the registry on each rerun and pick up finished results for the problem that is
+on screen, dropping any left over from before the problem was edited.
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from api_client import queue_message, stream_preview
+from change_detection import normalize_problem_text
+from hedging import get_hedge_budget
+from settings import read_setting
+
+# ================================
+# ⚙️ Job Configuration
+# ================================
+
+JOB_WORKERS = int(read_setting("ANALYSIS_JOB_WORKERS", 8))
+JOB_POLL_SECONDS = float(read_setting("ANALYSIS_JOB_POLL_SECONDS", 2))
+# Finished jobs nobody picked up are dropped after this long
+JOB_RETENTION_SECONDS = float(read_setting("ANALYSIS_JOB_RETENTION_SECONDS", 3600))
+# How often streamed partial answers are redrawn while a page waits for its job
+JOB_STREAM_REFRESH_SECONDS = float(read_setting("ANALYSIS_JOB_STREAM_REFRESH_SECONDS", 0.3))
+
+# ================================
+# 🧵 Job Registry
+# ================================
+
+
+class AnalysisJob:
+    """One background analysis; fn(on_progress, on_partial, on_queue) runs on the job pool."""
+
+    def __init__(self, key, fn, problem_key=None):
+        self.key = key
+        self.fn = fn
+        # Account, industry and problem the user had entered when the job was submitted
+        self.problem_key = problem_key
+        self.status = "pending"  # pending -> running -> done | failed
+        self.progress = (0, 0)
+        # Streamed text of answers still arriving, by question name
+        self.partials = {}
+        # Rate-limit queue position of questions not sent yet, by question name
+        self.queue_positions = {}
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+
+    def set_progress(self, done, total):
+        self.progress = (done, total)
+
+    def set_partial(self, name, text):
+        self.partials[name] = text
+
+    def set_queue_position(self, name, position):
+        if position:
+            self.queue_positions[name] = position
+        else:
+            self.queue_positions.pop(name, None)
+
+    def run(self):
+        self.status = "running"
+        try:
+            self.result = self.fn(self.set_progress, self.set_partial, self.set_queue_position)
+            self.status = "done"
+        except Exception as e:
+            self.error = str(e)
+            self.status = "failed"
+        finally:
+            self.finished_at = time.time()
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    @property
+    def fraction(self):
+        done, total = self.progress
+        return (done / total) if total else 0.0
+
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+_job_executor = None
+
+
+def _get_job_executor():
+    global _job_executor
+    if _job_executor is None:
+        with _jobs_lock:
+            if _job_executor is None:
+                _job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="analysis-job")
+    return _job_executor
+
+
+def _prune_jobs():
+    cutoff = time.time() - JOB_RETENTION_SECONDS
+    for key in [k for k, job in _jobs.items() if job.finished and job.finished_at < cutoff]:
+        del _jobs[key]
+
+
+def problem_hash(problem, outputs=None):
+    """Stable hash of everything that goes into an agent's prompts."""
+    payload = json.dumps([problem, outputs or {}], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def submit_job(session_id, phash, agent, fn, problem_key=None):
+    """
+    Start fn(on_progress, on_partial, on_queue) in the background unless the same job is already queued or running.
+    Returns the AnalysisJob registered under (session_id, phash, agent).
+    """
+    key = (session_id, phash, agent)
+    with _jobs_lock:
+        _prune_jobs()
+        job = _jobs.get(key)
+        if job is not None and not job.finished:
+            return job
+        job = _jobs[key] = AnalysisJob(key, fn, problem_key)
+    _get_job_executor().submit(job.run)
+    return job
+
+
+def find_job(session_id, agent, problem_key=None):
+    """
+    Most recent job of this session for agent. With problem_key, only jobs submitted
+    for that problem count; otherwise any problem does.
+    """
+    with _jobs_lock:
+        matches = [
+            job for (sid, _, name), job in _jobs.items()
+            if sid == session_id and name == agent and (problem_key is None or job.problem_key == problem_key)
+        ]
+    return max(matches, key=lambda job: job.submitted_at) if matches else None
+
+
+def discard_stale_jobs(session_id, agent, problem_key):
+    """Drop this session's finished jobs for agent that were submitted for another problem."""
+    with _jobs_lock:
+        for key in [
+            k for k, job in _jobs.items()
+            if k[0] == session_id and k[2] == agent and job.finished and job.problem_key != problem_key
+        ]:
+            del _jobs[key]
+
+
+def discard_job(job):
+    """Remove a job from the registry once its results have been picked up."""
+    with _jobs_lock:
+        if _jobs.get(job.key) is job:
+            del _jobs[job.key]
+
+
+def get_job_stats():
+    """Counts of registered jobs by status."""
+    with _jobs_lock:
+        statuses = [job.status for job in _jobs.values()]
+    return {status: statuses.count(status) for status in ("pending", "running", "done", "failed")}
+
+
+# ================================
+# 🖥️ Streamlit Helpers
+# ================================
+
+def current_session_id():
+    """Id of the browser session; shared by every page the user visits."""
+    if "analysis_session_id" not in st.session_state:
+        st.session_state.analysis_session_id = uuid.uuid4().hex
+    return st.session_state.analysis_session_id
+
+
+def current_problem_key():
+    """
+    Hash of the account, industry and problem currently entered in this session,
+    ignoring case and whitespace; jobs only apply to the problem they were run for.
+    """
+    fields = [
+        st.session_state.get(name, st.session_state.get(saved, ""))
+        for name, saved in (
+            ("business_account", "saved_account"),
+            ("business_industry", "saved_industry"),
+            ("business_problem", "saved_problem"),
+        )
+    ]
+    return problem_hash([normalize_problem_text(value) for value in fields])
+
+
+def session_hedge_budget():
+    """This session's hedge budget for slow calls (None unless REASONING_HEDGING is on)."""
+    return get_hedge_budget(current_session_id())
+
+
+def submit_agent_job(agent, problem, outputs, fn):
+    """Submit a job for the current session; problem and outputs identify the analysis."""
+    return submit_job(current_session_id(), problem_hash(problem, outputs), agent, fn, current_problem_key())
+
+
+def take_finished_job(agent):
+    """
+    Return this session's finished job for agent and remove it from the registry,
+    or None while nothing has finished. Call once per rerun before rendering results.
+    Finished jobs for a problem the user has since edited are dropped, not returned.
+    """
+    session_id, problem_key = current_session_id(), current_problem_key()
+    discard_stale_jobs(session_id, agent, problem_key)
+    job = find_job(session_id, agent, problem_key)
+    if job is None or not job.finished:
+        return None
+    discard_job(job)
+    return job
+
+
+def _progress_label(job, message):
+    done, total = job.progress
+    label = f"{message} ({done}/{total} done)" if total else message
+    positions = list(job.queue_positions.values())
+    if positions:
+        label += f" • {queue_message(min(positions))}"
+    return label
+
+
+def _partial_markdown(job):
+    """Streamed text of the answers still arriving, one block per question."""
+    partials = dict(job.partials)
+    if len(partials) == 1:
+        return stream_preview(next(iter(partials.values())))
+    return "\n\n".join(f"**{name}**\n\n{stream_preview(text, 1500)}" for name, text in partials.items())
+
+
+def _draw_job(view):
+    job, message, bar, preview = view
+    bar.progress(job.fraction, text=_progress_label(job, message))
+    if job.partials:
+        preview.markdown(_partial_markdown(job))
+
+
+def render_job_progress(agent, message):
+    """
+    Show a progress bar (with the rate-limit queue position, if waiting) and the
+    answers streamed so far while this session's job for agent is still running. Returns the job or None.
+    poll_running_jobs keeps both up to date until the page reruns.
+    """
+    job = find_job(current_session_id(), agent, current_problem_key())
+    if job is None or job.finished:
+        return None
+    view = (job, message, st.progress(job.fraction, text=_progress_label(job, message)), st.empty())
+    _draw_job(view)
+    st.session_state.setdefault("_job_views", []).append(view)
+    return job
+
+
+def poll_running_jobs(*agents):
+    """
+    Call at the very end of a page: while any of agents still has a running job,
+    redraw its streamed text for up to JOB_POLL_SECONDS, then rerun so the page
+    picks up the result. Reruns straight away once every job has finished.
+    """
+    session_id, problem_key = current_session_id(), current_problem_key()
+    views = st.session_state.pop("_job_views", [])
+    running = [job for job in (find_job(session_id, agent, problem_key) for agent in agents)
+               if job is not None and not job.finished]
+    if not running:
+        return
+
+    deadline = time.monotonic() + JOB_POLL_SECONDS
+    while time.monotonic() < deadline and not all(job.finished for job in running):
+        time.sleep(JOB_STREAM_REFRESH_SECONDS)
+        for view in views:
+            _draw_job(view)
+    st.rerun()
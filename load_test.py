@@ -0,0 +1,421 @@
+"""
+Concurrent-session load generator for the Streamlit app.
+
+Starts the app with `streamlit run` (pointed at a mock reasoning API in its own process)
+and drives N simulated analysts through it over Streamlit's websocket protocol, the way
+browsers do: every widget change is a rerun carrying the widget states, and page
+switches rerun the target page's script. Each session logs in on Welcome_Agent, saves a
+problem, then opens every agent page in order and runs its analysis.
+
+Reports:
+- p50/p95 interaction latency (page loads, inputs, and analysis clicks until the
+  answers are shown, including the reruns the page makes while its job runs)
+- server CPU seconds per script run and CPU utilisation over the test
+- server resident memory growth per session
+(server CPU and memory are read from /proc, so they are only reported on Linux)
+
+Needs the websockets package (a Streamlit dependency since 1.42; pip install websockets otherwise).
+
+Usage:
+    python load_test.py --sessions 20 --ramp 0.5 --latency lognormal:1.0,0.4 -o load.json
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+try:
+    from websockets.sync.client import connect as websocket_connect
+except ImportError:  # websockets < 11 or not installed
+    websocket_connect = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# (page script name, label of its analysis button)
+PAGE_WALK = [
+    ("Vocabulary_Agent", "Extract Vocabulary"),
+    ("Current_System_Agent", "Extract Current System"),
+    ("Volatility_Agent", "Analyze Volatility"),
+    ("Ambiguity_Agent", "Analyze Ambiguity"),
+    ("Interconnectedness_Agent", "Analyze Interconnectedness"),
+    ("Uncertainty_Agent", "Analyze Uncertainty"),
+    ("Hardness_Summary_Agent", "Analyze Hardness"),
+]
+
+# Settings for the app server: every session calls the mock, nothing is answered from a cache
+LOAD_ENVIRONMENT = {
+    "RESPONSE_CACHE_ENABLED": "false",
+    "ANALYSIS_STORE_ENABLED": "false",
+}
+
+WIDGET_TYPES = ("button", "text_input", "text_area", "selectbox")
+
+
+# ================================
+# 🧪 Server Processes
+# ================================
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url, process, seconds=60):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            urllib.request.urlopen(url, timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{url} did not come up")
+
+
+def start_mock_process(latency, chunk_delay, seed):
+    """Run mock_reasoning_server.py in a child process; returns (process, reasoning endpoint base URL)."""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BASE_DIR, "mock_reasoning_server.py"), "--port", str(port),
+         "--latency", latency, "--chunk-delay", str(chunk_delay), "--seed", str(seed)],
+        stdout=subprocess.DEVNULL,
+    )
+    _wait_for(f"http://127.0.0.1:{port}/healthz", process)
+    return process, f"http://127.0.0.1:{port}/talos-engine/agency/reasoning_api"
+
+
+def start_app_process(api_base):
+    """`streamlit run Welcome_Agent.py` on a free port; returns (process, websocket URL)."""
+    port = _free_port()
+    env = dict(os.environ, REASONING_API_BASE=api_base)
+    for name, value in LOAD_ENVIRONMENT.items():
+        env.setdefault(name, value)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", os.path.join(BASE_DIR, "Welcome_Agent.py"),
+         "--server.headless", "true", "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    _wait_for(f"http://127.0.0.1:{port}/_stcore/health", process)
+    return process, f"ws://127.0.0.1:{port}/_stcore/stream"
+
+
+# ================================
+# 📏 Server Measurements
+# ================================
+
+def process_usage(pid):
+    """(CPU seconds, resident bytes) of a process from /proc, or (None, None) elsewhere."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None, None
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    return cpu, resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+class UsageWatcher:
+    """Samples a process's resident memory in the background to find its peak."""
+
+    def __init__(self, pid, interval=0.2):
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._watch, name="load-test-usage", daemon=True)
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            _, rss = process_usage(self.pid)
+            self.peak_rss = max(self.peak_rss, rss or 0)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else None
+
+
+# ================================
+# 🚶 Simulated Session
+# ================================
+
+class SimulatedSession:
+    """
+    One browser tab: a websocket session that reruns scripts with widget states,
+    as the Streamlit frontend does. Widgets and alerts of the last run are kept by label.
+    """
+
+    def __init__(self, url, number, timeout):
+        self.url = url
+        self.number = number
+        self.timeout = timeout
+        self.ws = None
+        self.pages = {}
+        self.page_hash = ""
+        self.widget_states = {}
+        self.widgets = []
+        self.errors = []
+        self.interactions = []  # (kind, step, seconds)
+        self.script_runs = 0
+        self.failures = []
+
+    def __enter__(self):
+        self.ws = websocket_connect(self.url, subprotocols=["streamlit"], max_size=None, open_timeout=30).__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self.ws.__exit__(*exc)
+
+    def rerun(self, kind, step, triggers=()):
+        """Send a rerun and wait until the script finishes without asking for another run."""
+        message = BackMsg()
+        message.rerun_script.page_script_hash = self.page_hash
+        states = message.rerun_script.widget_states.widgets
+        states.extend(self.widget_states.values())
+        for widget_id in triggers:
+            states.add(id=widget_id, trigger_value=True)
+
+        started = time.perf_counter()
+        self.ws.send(message.SerializeToString())
+        self.widgets, self.errors = [], []
+        deadline = time.monotonic() + self.timeout
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(self.ws.recv(timeout=max(deadline - time.monotonic(), 0.001)))
+            kind_of_msg = msg.WhichOneof("type")
+            if kind_of_msg == "navigation":
+                self.pages = {page.url_pathname or page.page_name: page.page_script_hash
+                              for page in msg.navigation.app_pages}
+            elif kind_of_msg == "new_session":
+                # Each (re)run starts a fresh page; server-initiated reruns redraw it
+                self.widgets, self.errors = [], []
+                self.page_hash = msg.new_session.page_script_hash or self.page_hash
+            elif kind_of_msg == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                self._collect(msg.delta.new_element)
+            elif kind_of_msg == "script_finished":
+                self.script_runs += 1
+                status = msg.script_finished
+                if status in (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_WITH_COMPILE_ERROR):
+                    break
+        seconds = time.perf_counter() - started
+        self.interactions.append((kind, step, seconds))
+        if self.errors:
+            self.failures.append(f"{step}: {self.errors[0][:200]}")
+        return seconds
+
+    def _collect(self, element):
+        element_type = element.WhichOneof("type")
+        if element_type in WIDGET_TYPES:
+            self.widgets.append((element_type, getattr(element, element_type)))
+        elif element_type == "exception":
+            self.errors.append(f"{element.exception.type}: {element.exception.message}")
+        elif element_type == "alert" and element.alert.format == element.alert.ERROR:
+            self.errors.append(element.alert.body)
+
+    def widget(self, element_type, match):
+        """First widget of the last run of that type whose label (or key) contains match."""
+        for kind, widget in self.widgets:
+            if kind == element_type and (match in widget.label or widget.id.endswith(match)):
+                return widget
+        return None
+
+    def set_value(self, widget, value):
+        self.widget_states[widget.id] = WidgetState(id=widget.id, string_value=value)
+
+    def open_page(self, name):
+        self.page_hash = next((page_hash for path, page_hash in self.pages.items() if name in path), "")
+        if not self.page_hash:
+            raise RuntimeError(f"page {name} not found in {sorted(self.pages)}")
+        # Widgets of the previous page are unmounted by the frontend
+        self.widget_states = {}
+        return self.rerun("page_load", name)
+
+
+def run_session(url, number, timeout):
+    """Welcome login and problem entry, then every agent page's analysis in order."""
+    session = SimulatedSession(url, number, timeout)
+    try:
+        with session:
+            session.rerun("page_load", "welcome")
+            session.set_value(session.widget("text_input", "employee_id_input"), f"LOAD{number:04d}")
+            session.rerun("input", "login", triggers=[session.widget("button", "login_btn").id])
+
+            account = session.widget("selectbox", "Account")
+            session.set_value(account, next(option for option in account.options if option != "Select Account"))
+            session.rerun("input", "account")
+            # A distinct problem per session, so no two sessions share an upstream call
+            problem = session.widget("text_area", "problem_textarea")
+            session.set_value(problem, f"Forecast regional demand for spare parts across service centres "
+                                       f"(load session {number}).")
+            session.rerun("input", "problem")
+            session.rerun("input", "save_problem", triggers=[session.widget("button", "Save Problem Details").id])
+
+            for page, label in PAGE_WALK:
+                session.open_page(page)
+                button = session.widget("button", label)
+                if button is None or button.disabled:
+                    session.failures.append(f"{page}: analysis button not available")
+                    continue
+                session.rerun("analysis", page, triggers=[button.id])
+    except Exception as e:
+        session.failures.append(f"session aborted: {type(e).__name__}: {e}")
+    return session
+
+
+# ================================
+# 🚀 Runner
+# ================================
+
+def run_load_test(url, server_pid, sessions, ramp_seconds, timeout):
+    """Start `sessions` walks, one every ramp_seconds, and collect them with the server's resource use."""
+    # One warm-up visit so imports and first-run caches are not counted against the sessions
+    with SimulatedSession(url, -1, timeout) as warm_up:
+        warm_up.rerun("page_load", "warm_up")
+
+    cpu_before, rss_before = process_usage(server_pid)
+    started = time.perf_counter()
+    with UsageWatcher(server_pid) as watcher, \
+            ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="load-session") as executor:
+        futures = []
+        for number in range(sessions):
+            futures.append(executor.submit(run_session, url, number, timeout))
+            time.sleep(ramp_seconds)
+        results = [future.result() for future in futures]
+    wall = time.perf_counter() - started
+    cpu_after, rss_after = process_usage(server_pid)
+
+    usage = {"wall_seconds": wall, "cpu_seconds": None, "rss_before": rss_before, "rss_peak": None}
+    if cpu_before is not None and cpu_after is not None:
+        usage["cpu_seconds"] = cpu_after - cpu_before
+        usage["rss_peak"] = max(watcher.peak_rss, rss_after)
+    return results, usage
+
+
+def build_report(sessions, usage, args):
+    interactions = [entry for session in sessions for entry in session.interactions]
+    script_runs = sum(session.script_runs for session in sessions)
+
+    def latency(kind=None):
+        samples = [seconds for k, _, seconds in interactions if kind is None or k == kind]
+        return {"count": len(samples), "p50": percentile(samples, 0.5), "p95": percentile(samples, 0.95),
+                "max": max(samples) if samples else None}
+
+    per_page = {}
+    for kind, step, seconds in interactions:
+        if kind == "analysis":
+            per_page.setdefault(step, []).append(seconds)
+
+    cpu = usage["cpu_seconds"]
+    memory = None
+    if usage["rss_peak"] is not None:
+        memory = {
+            "rss_before_mb": usage["rss_before"] / 2 ** 20,
+            "rss_peak_mb": usage["rss_peak"] / 2 ** 20,
+            "mb_per_session": (usage["rss_peak"] - usage["rss_before"]) / 2 ** 20 / max(len(sessions), 1),
+        }
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "sessions": args.sessions,
+            "ramp_seconds": args.ramp,
+            "mock_latency": args.latency,
+            "seed": args.seed,
+        },
+        "latency": {
+            "all": latency(),
+            "page_load": latency("page_load"),
+            "input": latency("input"),
+            "analysis": latency("analysis"),
+            "analysis_by_page": {step: {"p50": percentile(samples, 0.5), "p95": percentile(samples, 0.95)}
+                                 for step, samples in per_page.items()},
+        },
+        "server_cpu": None if cpu is None else {
+            "seconds": cpu,
+            "utilisation": cpu / usage["wall_seconds"],
+            "seconds_per_script_run": cpu / script_runs if script_runs else None,
+        },
+        "server_memory": memory,
+        "wall_seconds": usage["wall_seconds"],
+        "script_runs": script_runs,
+        "failed_sessions": sum(1 for session in sessions if session.failures),
+        "failures": [f"session {session.number}: {failure}"
+                     for session in sessions for failure in session.failures][:50],
+    }
+
+
+def _summary_line(report):
+    latency = report["latency"]
+    parts = []
+    for name in ("all", "analysis"):
+        if latency[name]["count"]:
+            parts.append(f"{name} p50 {latency[name]['p50']:.3f}s p95 {latency[name]['p95']:.3f}s")
+    if report["server_cpu"] and report["server_cpu"]["seconds_per_script_run"] is not None:
+        parts.append(f"CPU/run {report['server_cpu']['seconds_per_script_run'] * 1000:.1f}ms")
+    if report["server_memory"]:
+        parts.append(f"{report['server_memory']['mb_per_session']:.1f} MB/session")
+    parts.append(f"{report['failed_sessions']} failed sessions")
+    return "  ".join(parts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive simulated sessions through the app against the mock API.")
+    parser.add_argument("--sessions", type=int, default=10, help="simulated analysts")
+    parser.add_argument("--ramp", type=float, default=0.5, help="seconds between session starts")
+    parser.add_argument("--latency", default="lognormal:1.0,0.4", help="mock latency spec")
+    parser.add_argument("--chunk-delay", type=float, default=0.02, help="mock seconds between streamed chunks")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds one interaction may take")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write the report as JSON here (default: stdout)")
+    args = parser.parse_args(argv)
+    if websocket_connect is None:
+        parser.error("the websockets package (>= 11) is required: pip install websockets")
+
+    mock, api_base = start_mock_process(args.latency, args.chunk_delay, args.seed)
+    try:
+        app, url = start_app_process(api_base)
+        try:
+            print(f"Running {args.sessions} sessions against {url}...", file=sys.stderr)
+            sessions, usage = run_load_test(url, app.pid, max(1, args.sessions), args.ramp, args.timeout)
+        finally:
+            app.terminate()
+            app.wait()
+    finally:
+        mock.terminate()
+        mock.wait()
+
+    report = build_report(sessions, usage, args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(text)
+    print(_summary_line(report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
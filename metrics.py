@@ -0,0 +1,352 @@
+"""
+Per-call metrics for the talos-engine reasoning API.
+Every call is recorded in process-wide counters and fixed-bucket histograms labelled
+with the agent and question it belongs to: end-to-end latency and outcome, each
+upstream attempt's latency and status (HTTP code or timeout), response sizes and
+response cache hits. The admin panel reads them in-process; they can also be scraped
+in Prometheus text format (METRICS_PORT) or appended to a rotating JSON-lines file
+(METRICS_LOG_PATH).
+"""
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging.handlers import RotatingFileHandler
+
+from resilience import endpoint_name
+from settings import read_setting
+
+# ================================
+# ⚙️ Metrics Configuration
+# ================================
+
+# Serve /metrics in Prometheus text format on this port (0 = off)
+METRICS_PORT = int(read_setting("METRICS_PORT", 0))
+METRICS_HOST = read_setting("METRICS_HOST", "127.0.0.1")
+# Append one JSON line per call to this file (empty = off)
+METRICS_LOG_PATH = read_setting("METRICS_LOG_PATH", "")
+METRICS_LOG_MAX_BYTES = int(float(read_setting("METRICS_LOG_MAX_MB", 10)) * 1024 * 1024)
+METRICS_LOG_BACKUPS = int(read_setting("METRICS_LOG_BACKUPS", 5))
+
+# Reasoning calls take anywhere from under a second to the full read window
+SECONDS_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 45, 60, 90, 120, 180)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)
+
+_HELP = {
+    "reasoning_call_seconds": ("histogram", "End-to-end time of a reasoning call, including cache, retries and hedging."),
+    "reasoning_attempt_seconds": ("histogram", "Time of one upstream attempt, including its wait for the rate limit."),
+    "reasoning_response_bytes": ("histogram", "Size of a reasoning API response body."),
+    "reasoning_responses_total": ("counter", "Upstream attempts by HTTP status, or by the failure that replaced it."),
+    "reasoning_cache_total": ("counter", "Reasoning calls answered from the response cache, sent upstream or coalesced."),
+}
+
+
+# ================================
+# 📊 Counters & Histograms
+# ================================
+
+class Histogram:
+    """Cumulative fixed-bucket histogram, like a Prometheus histogram."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q):
+        """
+        Estimate of the q-quantile, interpolated inside its bucket like Prometheus'
+        histogram_quantile. Values past the last bucket are reported as its bound.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bound in enumerate(self.buckets):
+            if seen + self.counts[i] >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (bound - lower) * (rank - seen) / self.counts[i]
+            seen += self.counts[i]
+        return self.buckets[-1]
+
+
+_counters = {}
+_histograms = {}
+_metrics_lock = threading.Lock()
+
+
+def _labels(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def increment(name, amount=1, **labels):
+    """Add amount to the counter name{labels}."""
+    key = (name, _labels(labels))
+    with _metrics_lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def observe(name, value, buckets=SECONDS_BUCKETS, **labels):
+    """Record value in the histogram name{labels}."""
+    key = (name, _labels(labels))
+    with _metrics_lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram(buckets)
+        histogram.observe(value)
+
+
+def reset_metrics():
+    with _metrics_lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+# ================================
+# 🏷️ Agent & Question Labels
+# ================================
+
+_agency_labels = None
+
+
+def agency_labels(url):
+    """(agent, question) behind a reasoning URL, from the agent configs; unknown agencies keep their id."""
+    global _agency_labels
+    if _agency_labels is None:
+        import agent_configs
+
+        groups = {
+            "vocabulary": agent_configs.VOCABULARY_API_CONFIGS,
+            "current_system": agent_configs.CURRENT_SYSTEM_API_CONFIGS,
+            "volatility": agent_configs.VOLATILITY_API_CONFIGS,
+            "ambiguity": agent_configs.AMBIGUITY_API_CONFIGS,
+            "interconnectedness": agent_configs.INTERCONNECTEDNESS_API_CONFIGS,
+            "uncertainty": agent_configs.UNCERTAINTY_API_CONFIGS,
+            "hardness_summary": agent_configs.HARDNESS_API_CONFIGS,
+        }
+        _agency_labels = {
+            endpoint_name(cfg["url"]): (agent, cfg["name"])
+            for agent, configs in groups.items()
+            for cfg in configs
+        }
+    name = endpoint_name(url)
+    return _agency_labels.get(name, ("unknown", name))
+
+
+# ================================
+# 📝 Recording Reasoning Calls
+# ================================
+
+def record_call(url, seconds, outcome):
+    """One finished fetch_agency_result call; outcome is ok, cached or error."""
+    _start_exporters()
+    agent, question = agency_labels(url)
+    observe("reasoning_call_seconds", seconds, agent=agent, question=question, outcome=outcome)
+    if _call_log is not None:
+        _call_log.info(json.dumps({
+            "ts": round(time.time(), 3),
+            "agent": agent,
+            "question": question,
+            "agency_id": endpoint_name(url),
+            "outcome": outcome,
+            "seconds": round(seconds, 3),
+        }))
+
+
+def record_attempt(url, seconds, status):
+    """
+    One upstream attempt. status is the HTTP code, or connect_timeout, read_timeout,
+    connection_error, queue_timeout or cancelled (the losing call of a hedged pair).
+    """
+    agent, question = agency_labels(url)
+    observe("reasoning_attempt_seconds", seconds, agent=agent, question=question)
+    increment("reasoning_responses_total", agent=agent, question=question, status=status)
+
+
+def record_response_size(url, size):
+    agent, question = agency_labels(url)
+    observe("reasoning_response_bytes", size, buckets=BYTES_BUCKETS, agent=agent, question=question)
+
+
+def record_cache(result):
+    """hit, miss or coalesced (waited on an identical call already in flight)."""
+    increment("reasoning_cache_total", result=result)
+
+
+# ================================
+# 📤 Export
+# ================================
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_bound(bound):
+    return str(int(bound)) if float(bound).is_integer() else str(bound)
+
+
+def render_prometheus():
+    """Every metric in the Prometheus text exposition format."""
+    with _metrics_lock:
+        counters = sorted(_counters.items())
+        histograms = sorted(
+            (key, (h.buckets, list(h.counts), h.total, h.count)) for key, h in _histograms.items()
+        )
+
+    lines = []
+    described = set()
+
+    def describe(name):
+        if name not in described:
+            described.add(name)
+            kind, text = _HELP.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), value in counters:
+        describe(name)
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+    for (name, labels), (buckets, counts, total, count) in histograms:
+        describe(name)
+        cumulative = 0
+        for bound, bucket_count in zip(buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float("inf") else _format_bound(bound)
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {round(total, 6)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_call_log = None
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+def _start_exporters():
+    """Start the /metrics endpoint and the call log once per process, when configured."""
+    global _call_log, _exporters_started
+    if _exporters_started:
+        return
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+        if METRICS_PORT:
+            try:
+                server = ThreadingHTTPServer((METRICS_HOST, METRICS_PORT), _MetricsHandler)
+                server.daemon_threads = True
+                threading.Thread(target=server.serve_forever, name="metrics-exporter", daemon=True).start()
+            except OSError as e:
+                # Another process (e.g. a second Streamlit server) already serves this port
+                print(f"Metrics endpoint not started on port {METRICS_PORT}: {e}")
+        if METRICS_LOG_PATH:
+            handler = RotatingFileHandler(
+                METRICS_LOG_PATH, maxBytes=METRICS_LOG_MAX_BYTES, backupCount=METRICS_LOG_BACKUPS,
+                encoding="utf-8",
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger = logging.getLogger("reasoning_metrics")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(handler)
+            _call_log = logger
+
+
+# ================================
+# 🖥️ Admin Summary
+# ================================
+
+def get_call_metrics():
+    """
+    One row per (agent, question): calls, errors, timeouts, estimated p50/p95 seconds
+    of the end-to-end calls, and the average response size.
+    """
+    with _metrics_lock:
+        counters = list(_counters.items())
+        histograms = list(_histograms.items())
+
+    rows = {}
+
+    def row(labels):
+        labels = dict(labels)
+        key = (labels.get("agent"), labels.get("question"))
+        if key not in rows:
+            rows[key] = {
+                "agent": key[0], "question": key[1], "calls": 0, "errors": 0, "cached": 0,
+                "timeouts": 0, "p50_seconds": None, "p95_seconds": None, "avg_bytes": None,
+                "_latency": Histogram(SECONDS_BUCKETS),
+            }
+        return rows[key], labels
+
+    for (name, labels), value in counters:
+        if name == "reasoning_responses_total":
+            entry, labels = row(labels)
+            if labels["status"].endswith("_timeout"):
+                entry["timeouts"] += value
+    for (name, labels), histogram in histograms:
+        if name == "reasoning_call_seconds":
+            entry, labels = row(labels)
+            entry["calls"] += histogram.count
+            if labels["outcome"] == "error":
+                entry["errors"] += histogram.count
+            elif labels["outcome"] == "cached":
+                entry["cached"] += histogram.count
+            merged = entry["_latency"]
+            merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+            merged.count += histogram.count
+        elif name == "reasoning_response_bytes" and histogram.count:
+            entry, _ = row(labels)
+            entry["avg_bytes"] = round(histogram.total / histogram.count)
+
+    result = []
+    for entry in rows.values():
+        latency = entry.pop("_latency")
+        entry["p50_seconds"] = latency.quantile(0.5)
+        entry["p95_seconds"] = latency.quantile(0.95)
+        result.append(entry)
+    return sorted(result, key=lambda r: (r["agent"] or "", r["question"] or ""))
+
+
+def get_cache_counters():
+    """{hit, miss, coalesced} counts of reasoning calls."""
+    with _metrics_lock:
+        return {
+            dict(labels)["result"]: value
+            for (name, labels), value in _counters.items()
+            if name == "reasoning_cache_total"
+        }
@@ -0,0 +1,323 @@
+"""
+Local stand-in for the talos-engine reasoning API, for offline development and load tests.
+Mimics the endpoint contract: POST {"agency_goal": ...} to .../reasoning_api?agency_id=...
+with a Tenant-ID header, answered as one JSON body (in any of the shapes json_to_text
+unwraps) or, when the client's Accept header asks for it, streamed chunk by chunk as
+Server-Sent Events or NDJSON. Latency, error rates and answers are configurable per
+agency, and a --seed makes a run reproducible.
+
+Usage:
+    python mock_reasoning_server.py --port 8765 --latency lognormal:0.8,0.4 --error-rate 0.02
+    python mock_reasoning_server.py --config mock_agencies.json
+    (then set REASONING_API_BASE=http://127.0.0.1:8765/talos-engine/agency/reasoning_api
+    so every agent calls the mock; see agent_configs.py)
+
+Config file (every key optional; "agencies" entries override the defaults per agency_id):
+    {"latency": "uniform:0.2,1.5", "chunk_delay": 0.05, "error_rate": 0.05,
+     "error_statuses": [429, 503], "drop_rate": 0.01, "shape": "result",
+     "agencies": {"1758555344231": {"answer": "**Score: 4** ...", "latency": "fixed:6"}}}
+
+GET /stats returns request, error and latency counters per agency_id.
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_JUSTIFICATION = (
+    "This is a canned answer from the local mock reasoning server. "
+    "It is streamed word by word so the partial-text display can be exercised "
+    "without calling the live talos-engine endpoint."
+)
+DEFAULT_ANSWER = f"**Score: 3**\n\n{DEFAULT_JUSTIFICATION}"
+
+# JSON bodies the live endpoint has been seen to return (all unwrapped by text_utils.json_to_text)
+RESPONSE_SHAPES = {
+    "result": lambda text: {"result": text},
+    "output": lambda text: {"output": text},
+    "data": lambda text: {"data": {"answer": text}},
+    "list": lambda text: [{"text": text}],
+}
+
+
+def _chunks(text, size=3):
+    """Split text into chunks of a few words, keeping the separating spaces."""
+    words = text.split(" ")
+    for i in range(0, len(words), size):
+        yield " ".join(words[i:i + size]) + (" " if i + size < len(words) else "")
+
+
+# ================================
+# 🎲 Latency & Error Behaviour
+# ================================
+
+def parse_latency(spec):
+    """
+    Latency distribution from a spec, as a callable(rng) -> seconds:
+    - "0.5" or "fixed:0.5"
+    - "uniform:low,high"
+    - "normal:mean,stddev" (clamped at 0)
+    - "lognormal:median,sigma" (long right tail, like real upstream latencies)
+    - "exponential:mean"
+    """
+    kind, _, args = str(spec).partition(":")
+    if not args:
+        kind, args = "fixed", kind
+    try:
+        values = [float(value) for value in args.split(",")]
+        if kind == "fixed" and len(values) == 1:
+            return lambda rng: values[0]
+        if kind == "uniform" and len(values) == 2:
+            return lambda rng: rng.uniform(*values)
+        if kind == "normal" and len(values) == 2:
+            return lambda rng: max(rng.gauss(*values), 0.0)
+        if kind == "lognormal" and len(values) == 2 and values[0] > 0:
+            return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+        if kind == "exponential" and len(values) == 1 and values[0] > 0:
+            return lambda rng: rng.expovariate(1 / values[0])
+    except ValueError:
+        pass
+    raise ValueError(f"Unrecognised latency spec: {spec!r}")
+
+
+def canned_answer(agency_id, prompt):
+    """Default answer: a 0-5 score that is stable for the same agency and prompt."""
+    digest = hashlib.sha256(f"{agency_id}\0{prompt}".encode("utf-8")).digest()
+    return f"**Score: {digest[0] % 6}**\n\n{DEFAULT_JUSTIFICATION}"
+
+
+class AgencyBehaviour:
+    """How the mock answers one agency: latency, chunking, injected errors and the answer."""
+
+    def __init__(self, latency="fixed:0", chunk_delay=0.05, error_rate=0.0, error_statuses=(429, 500, 503),
+                 drop_rate=0.0, shape="result", answer=None):
+        if shape not in RESPONSE_SHAPES:
+            raise ValueError(f"Unknown response shape {shape!r}; expected one of {', '.join(RESPONSE_SHAPES)}")
+        self.latency_spec = latency
+        self.latency = parse_latency(latency)
+        self.chunk_delay = float(chunk_delay)
+        self.error_rate = float(error_rate)
+        self.error_statuses = tuple(int(status) for status in error_statuses)
+        self.drop_rate = float(drop_rate)
+        self.shape = shape
+        self.answer = answer
+
+    def answer_for(self, agency_id, prompt):
+        return self.answer if self.answer is not None else canned_answer(agency_id, prompt)
+
+
+class MockConfig:
+    """Default behaviour plus per-agency overrides, a seeded RNG and per-agency counters."""
+
+    BEHAVIOUR_KEYS = ("latency", "chunk_delay", "error_rate", "error_statuses", "drop_rate", "shape", "answer")
+
+    def __init__(self, defaults=None, agencies=None, seed=None):
+        self.defaults = {key: value for key, value in (defaults or {}).items() if key in self.BEHAVIOUR_KEYS}
+        self.default_behaviour = AgencyBehaviour(**self.defaults)
+        self.agencies = {
+            str(agency_id): AgencyBehaviour(**{**self.defaults, **overrides})
+            for agency_id, overrides in (agencies or {}).items()
+        }
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    @classmethod
+    def from_dict(cls, data, seed=None):
+        data = dict(data or {})
+        seed = seed if seed is not None else data.get("seed")
+        return cls(defaults=data, agencies=data.get("agencies"), seed=seed)
+
+    def behaviour(self, agency_id):
+        return self.agencies.get(agency_id, self.default_behaviour)
+
+    def draw(self, behaviour):
+        """(latency seconds, error status or None, drop connection?) for one request."""
+        with self._lock:
+            latency = behaviour.latency(self._rng)
+            roll = self._rng.random()
+            status = None
+            if roll < behaviour.error_rate and behaviour.error_statuses:
+                status = self._rng.choice(behaviour.error_statuses)
+            drop = status is None and self._rng.random() < behaviour.drop_rate
+        return latency, status, drop
+
+    def record(self, agency_id, outcome, seconds):
+        with self._lock:
+            stats = self._stats.setdefault(agency_id, {"requests": 0, "ok": 0, "errors": 0, "dropped": 0,
+                                                       "busy_seconds": 0.0})
+            stats["requests"] += 1
+            stats[outcome] += 1
+            stats["busy_seconds"] += seconds
+
+    def stats(self):
+        with self._lock:
+            return {agency_id: dict(stats) for agency_id, stats in self._stats.items()}
+
+
+# ================================
+# 🛰️ Request Handler
+# ================================
+
+class MockReasoningHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without this, delayed ACKs add ~40ms per answer
+    disable_nagle_algorithm = True
+    config = MockConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/stats":
+            self._send_json(200, self.config.stats())
+        elif path == "/healthz":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        started = time.perf_counter()
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            payload = {}
+        agency_id = (parse_qs(urlparse(self.path).query).get("agency_id") or [""])[0]
+        if not agency_id:
+            self._send_json(400, {"error": "agency_id is required"})
+            return
+        if not (self.headers.get("Tenant-ID") or self.headers.get("X-Tenant-ID")):
+            self._send_json(401, {"error": "Tenant-ID header is required"})
+            return
+        if not isinstance(payload, dict) or "agency_goal" not in payload:
+            self._send_json(400, {"error": "agency_goal is required"})
+            return
+
+        behaviour = self.config.behaviour(agency_id)
+        latency, status, drop = self.config.draw(behaviour)
+        time.sleep(latency)
+        if drop:
+            # Hang up without answering, like a reset upstream connection
+            self.close_connection = True
+            self.config.record(agency_id, "dropped", time.perf_counter() - started)
+            return
+        if status is not None:
+            headers = {"Retry-After": "1"} if status == 429 else {}
+            self._send_json(status, {"error": f"injected {status} from the mock reasoning server"}, headers)
+            self.config.record(agency_id, "errors", time.perf_counter() - started)
+            return
+
+        answer = behaviour.answer_for(agency_id, payload["agency_goal"])
+        accept = self.headers.get("Accept", "")
+        try:
+            if "text/event-stream" in accept:
+                self._stream(answer, behaviour.chunk_delay, "text/event-stream",
+                             lambda chunk: f"data: {json.dumps({'delta': chunk})}\n\n", "data: [DONE]\n\n")
+            elif "application/x-ndjson" in accept:
+                self._stream(answer, behaviour.chunk_delay, "application/x-ndjson",
+                             lambda chunk: json.dumps({"delta": chunk}) + "\n", "")
+            else:
+                time.sleep(behaviour.chunk_delay * len(list(_chunks(answer))))
+                self._send_json(200, RESPONSE_SHAPES[behaviour.shape](answer))
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading (e.g. the losing call of a hedged pair)
+            self.close_connection = True
+        self.config.record(agency_id, "ok", time.perf_counter() - started)
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, answer, chunk_delay, content_type, frame, trailer):
+        """Send the answer with chunked transfer encoding, one frame per chunk."""
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        for chunk in _chunks(answer):
+            time.sleep(chunk_delay)
+            self._write_chunk(frame(chunk))
+        if trailer:
+            self._write_chunk(trailer)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def make_server(host="127.0.0.1", port=8765, config=None):
+    """A ThreadingHTTPServer answering with config (port 0 picks a free port)."""
+    handler = type("ConfiguredMockReasoningHandler", (MockReasoningHandler,), {"config": config or MockConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(config=None, host="127.0.0.1", port=0):
+    """Start a mock server in a daemon thread; returns (server, base URL of the reasoning endpoint)."""
+    server = make_server(host, port, config)
+    threading.Thread(target=server.serve_forever, name="mock-reasoning-api", daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/talos-engine/agency/reasoning_api"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the reasoning API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--config", help="JSON file with default and per-agency behaviour")
+    parser.add_argument("--latency", help="time to first byte, e.g. fixed:0.5, uniform:0.2,1.5, lognormal:0.8,0.4")
+    parser.add_argument("--chunk-delay", type=float, help="seconds between streamed chunks (default 0.05)")
+    parser.add_argument("--error-rate", type=float, help="fraction of calls answered with an error status")
+    parser.add_argument("--error-statuses", help="comma-separated statuses to inject (default 429,500,503)")
+    parser.add_argument("--drop-rate", type=float, help="fraction of calls whose connection is dropped")
+    parser.add_argument("--shape", choices=sorted(RESPONSE_SHAPES), help="JSON shape of non-streamed answers")
+    parser.add_argument("--seed", type=int, help="seed for reproducible latencies and errors")
+    args = parser.parse_args(argv)
+
+    data = {}
+    if args.config:
+        with open(args.config, encoding="utf-8") as f:
+            data = json.load(f)
+    overrides = {
+        "latency": args.latency,
+        "chunk_delay": args.chunk_delay,
+        "error_rate": args.error_rate,
+        "error_statuses": args.error_statuses.split(",") if args.error_statuses else None,
+        "drop_rate": args.drop_rate,
+        "shape": args.shape,
+    }
+    data.update({key: value for key, value in overrides.items() if value is not None})
+    try:
+        config = MockConfig.from_dict(data, seed=args.seed)
+    except (TypeError, ValueError) as e:
+        parser.error(str(e))
+
+    server = make_server(args.host, args.port, config)
+    print(f"Mock reasoning API listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,42 +4,21 @@ def call_api(agent_name, problem, outputs):
     - agent_name: string, matches the 'name' in API_CONFIGS
     - problem: business problem statement
     - outputs: dict, previous agent outputs (e.g., {'vocabulary': ..., 'current_system': ...})
+    Requests go through the shared pooled client in api_client.
     """
     config = next((a for a in API_CONFIGS if a["name"] == agent_name), None)
-    if not config:
-        st.error("Invalid API configuration.")
-        return None
-
-    prompt = config["prompt"](problem, outputs)
-    payload = {"agency_goal": prompt}
-
-    headers = HEADERS_BASE.copy()
-    headers.update({"Tenant-ID": TENANT_ID, "X-Tenant-ID": TENANT_ID})
-    if 'auth_token' in st.session_state and st.session_state.auth_token:
-        headers["Authorization"] = f"Bearer {st.session_state.auth_token}"
-
-    try:
-        response = requests.post(config["url"], headers=headers, json=payload, timeout=60)
-        if response.status_code == 200:
-            return sanitize_text(json_to_text(response.json()))
-        else:
-            st.error(f"API Error: {response.status_code} - {response.text[:200]}")
-            return None
-    except Exception as e:
-        st.error(f"API Call Failed: {str(e)}")
-        return None
+    return call_reasoning_api(config, problem, outputs,
+                              postprocess=lambda data: sanitize_text(json_to_text(data)))
 import streamlit as st
 import streamlit.components.v1 as components
-import os
 import re
 import json
 from shared_header import render_header
 # REMOVE THIS: render_header() - Don't call it here, call it after imports
 from datetime import datetime
-import pandas as pd
-import requests
 from shared_header import (
     render_header,
+    fragment,
     save_feedback_to_admin_session,  # ADD THIS
     ACCOUNTS,
     INDUSTRIES,
@@ -48,6 +27,13 @@ from shared_header import (
     render_unified_business_inputs,
     render_unified_admin_panel,  # ADD THIS
 )
+from api_client import call_reasoning_api, fetch_configs_concurrently, init_auth_token, report_errors
+from jobs import poll_running_jobs, render_job_progress, submit_agent_job, take_finished_job
+from agent_configs import VOCABULARY_API_CONFIGS
+from text_utils import json_to_text, sanitize_text
+from analysis_store import store_session_outputs
+from render_cache import cached_render, clear_render_cache
+from static_assets import inject_stylesheet
 
 # --- Page Config ---
 st.set_page_config(
@@ -74,104 +60,16 @@ if 'validation_attempted' not in st.session_state:
 # API Configuration
 # ===============================
 
-# Constants
-TENANT_ID = "talos"
-HEADERS_BASE = {"Content-Type": "application/json"}
-VOCAB_API_URL = "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api?society_id=1757657318406&agency_id=1758548233201&level=1"
-
-# API config with simplified prompt
-API_CONFIGS = [
-    {
-        "name": "vocabulary",
-        "url": VOCAB_API_URL,
-        "multiround_convo": 3,
-        "description": "vocabulary",
-        "prompt": lambda problem, outputs: (
-            f"{problem}\n\nExtract the vocabulary from this problem statement."
-        )
-    }
-]
-
-# Global feedback file path
-BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-FEEDBACK_FILE = os.path.join(BASE_DIR, "feedback.csv")
-
-# Initialize feedback file if not present
-try:
-    if not os.path.exists(FEEDBACK_FILE):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        df = pd.DataFrame([
-            [timestamp, "", "", "", "", "", "", "", ""]
-        ], columns=["Timestamp","Employee_id", "Feedback", "FeedbackType", "OffDefinitions", "Suggestions", "Account", "Industry", "ProblemStatement"])
-        df.to_csv(FEEDBACK_FILE, index=False)
-except (PermissionError, OSError) as e:
-    if 'feedback_data' not in st.session_state:
-        st.session_state.feedback_data = pd.DataFrame(
-            columns=["Timestamp", "Employee_id", "Feedback", "FeedbackType", "OffDefinitions", "Suggestions", "Account", "Industry", "ProblemStatement"])
+API_CONFIGS = VOCABULARY_API_CONFIGS
 
 # Token initialization
-def _init_auth_token():
-    token = os.environ.get("AUTH_TOKEN", "")
-    try:
-        if not token:
-            token = st.secrets.get("AUTH_TOKEN", "")
-    except Exception:
-        pass
-    return token or ""
-
 if 'auth_token' not in st.session_state:
-    st.session_state.auth_token = _init_auth_token()
+    st.session_state.auth_token = init_auth_token()
 
 # ===============================
 # Utility Functions
 # ===============================
 
-def json_to_text(data):
-    """Extract text from JSON response"""
-    if data is None:
-        return ""
-    if isinstance(data, str):
-        return data
-    if isinstance(data, dict):
-        for key in ("result", "output", "content", "text", "answer", "response"):
-            if key in data and data[key]:
-                return json_to_text(data[key])
-        if "data" in data:
-            return json_to_text(data["data"])
-        # Try to extract any string values
-        for value in data.values():
-            if isinstance(value, str) and len(value) > 10:
-                return value
-        return "\n".join(f"{k}: {json_to_text(v)}" for k, v in data.items() if v)
-    if isinstance(data, list):
-        return "\n".join(json_to_text(x) for x in data if x)
-    return str(data)
-
-def sanitize_text(text):
-    """Remove markdown artifacts and clean up text"""
-    if not text:
-        return ""
-
-    # Fix the "s" character issue
-    text = re.sub(r'^\s*s\s+', '', text.strip())
-    text = re.sub(r'\n\s*s\s+', '\n', text)
-
-    text = re.sub(r'Q\d+\s*Answer\s*Explanation\s*:',
-                  '', text, flags=re.IGNORECASE)
-    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)
-    text = re.sub(r'\*(.*?)\*', r'\1', text)
-    text = re.sub(r'`(.*?)`', r'\1', text)
-    text = re.sub(r'#+\s*', '', text)
-    text = re.sub(r'!\[.*?\]\(.*?\)', '', text)
-    text = re.sub(r'\[(.*?)\]\(.*?\)', r'\1', text)
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    text = re.sub(r' {2,}', ' ', text)
-    text = re.sub(r'^\s*[-*]\s+', '• ', text, flags=re.MULTILINE)
-    text = re.sub(r'<\/?[^>]+>', '', text)
-    text = re.sub(r'& Key Takeaway:', 'Key Takeaway:', text)
-
-    return text.strip()
-
 def format_vocabulary_with_bold(text, extra_phrases=None):
     """Format vocabulary text with bold styling"""
     if not text:
@@ -307,9 +205,7 @@ def format_vocabulary_with_bold(text, extra_phrases=None):
     return formatted_output
 
 def submit_feedback(feedback_type, employee_id="", off_definitions="", suggestions="", additional_feedback=""):
-    """Submit feedback to CSV file and admin session storage"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
+    """Submit feedback through the shared ingestion path (one durable write)"""
     # Get context data from session state
     account = st.session_state.get("current_account", "")
     industry = st.session_state.get("current_industry", "")
@@ -327,49 +223,13 @@ def submit_feedback(feedback_type, employee_id="", off_definitions="", suggestio
         "ProblemStatement": problem_statement
     }
 
-    # Save to admin session storage
-    save_feedback_to_admin_session(feedback_data, "Vocabulary Agent")
-
-    # Also save to CSV file (original functionality)
-    new_entry = pd.DataFrame([[
-        timestamp, employee_id ,additional_feedback, feedback_type, off_definitions, suggestions, account, industry, problem_statement
-    ]], columns=["Timestamp","Employee_id", "Feedback", "FeedbackType", "OffDefinitions", "Suggestions", "Account", "Industry", "ProblemStatement"])
-
-    try:
-        # Try file-based storage first
-        if os.path.exists(FEEDBACK_FILE):
-            existing = pd.read_csv(FEEDBACK_FILE)
-
-            # Handle schema mismatch
-            missing_cols = set(new_entry.columns) - set(existing.columns)
-            for col in missing_cols:
-                existing[col] = ''
-
-            # Reorder existing columns to match the new entry's order
-            existing = existing[new_entry.columns]
-
-            updated = pd.concat([existing, new_entry], ignore_index=True)
-        else:
-            updated = new_entry
-
-        try:
-            updated.to_csv(FEEDBACK_FILE, index=False)
-        except (PermissionError, OSError):
-            # Fallback to session state on Streamlit Cloud
-            if 'feedback_data' not in st.session_state:
-                st.session_state.feedback_data = pd.DataFrame(
-                    columns=new_entry.columns)
-            st.session_state.feedback_data = pd.concat(
-                [st.session_state.feedback_data, new_entry], ignore_index=True)
-            st.info("📝 Feedback saved to session (cloud mode)")
-
-        # CHANGED: Set agent-specific feedback state
-        st.session_state.vocab_feedback_submitted = True
-        return True
-    except Exception as e:
-        st.error(f"Error saving feedback: {str(e)}")
+    # Single ingestion path: canonical schema, one durable write
+    if not save_feedback_to_admin_session(feedback_data, "Vocabulary Agent"):
         return False
 
+    st.session_state.vocab_feedback_submitted = True
+    return True
+
 def reset_app_state():
     """Completely reset session state to initial values"""
     # Clear vocabulary-related state
@@ -378,6 +238,7 @@ def reset_app_state():
     for key in keys_to_clear:
         if key in st.session_state:
             del st.session_state[key]
+    clear_render_cache()
 
     st.success("✅ Application reset successfully! You can start a new analysis.")
 
@@ -456,52 +317,41 @@ if extract_btn:
     Industry: {industry}
     """.strip()
 
-    # Prepare headers with authentication
-    headers = HEADERS_BASE.copy()
-    headers.update({
-        "Tenant-ID": TENANT_ID,
-        "X-Tenant-ID": TENANT_ID
-    })
-
-    if st.session_state.auth_token:
-        headers["Authorization"] = f"Bearer {st.session_state.auth_token}"
-
-    with st.spinner("🔍 Extracting vocabulary and analyzing context • ⏱️ 60-90s"):
-        progress = st.progress(0)
-
-        try:
-            with requests.Session() as session:
-                outputs = {}
-                result = call_api("vocabulary", full_context, outputs)
-                progress.progress(0.5)
-                if result:
-                    st.session_state.vocab_output = result
-                    st.session_state.show_vocabulary = True
-                    st.session_state.analysis_complete = True
-                    progress.progress(1.0)
-                    st.success("✅ Vocabulary extraction complete!")
-                else:
-                    st.session_state.vocab_output = "API Error or no data returned"
-                    st.session_state.show_vocabulary = True
-                    st.error("API request failed or no data returned")
-
-        except requests.exceptions.Timeout:
-            error_msg = "Request timeout: The API took too long to respond."
-            st.session_state.vocab_output = error_msg
-            st.session_state.show_vocabulary = True
-            st.error("Request timeout - please try again.")
-
-        except requests.exceptions.ConnectionError:
-            error_msg = "Connection error: Unable to connect to the API server."
-            st.session_state.vocab_output = error_msg
-            st.session_state.show_vocabulary = True
-            st.error("Connection error - please check your network connection.")
+    st.session_state.show_vocabulary = False
+    auth_token = st.session_state.auth_token
+    # Runs in the background so a rerun or page switch does not throw the extraction away
+    submit_agent_job(
+        "vocabulary", full_context, {},
+        lambda on_progress, on_partial, on_queue: fetch_configs_concurrently(
+            API_CONFIGS, full_context, {}, auth_token,
+            postprocess=lambda data: sanitize_text(json_to_text(data)),
+            on_progress=on_progress,
+            on_partial=on_partial,
+            on_queue=on_queue,
+        ),
+    )
 
-        except Exception as e:
-            error_msg = f"Unexpected error: {str(e)}"
-            st.session_state.vocab_output = error_msg
+# Pick up a finished background extraction (possibly started before a rerun or page switch)
+# A failed run leaves the previous vocabulary in place: replacing it with an error message
+# would make change detection discard everything built from it
+finished_job = take_finished_job("vocabulary")
+if finished_job:
+    if finished_job.status == "failed":
+        st.error(f"An unexpected error occurred: {finished_job.error}")
+    else:
+        results, errors = finished_job.result
+        result = results.get("vocabulary")
+        if result:
+            st.session_state.vocab_output = result
             st.session_state.show_vocabulary = True
-            st.error(f"An unexpected error occurred: {str(e)}")
+            store_session_outputs("vocabulary")
+            st.session_state.analysis_complete = True
+            st.success("✅ Vocabulary extraction complete!")
+        else:
+            report_errors(errors)
+            st.error("API request failed or no data returned")
+else:
+    render_job_progress("vocabulary", "🔍 Extracting vocabulary and analyzing context • ⏱️ 60-90s")
 
 # ===============================
 # Display Vocabulary Results
@@ -537,20 +387,27 @@ if st.session_state.get("show_vocabulary") and st.session_state.get("vocab_outpu
         unsafe_allow_html=True,
     )
 
-    # Format and display vocabulary with account/industry substitutions
-    vocab_text = st.session_state.vocab_output
-    formatted_vocab = format_vocabulary_with_bold(vocab_text)
+    def render_vocabulary_html(vocab_text):
+        """Format vocabulary with account/industry substitutions"""
+        formatted_vocab = format_vocabulary_with_bold(vocab_text)
 
-    # Replace generic mentions in the formatted HTML
-    if display_account and display_account != "Unknown Company":
-        formatted_vocab = re.sub(
-            r'\bthe company\b', display_account, formatted_vocab, flags=re.IGNORECASE)
-    if display_industry and display_industry != "Unknown Industry":
-        formatted_vocab = re.sub(
-            r'\bthe industry\b', display_industry, formatted_vocab, flags=re.IGNORECASE)
+        # Replace generic mentions in the formatted HTML
+        if display_account and display_account != "Unknown Company":
+            formatted_vocab = re.sub(
+                r'\bthe company\b', display_account, formatted_vocab, flags=re.IGNORECASE)
+        if display_industry and display_industry != "Unknown Industry":
+            formatted_vocab = re.sub(
+                r'\bthe industry\b', display_industry, formatted_vocab, flags=re.IGNORECASE)
 
-    # Convert newlines to <br> for proper HTML display
-    html_body = formatted_vocab.replace('\n', '<br>')
+        # Convert newlines to <br> for proper HTML display
+        return formatted_vocab.replace('\n', '<br>')
+
+    # Reused across reruns while the output, names and theme are unchanged
+    vocab_text = st.session_state.vocab_output
+    html_body = cached_render(
+        "vocabulary", vocab_text, display_account, display_industry,
+        lambda: render_vocabulary_html(vocab_text),
+    )
 
         # Single box for vocabulary with proper spacing and visible border
     st.markdown(
@@ -683,311 +540,173 @@ if st.session_state.get("show_vocabulary") and st.session_state.get("vocab_outpu
         )
 
     # Show feedback section if not submitted - USING AGENT-SPECIFIC STATE
-    if not st.session_state.get('vocab_feedback_submitted', False):  # CHANGED
-        fb_choice = st.radio(
-            "Select your feedback type:",
-            options=[
-                "I have read it, found it useful, thanks.",
-                "I have read it, found some definitions to be off.",
-                "The widget seems interesting, but I have some suggestions on the features.",
-            ],
-            index=None,
-            key="vocab_feedback_radio",  # CHANGED: Agent-specific key
-        )
+    @fragment
+    def render_feedback_section():
+        """Feedback form; its widgets rerun only this section"""
+        if not st.session_state.get('vocab_feedback_submitted', False):  # CHANGED
+            fb_choice = st.radio(
+                "Select your feedback type:",
+                options=[
+                    "I have read it, found it useful, thanks.",
+                    "I have read it, found some definitions to be off.",
+                    "The widget seems interesting, but I have some suggestions on the features.",
+                ],
+                index=None,
+                key="vocab_feedback_radio",  # CHANGED: Agent-specific key
+            )
+
+            if fb_choice:
+                st.session_state.feedback_option = fb_choice
+
+            # Feedback form 1: Positive feedback
+            if fb_choice == "I have read it, found it useful, thanks.":
+                with st.form("vocab_feedback_form_positive", clear_on_submit=True):  # CHANGED: Agent-specific key
+                    st.info("Thank you for your positive feedback!")
+                    # Simple Employee ID display - NO BOX
+                    st.markdown(f'**Employee ID:** {user_id}')
+                    submitted = st.form_submit_button("📨 Submit Positive Feedback")
+                    if submitted:
+                        # FIXED: Use the wrapper function
+                        if submit_feedback_wrapper(fb_choice, user_id=user_id):
+                            st.rerun()
 
-        if fb_choice:
-            st.session_state.feedback_option = fb_choice
-
-        # Feedback form 1: Positive feedback
-        if fb_choice == "I have read it, found it useful, thanks.":
-            with st.form("vocab_feedback_form_positive", clear_on_submit=True):  # CHANGED: Agent-specific key
-                st.info("Thank you for your positive feedback!")
-                # Simple Employee ID display - NO BOX
-                st.markdown(f'**Employee ID:** {user_id}')
-                submitted = st.form_submit_button("📨 Submit Positive Feedback")
-                if submitted:
-                    # FIXED: Use the wrapper function
-                    if submit_feedback_wrapper(fb_choice, user_id=user_id):
-                        st.rerun()
-
-        # Feedback form 2: Definitions off - COMPACT VERSION
-        elif fb_choice == "I have read it, found some definitions to be off.":
-            with st.form("vocab_feedback_form_defs", clear_on_submit=True):  # CHANGED: Agent-specific key
-                st.markdown("**Please select which sections and terms have definitions that seem off:**")
+            # Feedback form 2: Definitions off - COMPACT VERSION
+            elif fb_choice == "I have read it, found some definitions to be off.":
+                with st.form("vocab_feedback_form_defs", clear_on_submit=True):  # CHANGED: Agent-specific key
+                    st.markdown("**Please select which sections and terms have definitions that seem off:**")
                 
-                # Simple Employee ID display - NO BOX
-                st.markdown(f'**Employee ID:** {user_id}')
+                    # Simple Employee ID display - NO BOX
+                    st.markdown(f'**Employee ID:** {user_id}')
                 
-                selected_issues = {}
+                    selected_issues = {}
                 
-                # Define the expected sections in order
-                expected_sections = [
-                    "Section 1: Extract and Define Business Vocabulary Terms",
-                    "Section 2: Identify KPIs and Metrics", 
-                    "Section 3: Identify Relevant Business Processes",
-                    "Section 4: Present a Cohesive Narrative"
-                ]
+                    # Define the expected sections in order
+                    expected_sections = [
+                        "Section 1: Extract and Define Business Vocabulary Terms",
+                        "Section 2: Identify KPIs and Metrics", 
+                        "Section 3: Identify Relevant Business Processes",
+                        "Section 4: Present a Cohesive Narrative"
+                    ]
                 
-                # Create COMPACT dropdowns for ALL expected sections
-                for section_name in expected_sections:
-                    # Get the display name without "Section X: "
-                    display_section_name = section_name.replace('Section 1: ', '')\
-                                                      .replace('Section 2: ', '')\
-                                                      .replace('Section 3: ', '')\
-                                                      .replace('Section 4: ', '')
+                    # Create COMPACT dropdowns for ALL expected sections
+                    for section_name in expected_sections:
+                        # Get the display name without "Section X: "
+                        display_section_name = section_name.replace('Section 1: ', '')\
+                                                          .replace('Section 2: ', '')\
+                                                          .replace('Section 3: ', '')\
+                                                          .replace('Section 4: ', '')
                     
-                    st.markdown(f'**{display_section_name}**')
+                        st.markdown(f'**{display_section_name}**')
                     
-                    # Get items for this section
-                    items = []
+                        # Get items for this section
+                        items = []
                     
-                    # First try to get dynamically parsed items
-                    if section_name in sections_data and sections_data[section_name]:
-                        items = sections_data[section_name]
-                    else:
-                        # Fallback to predefined items only if no dynamic data
-                        fallback_items = {
-                            "Section 1: Extract and Define Business Vocabulary Terms": [
-                                "Managed Pros", "Account Support", "Growth Strategies", 
-                                "Tailored Strategies", "Upselling", "Revenue Growth",
-                                "Lifetime Value (LTV)", "Missed Opportunities", "Suboptimal"
-                            ],
-                            "Section 2: Identify KPIs and Metrics": [
-                                "Customer Lifetime Value (LTV)", "Revenue Growth Rate", 
-                                "Upsell Rate", "Customer Satisfaction Score (CSAT)"
-                            ],
-                            "Section 3: Identify Relevant Business Processes": [
-                                "Account Management Process", "Sales Strategy Development", 
-                                "Customer Feedback Loop"
-                            ],
-                            "Section 4: Present a Cohesive Narrative": [
-                                "Business Problem Context", "Performance Indicators",
-                                "Upstream Processes", "Interconnectedness Analysis"
-                            ]
-                        }
-                        items = fallback_items.get(section_name, [])
+                        # First try to get dynamically parsed items
+                        if section_name in sections_data and sections_data[section_name]:
+                            items = sections_data[section_name]
+                        else:
+                            # Fallback to predefined items only if no dynamic data
+                            fallback_items = {
+                                "Section 1: Extract and Define Business Vocabulary Terms": [
+                                    "Managed Pros", "Account Support", "Growth Strategies", 
+                                    "Tailored Strategies", "Upselling", "Revenue Growth",
+                                    "Lifetime Value (LTV)", "Missed Opportunities", "Suboptimal"
+                                ],
+                                "Section 2: Identify KPIs and Metrics": [
+                                    "Customer Lifetime Value (LTV)", "Revenue Growth Rate", 
+                                    "Upsell Rate", "Customer Satisfaction Score (CSAT)"
+                                ],
+                                "Section 3: Identify Relevant Business Processes": [
+                                    "Account Management Process", "Sales Strategy Development", 
+                                    "Customer Feedback Loop"
+                                ],
+                                "Section 4: Present a Cohesive Narrative": [
+                                    "Business Problem Context", "Performance Indicators",
+                                    "Upstream Processes", "Interconnectedness Analysis"
+                                ]
+                            }
+                            items = fallback_items.get(section_name, [])
                     
-                    # Show COMPACT dropdown for ALL sections
-                    if items:
-                        selected_items = st.multiselect(
-                            f"Select terms in {display_section_name}:",
-                            options=items,
-                            key=f"vocab_multiselect_{section_name}",  # CHANGED: Agent-specific key
-                            help=f"Select terms with definition issues",
-                            label_visibility="collapsed"  # Hides the label to save space
-                        )
-                    else:
-                        st.info("No terms available for this section.")
-                        selected_items = []
+                        # Show COMPACT dropdown for ALL sections
+                        if items:
+                            selected_items = st.multiselect(
+                                f"Select terms in {display_section_name}:",
+                                options=items,
+                                key=f"vocab_multiselect_{section_name}",  # CHANGED: Agent-specific key
+                                help=f"Select terms with definition issues",
+                                label_visibility="collapsed"  # Hides the label to save space
+                            )
+                        else:
+                            st.info("No terms available for this section.")
+                            selected_items = []
                     
-                    if selected_items:
-                        selected_issues[section_name] = selected_items
-
-                # Single line suggestions - NO WORD LIMIT
-                additional_feedback = st.text_input(
-                    "Additional comments (optional):",
-                    placeholder="Brief description of the issues...",
-                    key="vocab_definitions_additional"  # CHANGED: Agent-specific key
-                )
-
-                submitted = st.form_submit_button("📨 Submit Feedback")
-                if submitted:
-                    if not selected_issues and not additional_feedback.strip():
-                        st.warning("⚠️ Please select at least one term that has definition issues or provide comments.")
-                    else:
-                        # Format issues for submission
-                        issues_list = []
-                        for section, items in selected_issues.items():
-                            for item in items:
-                                issues_list.append(f"{section} - {item}")
+                        if selected_items:
+                            selected_issues[section_name] = selected_items
+
+                    # Single line suggestions - NO WORD LIMIT
+                    additional_feedback = st.text_input(
+                        "Additional comments (optional):",
+                        placeholder="Brief description of the issues...",
+                        key="vocab_definitions_additional"  # CHANGED: Agent-specific key
+                    )
+
+                    submitted = st.form_submit_button("📨 Submit Feedback")
+                    if submitted:
+                        if not selected_issues and not additional_feedback.strip():
+                            st.warning("⚠️ Please select at least one term that has definition issues or provide comments.")
+                        else:
+                            # Format issues for submission
+                            issues_list = []
+                            for section, items in selected_issues.items():
+                                for item in items:
+                                    issues_list.append(f"{section} - {item}")
                         
-                        off_defs_text = " | ".join(issues_list) if issues_list else "No specific terms selected"
+                            off_defs_text = " | ".join(issues_list) if issues_list else "No specific terms selected"
                         
-                        # Use the wrapper function with correct parameters
-                        if submit_feedback_wrapper(
-                            feedback_type=fb_choice, 
-                            user_id=user_id, 
-                            off_definitions=off_defs_text, 
-                            additional_feedback=additional_feedback
-                        ):
-                            st.rerun()
-
-        # Feedback form 3: Suggestions - SINGLE LINE VERSION
-        elif fb_choice == "The widget seems interesting, but I have some suggestions on the features.":
-            with st.form("vocab_feedback_form_suggestions", clear_on_submit=True):  # CHANGED: Agent-specific key
-                st.markdown("**Please share your suggestions for improvement:**")
+                            # Use the wrapper function with correct parameters
+                            if submit_feedback_wrapper(
+                                feedback_type=fb_choice, 
+                                user_id=user_id, 
+                                off_definitions=off_defs_text, 
+                                additional_feedback=additional_feedback
+                            ):
+                                st.rerun()
+
+            # Feedback form 3: Suggestions - SINGLE LINE VERSION
+            elif fb_choice == "The widget seems interesting, but I have some suggestions on the features.":
+                with st.form("vocab_feedback_form_suggestions", clear_on_submit=True):  # CHANGED: Agent-specific key
+                    st.markdown("**Please share your suggestions for improvement:**")
                 
-                # Simple Employee ID display - NO BOX
-                st.markdown(f'**Employee ID:** {user_id}')
+                    # Simple Employee ID display - NO BOX
+                    st.markdown(f'**Employee ID:** {user_id}')
                 
-                # SINGLE LINE suggestions input
-                suggestions = st.text_input(
-                    "Your suggestions:",
-                    placeholder="What features would you like to see improved or added?",
-                    key="vocab_suggestions_input"  # CHANGED: Agent-specific key
-                )
+                    # SINGLE LINE suggestions input
+                    suggestions = st.text_input(
+                        "Your suggestions:",
+                        placeholder="What features would you like to see improved or added?",
+                        key="vocab_suggestions_input"  # CHANGED: Agent-specific key
+                    )
                 
-                submitted = st.form_submit_button("📨 Submit Feedback")
-                if submitted:
-                    if not suggestions.strip():
-                        st.warning("⚠️ Please provide your suggestions.")
-                    else:
-                        # Use the wrapper function
-                        if submit_feedback_wrapper(fb_choice, user_id=user_id, suggestions=suggestions):
-                            st.rerun()
+                    submitted = st.form_submit_button("📨 Submit Feedback")
+                    if submitted:
+                        if not suggestions.strip():
+                            st.warning("⚠️ Please provide your suggestions.")
+                        else:
+                            # Use the wrapper function
+                            if submit_feedback_wrapper(fb_choice, user_id=user_id, suggestions=suggestions):
+                                st.rerun()
     
-    else:
-        # Feedback already submitted - show success and option for another submission
-        st.markdown('<div class="feedback-success">✅ Thank you! Your feedback has been recorded.</div>', unsafe_allow_html=True)
-        if st.button("📝 Submit Another Feedback", key="vocab_reopen_feedback_btn", use_container_width=True):  # CHANGED: Agent-specific key
-            st.session_state.vocab_feedback_submitted = False  # CHANGED
-            st.rerun()
+        else:
+            # Feedback already submitted - show success and option for another submission
+            st.markdown('<div class="feedback-success">✅ Thank you! Your feedback has been recorded.</div>', unsafe_allow_html=True)
+            if st.button("📝 Submit Another Feedback", key="vocab_reopen_feedback_btn", use_container_width=True):  # CHANGED: Agent-specific key
+                st.session_state.vocab_feedback_submitted = False  # CHANGED
+                st.rerun()
+
+    render_feedback_section()
 
 # Enhanced CSS for proper dark mode dropdown visibility
-st.markdown("""
-<style>
-    /* DARK MODE DROPDOWN FIXES - COMPREHENSIVE */
-    /* Fix all dropdown backgrounds to match text input */
-    div[data-baseweb="select"] > div {
-        background-color: #1f2937 !important;
-        color: white !important;
-        border: 2px solid rgba(255,255,255,0.3) !important;
-    }
-    
-    div[data-baseweb="select"] > div:hover {
-        background-color: #374151 !important;
-        border-color: rgba(255,255,255,0.5) !important;
-    }
-    
-    /* Fix dropdown text color */
-    div[data-baseweb="select"] span {
-        color: white !important;
-    }
-    
-    /* Fix dropdown placeholder */
-    div[data-baseweb="select"] input::placeholder {
-        color: #cccccc !important;
-    }
-    
-    /* Fix dropdown arrow */
-    div[data-baseweb="select"] svg {
-        fill: white !important;
-    }
-    
-    /* FIX DROPDOWN POPOVER BACKGROUND - Make it dark like text inputs */
-    [data-baseweb="popover"] {
-        background-color: white !important;
-        border: 2px solid rgba(255,255,255,0.3) !important;
-    }
-    
-    /* FIX DROPDOWN OPTIONS LIST BACKGROUND - Make it dark */
-    [data-baseweb="popover"] > div {
-        background-color: #1f2937 !important;
-        color: white !important;
-    }
-    
-    /* Fix dropdown options */
-    [role="listbox"] [role="option"] {
-        background-color: #1f2937 !important;
-        color: white !important;
-    }
-    
-    [role="listbox"] [role="option"]:hover {
-        background-color: #374151 !important;
-        color: white !important;
-    }
-    
-    /* Fix selected options */
-    [aria-selected="true"] {
-        background-color: #8b1e1e !important;
-        color: white !important;
-    }
-    
-    /* Fix multiselect tags */
-    [data-baseweb="tag"] {
-        background-color: #8b1e1e !important;
-        color: white !important;
-        border: 1px solid white !important;
-    }
-    
-    /* Style text inputs to match - Additional comments box */
-    .stTextInput input {
-        background-color: #1f2937 !important;
-        color: white !important;
-        border: 2px solid rgba(255,255,255,0.3) !important;
-    }
-    
-    .stTextInput input:focus {
-        border-color: #8b1e1e !important;
-    }
-    
-    /* Reduce dropdown width */
-    .stMultiSelect {
-        min-width: 250px !important;
-    }
-    
-    /* SUBMIT BUTTON STYLING - VIBRANT MU SIGMA RED */
-    .stButton button {
-        background-color: #D32F2F !important;
-        color: white !important;
-        border: none !important;
-        padding: 0.5rem 1.5rem !important;
-        border-radius: 6px !important;
-        font-weight: 700 !important;
-        font-size: 1rem !important;
-    }
-    
-    .stButton button:hover {
-        background-color: #B71C1C !important;
-        color: white !important;
-        border: none !important;
-        box-shadow: 0 4px 12px rgba(211, 47, 47, 0.4) !important;
-    }
-    
-    .stButton button:focus {
-        background-color: #D32F2F !important;
-        color: white !important;
-        border: none !important;
-        box-shadow: 0 0 0 3px rgba(211, 47, 47, 0.3) !important;
-    }
-    
-    /* Form submit buttons */
-    [data-testid="baseButton-secondaryFormSubmit"] {
-        background-color: #D32F2F !important;
-        color: white !important;
-        border: none !important;
-        font-weight: 700 !important;
-    }
-    
-    [data-testid="baseButton-secondaryFormSubmit"]:hover {
-        background-color: #B71C1C !important;
-        color: white !important;
-        border: none !important;
-    }
-    
-    /* Ensure all popover content is dark */
-    [data-baseweb="popover"] * {
-        background-color: #1f2937 !important;
-        color: white !important;
-    }
-    
-    /* Specific fix for the options list container */
-    [data-baseweb="popover"] [role="listbox"] {
-        background-color: #1f2937 !important;
-    }
-    
-    /* Fix for the individual option items */
-    [data-baseweb="popover"] [role="option"] {
-        background-color: #1f2937 !important;
-        color: white !important;
-    }
-    
-    [data-baseweb="popover"] [role="option"]:hover {
-        background-color: #374151 !important;
-        color: white !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+inject_stylesheet("vocabulary.css")
 # ===============================
 # Download Section - Only show if feedback submitted FOR THIS AGENT
 # ===============================
@@ -1040,4 +759,5 @@ st.markdown("---")
 if st.button("⬅️ Back to Main Page", use_container_width=True):
     st.switch_page("Welcome_Agent.py")
 
-
+# Keep polling while the background extraction is running
+poll_running_jobs("vocabulary")
@@ -4,48 +4,32 @@ def call_api(agent_name, problem, outputs):
     - agent_name: string, matches the 'name' in API_CONFIGS
     - problem: business problem statement
     - outputs: dict, previous agent outputs (e.g., {'vocabulary': ..., 'current_system': ...})
+    Requests go through the shared pooled client in api_client.
     """
     config = next((a for a in API_CONFIGS if a["name"] == agent_name), None)
-    if not config:
-        st.error("Invalid API configuration.")
-        return None
-
-    prompt = config["prompt"](problem, outputs)
-    payload = {"agency_goal": prompt}
-
-    headers = HEADERS_BASE.copy()
-    headers.update({"Tenant-ID": TENANT_ID, "X-Tenant-ID": TENANT_ID})
-    if 'auth_token' in st.session_state and st.session_state.auth_token:
-        headers["Authorization"] = f"Bearer {st.session_state.auth_token}"
-
-    try:
-        response = requests.post(config["url"], headers=headers, json=payload, timeout=60)
-        if response.status_code == 200:
-            return sanitize_text(json_to_text(response.json()))
-        else:
-            st.error(f"API Error: {response.status_code} - {response.text[:200]}")
-            return None
-    except Exception as e:
-        st.error(f"API Call Failed: {str(e)}")
-        return None
+    return call_reasoning_api(config, problem, outputs,
+                              postprocess=lambda data: sanitize_text(json_to_text(data), strip_rules=True))
 #update current_system also
 import streamlit as st
 from shared_header import (
     render_header,
+    fragment,
     save_feedback_to_admin_session,
     render_unified_business_inputs,
     get_shared_data,
     ACCOUNTS,
     INDUSTRIES,
     ACCOUNT_INDUSTRY_MAP,
-    _safe_rerun,
-    save_feedback_to_file
+    _safe_rerun
 )
-import requests
+from api_client import call_reasoning_api, fetch_configs_concurrently, init_auth_token, report_errors
+from jobs import poll_running_jobs, render_job_progress, submit_agent_job, take_finished_job
+from agent_configs import CURRENT_SYSTEM_API_CONFIGS
+from text_utils import json_to_text, sanitize_text
+from analysis_store import store_session_outputs
+from render_cache import cached_render, clear_render_cache
 import json
-import os
 import re
-import pandas as pd
 from datetime import datetime
 
 
@@ -83,121 +67,16 @@ for key, val in session_defaults.items():
 # =========================================
 # 🌐 API CONFIGURATION
 # =========================================
-TENANT_ID = "talos"
-AUTH_TOKEN = None
-HEADERS_BASE = {"Content-Type": "application/json"}
-
-CURRENT_SYSTEM_API_URL = (
-    "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api"
-    "?society_id=1757657318406&agency_id=1758549095254&level=1"
-)
-
-# Retrieve vocab_output from session state
-vocab_output = st.session_state.get('vocab_output', '')
-
-# Update API_CONFIGS to use vocab_output
-def updated_prompt(problem, outputs):
-    return (
-        f"Problem statement - {problem}\n\n"
-        f"Context from vocabulary:\n{vocab_output}\n\n"
-        "Describe the current system, inputs, outputs, and pain points in detail with clear sections."
-    )
-
-API_CONFIGS = [
-    {
-        "name": "current_system",
-        "url": CURRENT_SYSTEM_API_URL,
-        "multiround_convo": 2,
-        "description": "Current System in Place",
-        "prompt": updated_prompt
-    }
-]
-
-# =========================================
-# 📁 FILE CONFIG
-# =========================================
-# Global feedback file path
-BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-FEEDBACK_FILE = os.path.join(BASE_DIR, "feedback.csv")
-
-
-# Initialize feedback file if not present
-try:
-    if not os.path.exists(FEEDBACK_FILE):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        df = pd.DataFrame([
-            [timestamp, "", "", "", "", "", "", "", ""]
-        ], columns=["Timestamp","Employee_id", "Feedback", "FeedbackType", "OffDefinitions", "Suggestions", "Account", "Industry", "ProblemStatement"])
-        df.to_csv(FEEDBACK_FILE, index=False)
-except (PermissionError, OSError) as e:
-    if 'feedback_data' not in st.session_state:
-        st.session_state.feedback_data = pd.DataFrame(
-            columns=["Timestamp", "Employee_id", "Feedback", "FeedbackType", "OffDefinitions", "Suggestions", "Account", "Industry", "ProblemStatement"])
+API_CONFIGS = CURRENT_SYSTEM_API_CONFIGS
 
 # Token initialization
-def _init_auth_token():
-    token = os.environ.get("AUTH_TOKEN", "")
-    try:
-        if not token:
-            token = st.secrets.get("AUTH_TOKEN", "")
-    except Exception:
-        pass
-    return token or ""
-
 if 'auth_token' not in st.session_state:
-    st.session_state.auth_token = _init_auth_token()
+    st.session_state.auth_token = init_auth_token()
 
 
 # =========================================
 # 🧹 HELPER FUNCTIONS
 # =========================================
-def json_to_text(data):
-    if data is None:
-        return ""
-    if isinstance(data, str):
-        return data
-    if isinstance(data, dict):
-        for key in ("result", "output", "content", "text"):
-            if key in data and data[key]:
-                return json_to_text(data[key])
-        if "data" in data:
-            return json_to_text(data["data"])
-        return "\n".join(f"{k}: {json_to_text(v)}" for k, v in data.items() if v)
-    if isinstance(data, list):
-        return "\n".join(json_to_text(x) for x in data if x)
-    return str(data)
-
-
-def sanitize_text(text):
-    """Remove markdown artifacts and clean up text"""
-    if not text:
-        return ""
-
-    # Fix the "s" character issue - remove stray 's' characters at the beginning
-    text = re.sub(r'^\s*s\s+', '', text.strip())
-    text = re.sub(r'\n\s*s\s+', '\n', text)
-
-    # Remove --- lines
-    text = re.sub(r'^---\s*$', '', text, flags=re.MULTILINE)
-    
-    text = re.sub(r'Q\d+\s*Answer\s*Explanation\s*:',
-                  '', text, flags=re.IGNORECASE)
-    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)
-    text = re.sub(r'\*(.*?)\*', r'\1', text)
-    text = re.sub(r'`(.*?)`', r'\1', text)
-    text = re.sub(r'#+\s*', '', text)
-    text = re.sub(r'!\[.*?\]\(.*?\)', '', text)
-    text = re.sub(r'\[(.*?)\]\(.*?\)', r'\1', text)
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    text = re.sub(r' {2,}', ' ', text)
-    text = re.sub(r'^\s*[-*]\s+', '• ', text, flags=re.MULTILINE)
-    text = re.sub(r'<\/?[^>]+>', '', text)
-    text = re.sub(r'&', '&', text)
-    text = re.sub(r'& Key Takeaway:', 'Key Takeaway:', text)
-
-    return text.strip()
-
-
 def format_current_system_with_bold(text, extra_phrases=None):
     """
     Format Current System output with bold styling.
@@ -208,7 +87,7 @@ def format_current_system_with_bold(text, extra_phrases=None):
 
     # Sanitize text
     try:
-        clean_text = sanitize_text(text)
+        clean_text = sanitize_text(text, strip_rules=True)
     except NameError:
         clean_text = text
 
@@ -402,39 +281,9 @@ def parse_current_system_sections(text):
     return sections
 
 
-def call_api(agent_name, problem, context=""):
-    """Call the Talos API using centralized API_CONFIGS"""
-    config = next((a for a in API_CONFIGS if a["name"] == agent_name), None)
-    if not config:
-        st.error("Invalid API configuration.")
-        return None
-
-    prompt = config["prompt"](problem, {"vocabulary": context})
-    payload = {"agency_goal": prompt}
-
-    headers = HEADERS_BASE.copy()
-    headers.update({"Tenant-ID": TENANT_ID, "X-Tenant-ID": TENANT_ID})
-    if AUTH_TOKEN:
-        headers["Authorization"] = f"Bearer {AUTH_TOKEN}"
-
-    try:
-        response = requests.post(config["url"], headers=headers, json=payload)
-        st.write(f'📬 API Response Status: {response.status_code}')
-        st.write(f'📬 API Response Body: {response.text[:1000]}')
-        if response.status_code == 200:
-            return sanitize_text(json_to_text(response.json()))
-        else:
-            st.error(f"❌ API Error: {response.status_code}")
-            return None
-    except Exception as e:
-        st.error(f"❌ API Call Failed: {str(e)}")
-        return None
-
 def submit_feedback(feedback_type, employee_id="", off_definitions="", suggestions="", additional_feedback="", 
                    account="", industry="", problem_statement=""):
-    """Submit feedback to CSV file and admin session storage"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
+    """Submit feedback through the shared ingestion path (one durable write)"""
     # Get context data from session state
     account = st.session_state.get("current_account", "")
     industry = st.session_state.get("current_industry", "")
@@ -442,7 +291,7 @@ def submit_feedback(feedback_type, employee_id="", off_definitions="", suggestio
 
     # Create feedback data for admin session
     feedback_data = {
-        "EmployeeID": employee_id,
+        "Employee_id": employee_id,
         "Feedback": additional_feedback,
         "FeedbackType": feedback_type,
         "OffDefinitions": off_definitions,
@@ -452,55 +301,13 @@ def submit_feedback(feedback_type, employee_id="", off_definitions="", suggestio
         "ProblemStatement": problem_statement
     }
 
-    # Save to admin session storage
-    save_feedback_to_admin_session(feedback_data, "Current System Agent")
-
-    # Save feedback to CSV file
-    feedback_df = pd.DataFrame([feedback_data])
-    save_feedback_to_file(feedback_df)
-
-    # Also save to CSV file (original functionality)
-    new_entry = pd.DataFrame([
-        [
-            timestamp, employee_id, additional_feedback, feedback_type, off_definitions, suggestions, account, industry, problem_statement
-        ]
-    ], columns=["Timestamp", "EmployeeID", "Feedback", "FeedbackType", "OffDefinitions", "Suggestions", "Account", "Industry", "ProblemStatement"])
-
-    try:
-        # Try file-based storage first
-        if os.path.exists(FEEDBACK_FILE):
-            existing = pd.read_csv(FEEDBACK_FILE)
-
-            # Handle schema mismatch
-            missing_cols = set(new_entry.columns) - set(existing.columns)
-            for col in missing_cols:
-                existing[col] = ''
-
-            # Reorder existing columns to match the new entry's order
-            existing = existing[new_entry.columns]
-
-            updated = pd.concat([existing, new_entry], ignore_index=True)
-        else:
-            updated = new_entry
-
-        try:
-            updated.to_csv(FEEDBACK_FILE, index=False)
-        except (PermissionError, OSError):
-            # Fallback to session state on Streamlit Cloud
-            if 'feedback_data' not in st.session_state:
-                st.session_state.feedback_data = pd.DataFrame(
-                    columns=new_entry.columns)
-            st.session_state.feedback_data = pd.concat(
-                [st.session_state.feedback_data, new_entry], ignore_index=True)
-            st.info("📝 Feedback saved to session (cloud mode)")
-
-        # Set AGENT-SPECIFIC feedback flag
-        st.session_state.current_system_feedback_submitted = True
-        return True
-    except Exception as e:
-        st.error(f"Error saving feedback: {str(e)}")
+    # Single ingestion path: canonical schema, one durable write
+    if not save_feedback_to_admin_session(feedback_data, "Current System Agent"):
         return False
 
+    st.session_state.current_system_feedback_submitted = True
+    return True
+
 def reset_app_state():
     """Completely reset session state to initial values"""
     # Clear vocabulary-related state
@@ -509,6 +316,7 @@ def reset_app_state():
     for key in keys_to_clear:
         if key in st.session_state:
             del st.session_state[key]
+    clear_render_cache()
 
     st.success("✅ Application reset successfully! You can start a new analysis.")
 # =========================================
@@ -548,16 +356,41 @@ if not st.session_state.current_system_extracted:
         if not st.session_state.saved_problem.strip():
             st.error("⚠️ Please save your business problem details first!")
         else:
-            with st.spinner("🔍 Extracting current system analysis..."):
-                outputs = {
-                    "vocabulary": st.session_state.get("vocab_output", ""),
-                }
-                api_output = call_api("current_system", st.session_state.saved_problem, outputs)
-                if api_output:
-                    st.session_state.current_system_data = api_output
-                    st.session_state.current_system_extracted = True
-                    st.success("✅ Current System extracted successfully!")
-                    _safe_rerun()
+            outputs = {
+                "vocabulary": st.session_state.get("vocab_output", ""),
+            }
+            problem_text = st.session_state.saved_problem
+            auth_token = st.session_state.auth_token
+            # Runs in the background so a rerun or page switch does not throw the extraction away
+            submit_agent_job(
+                "current_system", problem_text, outputs,
+                lambda on_progress, on_partial, on_queue: fetch_configs_concurrently(
+                    API_CONFIGS, problem_text, outputs, auth_token,
+                    postprocess=lambda data: sanitize_text(json_to_text(data), strip_rules=True),
+                    on_progress=on_progress,
+                    on_partial=on_partial,
+                    on_queue=on_queue,
+                ),
+            )
+
+# Pick up a finished background extraction (possibly started before a rerun or page switch)
+finished_job = take_finished_job("current_system")
+if finished_job:
+    if finished_job.status == "failed":
+        st.error(f"API Call Failed: {finished_job.error}")
+    else:
+        results, errors = finished_job.result
+        api_output = results.get("current_system")
+        if api_output:
+            st.session_state.current_system_data = api_output
+            st.session_state.current_system_extracted = True
+            store_session_outputs("current_system")
+            st.success("✅ Current System extracted successfully!")
+            _safe_rerun()
+        else:
+            report_errors(errors)
+else:
+    render_job_progress("current_system", "🔍 Extracting current system analysis...")
 
 
    
@@ -588,8 +421,6 @@ if st.session_state.current_system_extracted:
         unsafe_allow_html=True,
     )
     
-    sections = parse_current_system_sections(st.session_state.current_system_data)
-
     # Clean and format each section to remove numbers and extra whitespace
     def clean_section_content(content):
         """Remove numbered lists (1., 2., 3., etc.) and clean up formatting"""
@@ -639,9 +470,26 @@ if st.session_state.current_system_extracted:
         items_html = '\n'.join([f"<li style='margin:6px 0; line-height:1.4;'>{re.sub(r'\s+', ' ', itm)}</li>" for itm in lines])
         return f"<ul style='padding-left:1.2rem; margin:0; color: var(--text-primary);'>{items_html}</ul>"
 
-    
+    def render_current_system_sections(text):
+        """Parsed and cleaned HTML for each result card"""
+        sections = parse_current_system_sections(text)
+        return {
+            "core_problem": clean_section_content(sections["core_problem"]),
+            "current_system": convert_to_pointwise_html(clean_section_content(sections["current_system"])),
+            "inputs": convert_to_pointwise_html(clean_section_content(sections["inputs"])),
+            "outputs": convert_to_pointwise_html(clean_section_content(sections["outputs"])),
+            "pain_points": convert_to_pointwise_html(clean_section_content(sections["pain_points"])),
+        }
+
+    # Reused across reruns while the extraction is unchanged (names are not substituted here)
+    current_system_text = st.session_state.current_system_data
+    section_html = cached_render(
+        "current_system", current_system_text, None, None,
+        lambda: render_current_system_sections(current_system_text),
+    )
+
     # Display Core Problem with red border (above all)
-    core_problem_clean = clean_section_content(sections["core_problem"])
+    core_problem_clean = section_html["core_problem"]
     st.markdown(
         f"""
         <div style="
@@ -678,8 +526,7 @@ if st.session_state.current_system_extracted:
     )
 
     # Display Current System with red border (as unordered points)
-    current_system_clean = clean_section_content(sections["current_system"])
-    current_system_points_html = convert_to_pointwise_html(current_system_clean)
+    current_system_points_html = section_html["current_system"]
     st.markdown(
         f"""
         <div style="
@@ -719,7 +566,6 @@ if st.session_state.current_system_extracted:
     col1, col2 = st.columns(2)
     
     with col1:
-        inputs_clean = clean_section_content(sections["inputs"])
         st.markdown(
             f"""
             <div style="
@@ -749,7 +595,7 @@ if st.session_state.current_system_extracted:
                     text-align: left;
                     white-space: normal;
                 ">
-                    {convert_to_pointwise_html(inputs_clean)}
+                    {section_html['inputs']}
                 </div>
             </div>
             """,
@@ -757,7 +603,6 @@ if st.session_state.current_system_extracted:
         )
     
     with col2:
-        outputs_clean = clean_section_content(sections["outputs"])
         st.markdown(
             f"""
             <div style="
@@ -787,7 +632,7 @@ if st.session_state.current_system_extracted:
                     text-align: left;
                     white-space: normal;
                 ">
-                    {convert_to_pointwise_html(outputs_clean)}
+                    {section_html['outputs']}
                 </div>
             </div>
             """,
@@ -795,7 +640,6 @@ if st.session_state.current_system_extracted:
         )
     
     # Display Pain Points with red border
-    pain_points_clean = clean_section_content(sections["pain_points"])
     st.markdown(
         f"""
         <div style="
@@ -824,7 +668,7 @@ if st.session_state.current_system_extracted:
                 text-align: left;
                 white-space: normal;
             ">
-                {convert_to_pointwise_html(pain_points_clean)}
+                {section_html['pain_points']}
             </div>
         </div>
         """,
@@ -880,112 +724,117 @@ if st.session_state.current_system_extracted:
 
 
     # Show feedback section if not submitted - USING AGENT-SPECIFIC FLAG
-    if not st.session_state.get('current_system_feedback_submitted', False):
-        fb_choice = st.radio(
-            "Select your feedback type:",
-            options=[
-                "I have read it, found it useful, thanks.",
-                "I have read it, found some definitions to be off.",
-                "The widget seems interesting, but I have some suggestions on the features.",
-            ],
-            index=None,
-            key="current_system_feedback_radio",
-        )
+    @fragment
+    def render_feedback_section():
+        """Feedback form; its widgets rerun only this section"""
+        if not st.session_state.get('current_system_feedback_submitted', False):
+            fb_choice = st.radio(
+                "Select your feedback type:",
+                options=[
+                    "I have read it, found it useful, thanks.",
+                    "I have read it, found some definitions to be off.",
+                    "The widget seems interesting, but I have some suggestions on the features.",
+                ],
+                index=None,
+                key="current_system_feedback_radio",
+            )
 
-        if fb_choice:
-            st.session_state.current_system_feedback_option = fb_choice
+            if fb_choice:
+                st.session_state.current_system_feedback_option = fb_choice
 
-        # Feedback form 1: Positive feedback - SIMPLIFIED
-        if fb_choice == "I have read it, found it useful, thanks.":
-            with st.form("current_system_feedback_form_positive", clear_on_submit=True):
-                st.info("Thank you for your positive feedback!")
-                # ONLY EMPLOYEE ID - NO OTHER FIELDS
-                st.markdown(f'**Employee ID:** {user_id}')
-                
-                submitted = st.form_submit_button("📨 Submit Positive Feedback", type="primary")
-                if submitted:
-                    if submit_feedback_wrapper(fb_choice, user_id):
-                        st.session_state.current_system_feedback_submitted = True
-                        st.success("✅ Thank you! Your feedback has been recorded.")
-                        st.rerun()
-
-        # Feedback form 2: Definitions off - SIMPLIFIED
-        elif fb_choice == "I have read it, found some definitions to be off.":
-            with st.form("current_system_feedback_form_defs", clear_on_submit=True):
-                st.markdown("**Please select which sections have definitions that seem off:**")
+            # Feedback form 1: Positive feedback - SIMPLIFIED
+            if fb_choice == "I have read it, found it useful, thanks.":
+                with st.form("current_system_feedback_form_positive", clear_on_submit=True):
+                    st.info("Thank you for your positive feedback!")
+                    # ONLY EMPLOYEE ID - NO OTHER FIELDS
+                    st.markdown(f'**Employee ID:** {user_id}')
                 
-                # ONLY EMPLOYEE ID - NO OTHER FIELDS
-                st.markdown(f'**Employee ID:** {user_id}')
-
-                # Section selection
-                st.markdown("### Select problematic sections:")
-                sections_list = [
-                    "Core Business Problem",
-                    "Current System Overview", 
-                    "Key Technologies/Tools",
-                    "Roles/Stakeholders",
-                    "Inputs",
-                    "Outputs", 
-                    "Pain Points"
-                ]
-                
-                selected_issues = {}
-                for i, section in enumerate(sections_list):
-                    selected = st.checkbox(
-                        section,
-                        key=f"current_system_def_section_{i}",
-                        help=f"Select if {section} has definition issues"
-                    )
-                    if selected:
-                        selected_issues[section] = True
-
-                additional_feedback = st.text_input(
-                    "Additional comments:",
-                    placeholder="Please provide more details about the definition issues you found...",
-                    key="current_system_defs_additional"
-                )
-
-                submitted = st.form_submit_button("📨 Submit Feedback", type="primary")
-                if submitted:
-                    if not selected_issues:
-                        st.warning("⚠️ Please select at least one section that has definition issues.")
-                    else:
-                        issues_list = list(selected_issues.keys())
-                        off_defs_text = " | ".join(issues_list)
-                        if submit_feedback_wrapper(fb_choice, user_id=user_id, off_definitions=off_defs_text, 
-                                                 additional_feedback=additional_feedback):
+                    submitted = st.form_submit_button("📨 Submit Positive Feedback", type="primary")
+                    if submitted:
+                        if submit_feedback_wrapper(fb_choice, user_id):
                             st.session_state.current_system_feedback_submitted = True
                             st.success("✅ Thank you! Your feedback has been recorded.")
                             st.rerun()
 
-        # Feedback form 3: Suggestions - SIMPLIFIED
-        elif fb_choice == "The widget seems interesting, but I have some suggestions on the features.":
-            with st.form("current_system_feedback_form_suggestions", clear_on_submit=True):
-                st.markdown("**Please share your suggestions for improvement:**")
+            # Feedback form 2: Definitions off - SIMPLIFIED
+            elif fb_choice == "I have read it, found some definitions to be off.":
+                with st.form("current_system_feedback_form_defs", clear_on_submit=True):
+                    st.markdown("**Please select which sections have definitions that seem off:**")
                 
-                # ONLY EMPLOYEE ID - NO OTHER FIELDS
-                st.markdown(f'**Employee ID:** {user_id}')
+                    # ONLY EMPLOYEE ID - NO OTHER FIELDS
+                    st.markdown(f'**Employee ID:** {user_id}')
+
+                    # Section selection
+                    st.markdown("### Select problematic sections:")
+                    sections_list = [
+                        "Core Business Problem",
+                        "Current System Overview", 
+                        "Key Technologies/Tools",
+                        "Roles/Stakeholders",
+                        "Inputs",
+                        "Outputs", 
+                        "Pain Points"
+                    ]
                 
-                suggestions = st.text_input(
-                    "Your suggestions:",
-                    placeholder="What features would you like to see improved or added?",
-                    key="current_system_suggestions_text"
-                )
-                submitted = st.form_submit_button("📨 Submit Feedback", type="primary")
-                if submitted:
-                    if not suggestions.strip():
-                        st.warning("⚠️ Please provide your suggestions.")
-                    else:
-                        if submit_feedback_wrapper(fb_choice, user_id=user_id, suggestions=suggestions):
-                            st.session_state.current_system_feedback_submitted = True
-                            st.success("✅ Thank you! Your feedback has been recorded.")
-                            st.rerun()
-    else:
-        # Feedback already submitted
-        st.success("✅ Thank you! Your feedback has been recorded.")
-        if st.button("📝 Submit Additional Feedback", key="current_system_reopen_feedback_btn", type="primary"):
-            st.session_state.current_system_feedback_submitted = False
-            st.rerun()
+                    selected_issues = {}
+                    for i, section in enumerate(sections_list):
+                        selected = st.checkbox(
+                            section,
+                            key=f"current_system_def_section_{i}",
+                            help=f"Select if {section} has definition issues"
+                        )
+                        if selected:
+                            selected_issues[section] = True
+
+                    additional_feedback = st.text_input(
+                        "Additional comments:",
+                        placeholder="Please provide more details about the definition issues you found...",
+                        key="current_system_defs_additional"
+                    )
+
+                    submitted = st.form_submit_button("📨 Submit Feedback", type="primary")
+                    if submitted:
+                        if not selected_issues:
+                            st.warning("⚠️ Please select at least one section that has definition issues.")
+                        else:
+                            issues_list = list(selected_issues.keys())
+                            off_defs_text = " | ".join(issues_list)
+                            if submit_feedback_wrapper(fb_choice, user_id=user_id, off_definitions=off_defs_text, 
+                                                     additional_feedback=additional_feedback):
+                                st.session_state.current_system_feedback_submitted = True
+                                st.success("✅ Thank you! Your feedback has been recorded.")
+                                st.rerun()
+
+            # Feedback form 3: Suggestions - SIMPLIFIED
+            elif fb_choice == "The widget seems interesting, but I have some suggestions on the features.":
+                with st.form("current_system_feedback_form_suggestions", clear_on_submit=True):
+                    st.markdown("**Please share your suggestions for improvement:**")
+                
+                    # ONLY EMPLOYEE ID - NO OTHER FIELDS
+                    st.markdown(f'**Employee ID:** {user_id}')
+                
+                    suggestions = st.text_input(
+                        "Your suggestions:",
+                        placeholder="What features would you like to see improved or added?",
+                        key="current_system_suggestions_text"
+                    )
+                    submitted = st.form_submit_button("📨 Submit Feedback", type="primary")
+                    if submitted:
+                        if not suggestions.strip():
+                            st.warning("⚠️ Please provide your suggestions.")
+                        else:
+                            if submit_feedback_wrapper(fb_choice, user_id=user_id, suggestions=suggestions):
+                                st.session_state.current_system_feedback_submitted = True
+                                st.success("✅ Thank you! Your feedback has been recorded.")
+                                st.rerun()
+        else:
+            # Feedback already submitted
+            st.success("✅ Thank you! Your feedback has been recorded.")
+            if st.button("📝 Submit Additional Feedback", key="current_system_reopen_feedback_btn", type="primary"):
+                st.session_state.current_system_feedback_submitted = False
+                st.rerun()
+
+    render_feedback_section()
 
     # ===============================
     # Download Section (Only show after feedback submission - AGENT-SPECIFIC)
@@ -1042,4 +891,5 @@ st.markdown("---")
 if st.button("⬅️ Back to Main Page", use_container_width=True):
     st.switch_page("Welcome_Agent.py")
 
-
+# Keep polling while the background extraction is running
+poll_running_jobs("current_system")
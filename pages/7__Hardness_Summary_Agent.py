@@ -4,42 +4,19 @@ def call_api(agent_name, problem, outputs):
     - agent_name: string, matches the 'name' in API_CONFIGS
     - problem: business problem statement
     - outputs: dict, previous agent outputs (e.g., {'vocabulary': ..., 'current_system': ...})
+    Requests go through the shared pooled client in api_client.
     """
     config = next((a for a in API_CONFIGS if a["name"] == agent_name), None)
-    if not config:
-        st.error("Invalid API configuration.")
-        return None
-
-    prompt = config["prompt"](problem, outputs)
-    payload = {"agency_goal": prompt}
-
-    headers = HEADERS_BASE.copy()
-    headers.update({"Tenant-ID": TENANT_ID, "X-Tenant-ID": TENANT_ID})
-    if 'auth_token' in st.session_state and st.session_state.auth_token:
-        headers["Authorization"] = f"Bearer {st.session_state.auth_token}"
-
-    try:
-        response = requests.post(config["url"], headers=headers, json=payload, timeout=60)
-        if response.status_code == 200:
-            return sanitize_text(json_to_text(response.json()))
-        else:
-            st.error(f"API Error: {response.status_code} - {response.text[:200]}")
-            return None
-    except Exception as e:
-        st.error(f"API Call Failed: {str(e)}")
-        return None
+    return call_reasoning_api(config, problem, outputs,
+                              postprocess=lambda data: sanitize_text(json_to_text(data)))
 import streamlit as st
 import streamlit.components.v1 as components
-import os
 import re
 import json
-from datetime import datetime
-import pandas as pd
-import requests
 from shared_header import (
     render_header,
+    fragment,
     save_feedback_to_admin_session,
-    save_feedback_to_file,
     ACCOUNTS,
     INDUSTRIES,
     ACCOUNT_INDUSTRY_MAP,
@@ -52,6 +29,12 @@ from shared_header import (
     get_all_question_scores,
     DIMENSION_QUESTIONS
 )
+from api_client import call_reasoning_api, fetch_configs_concurrently, init_auth_token
+from jobs import poll_running_jobs, render_job_progress, session_hedge_budget, submit_agent_job, take_finished_job
+from agent_configs import HARDNESS_API_CONFIGS
+from text_utils import json_to_text, parse_hardness_summary, sanitize_text
+from analysis_store import store_session_outputs
+from pipeline import hardness_inputs, session_results
 
 # --- Page Config ---
 st.set_page_config(
@@ -87,181 +70,16 @@ render_header(
 # API Configuration for Hardness
 # ===============================
 
-# Constants
-TENANT_ID = "talos"
-HEADERS_BASE = {"Content-Type": "application/json"}
-
-# Hardness API
-def updated_prompt(problem, outputs):
-    return (
-        f"Problem statement - {problem}\n\n"
-        f"Context from vocabulary:\n{outputs.get('vocabulary', '')}\n\n"
-        f"Context from current system:\n{outputs.get('current_system', '')}\n\n"
-        f"Volatility Analysis:\n{outputs.get('volatility', {}).get('Q1', '')}\n\n"
-        f"Ambiguity Analysis:\n{outputs.get('ambiguity', {}).get('Q4', '')}\n\n"
-        f"Interconnectedness Analysis:\n{outputs.get('interconnectedness', {}).get('Q7', '')}\n\n"
-        f"Uncertainty Analysis:\n{outputs.get('uncertainty', {}).get('Q10', '')}\n\n"
-        "Based on the comprehensive analysis of the business problem, provide a hardness assessment with the following sections IN THIS EXACT FORMAT:\n\n"
-        "Overall Difficulty Score\n"
-        "[Provide a single numerical score between 0-5 based on your assessment of the problem complexity]\n\n"
-        "Hardness Level\n"
-        "[Easy: 0-3.0, Moderate: 3.1-4.0, or Hard: 4.1-5.0]\n\n"
-        "SME Justification\n"
-        "[Provide detailed justification analyzing the problem across multiple dimensions - complexity, ambiguity, interconnectedness, and uncertainty]\n\n"
-        "Summary\n"
-        "[Provide a concise summary of the overall assessment in 2-3 sentences]\n\n"
-        "Key Takeaways\n"
-        "[Provide 3-5 bullet points with actionable insights]\n\n"
-        "IMPORTANT: Make sure each section is clearly labeled with its header as shown above. Provide actual scores and analysis, not placeholders."
-    )
-
-API_CONFIGS = [
-    {
-        "name": "hardness_summary",
-        "url": "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api?society_id=1757657318406&agency_id=1758619658634&level=1",
-        "multiround_convo": 2,
-        "description": "Hardness Level, Summary & Key Takeaways",
-        "prompt": updated_prompt
-    }
-]
-
-# Global feedback file path
-BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-FEEDBACK_FILE = os.path.join(BASE_DIR, "feedback.csv")
-
-# Initialize feedback file if not present
-try:
-    if not os.path.exists(FEEDBACK_FILE):
-        df = pd.DataFrame(columns=["Timestamp", "Employee_id", "Feedback", "FeedbackType",
-                          "OffDefinitions", "Suggestions", "Account", "Industry", "ProblemStatement"])
-        df.to_csv(FEEDBACK_FILE, index=False)
-except (PermissionError, OSError) as e:
-    if 'feedback_data' not in st.session_state:
-        st.session_state.feedback_data = pd.DataFrame(
-            columns=["Timestamp", "Employee_id", "Feedback", "FeedbackType", "OffDefinitions", "Suggestions", "Account", "Industry", "ProblemStatement"])
+API_CONFIGS = HARDNESS_API_CONFIGS
 
 # Token initialization
-def _init_auth_token():
-    token = os.environ.get("AUTH_TOKEN", "")
-    try:
-        if not token:
-            token = st.secrets.get("AUTH_TOKEN", "")
-    except Exception:
-        pass
-    return token or ""
-
 if 'auth_token' not in st.session_state:
-    st.session_state.auth_token = _init_auth_token()
+    st.session_state.auth_token = init_auth_token()
 
 # ===============================
 # Utility Functions
 # ===============================
 
-def json_to_text(data):
-    """Extract text from JSON response"""
-    if data is None:
-        return ""
-    if isinstance(data, str):
-        return data
-    if isinstance(data, dict):
-        for key in ("result", "output", "content", "text", "answer", "response"):
-            if key in data and data[key]:
-                return json_to_text(data[key])
-        if "data" in data:
-            return json_to_text(data["data"])
-        # Try to extract any string values
-        for value in data.values():
-            if isinstance(value, str) and len(value) > 10:
-                return value
-        return "\n".join(f"{k}: {json_to_text(v)}" for k, v in data.items() if v)
-    if isinstance(data, list):
-        return "\n".join(json_to_text(x) for x in data if x)
-    return str(data)
-
-def sanitize_text(text):
-    """Remove markdown artifacts and clean up text"""
-    if not text:
-        return ""
-
-    # Fix the "s" character issue
-    text = re.sub(r'^\s*s\s+', '', text.strip())
-    text = re.sub(r'\n\s*s\s+', '\n', text)
-
-    text = re.sub(r'Q\d+\s*Answer\s*Explanation\s*:',
-                  '', text, flags=re.IGNORECASE)
-    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)
-    text = re.sub(r'\*(.*?)\*', r'\1', text)
-    text = re.sub(r'`(.*?)`', r'\1', text)
-    text = re.sub(r'#+\s*', '', text)
-    text = re.sub(r'!\[.*?\]\(.*?\)', '', text)
-    text = re.sub(r'\[(.*?)\]\(.*?\)', r'\1', text)
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    text = re.sub(r' {2,}', ' ', text)
-    text = re.sub(r'^\s*[-*]\s+', '• ', text, flags=re.MULTILINE)
-    text = re.sub(r'<\/?[^>]+>', '', text)
-    text = re.sub(r'& Key Takeaway:', 'Key Takeaway:', text)
-
-    return text.strip()
-
-def extract_hardness_score(text):
-    """Extract the hardness score from the API response"""
-    if not text:
-        return None
-    
-    # Look for score patterns in the Overall Difficulty Score section
-    score_patterns = [
-        r'Overall Difficulty Score\s*[:\-]?\s*(\d+\.?\d*)',
-        r'Score\s*[:\-]?\s*(\d+\.?\d*)',
-        r'(\d+\.?\d*)\s*\/\s*5',
-        r'(\d+\.?\d*)\s*out of\s*5',
-        r'Hardness Level.*?(\d+\.?\d*)',
-    ]
-    
-    for pattern in score_patterns:
-        matches = re.search(pattern, text, re.IGNORECASE)
-        if matches:
-            try:
-                score = float(matches.group(1))
-                if 0 <= score <= 5:
-                    return score
-            except ValueError:
-                continue
-    
-    # If no specific score found, look for any number between 0-5
-    numbers = re.findall(r'\b(\d+\.?\d*)\b', text)
-    for num in numbers:
-        try:
-            score = float(num)
-            if 0 <= score <= 5:
-                return score
-        except ValueError:
-            continue
-    
-    return None
-
-def extract_hardness_classification(text):
-    """Extract hardness classification from text"""
-    if not text:
-        return "UNKNOWN"
-    
-    text_lower = text.lower()
-    
-    if any(word in text_lower for word in ['hard', 'difficult', 'complex', 'challenging', '4.1', '4.2', '4.3', '4.4', '4.5', '4.6', '4.7', '4.8', '4.9', '5.0']):
-        return "HARD"
-    elif any(word in text_lower for word in ['moderate', 'medium', 'average', '3.1', '3.2', '3.3', '3.4', '3.5', '3.6', '3.7', '3.8', '3.9', '4.0']):
-        return "MODERATE"
-    elif any(word in text_lower for word in ['easy', 'simple', 'straightforward', '0.', '1.', '2.', '3.0']):
-        return "NOT HARD"
-    else:
-        # Fallback: use score if available
-        score = extract_hardness_score(text)
-        if score is not None:
-            if score >= 4.0:
-                return "HARD"
-            else:
-                return "NOT HARD"
-        return "UNKNOWN"
-
 def format_hardness_output(text):
     """Format hardness output by removing everything before SME Justification and cleaning up"""
     if not text:
@@ -312,9 +130,7 @@ def submit_feedback_wrapper(feedback_type, user_id="", off_definitions="", sugge
     )
 
 def submit_feedback(feedback_type, employee_id="", off_definitions="", suggestions="", additional_feedback=""):
-    """Submit feedback to CSV file and admin session storage"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
+    """Submit feedback through the shared ingestion path (one durable write)"""
     # Get context data from session state
     account = st.session_state.get("current_account", "")
     industry = st.session_state.get("current_industry", "")
@@ -322,7 +138,7 @@ def submit_feedback(feedback_type, employee_id="", off_definitions="", suggestio
 
     # Create feedback data for admin session
     feedback_data = {
-        "EmployeeID": employee_id,
+        "Employee_id": employee_id,
         "Feedback": additional_feedback,
         "FeedbackType": feedback_type,
         "OffDefinitions": off_definitions,
@@ -332,23 +148,11 @@ def submit_feedback(feedback_type, employee_id="", off_definitions="", suggestio
         "ProblemStatement": problem_statement
     }
 
-    # Save to admin session storage
-    save_feedback_to_admin_session(feedback_data, "Hardness Agent")
-
-    # Also save to CSV file (original functionality)
-    new_entry = pd.DataFrame([
-        [
-            timestamp, employee_id, additional_feedback, feedback_type, off_definitions, suggestions, account, industry, problem_statement
-        ]
-    ], columns=["Timestamp", "EmployeeID", "Feedback", "FeedbackType", "OffDefinitions", "Suggestions", "Account", "Industry", "ProblemStatement"])
+    # Single ingestion path: canonical schema, one durable write
+    if not save_feedback_to_admin_session(feedback_data, "Hardness Agent"):
+        return False
 
-    # Replace the feedback saving logic with the centralized function
-    try:
-        save_feedback_to_file(new_entry)
-    except Exception as e:
-        st.error(f"Error saving feedback: {str(e)}")
-
-    st.session_state.hardness_feedback_submitted = True  # AGENT-SPECIFIC
+    st.session_state.hardness_feedback_submitted = True
     return True
 
 # ===============================
@@ -431,80 +235,45 @@ if analyze_btn:
         st.error("❌ Please enter a business problem description.")
         st.stop()
 
-    # Build enhanced context with dimension scores if available
-    dimension_scores_text = ""
-    if all_completed:
-        dimension_scores = progress_data['scores']
-        dimension_scores_text = "\n\nDimension Scores:\n"
-        for dimension, score in dimension_scores.items():
-            if score is not None:
-                dimension_scores_text += f"{dimension.title()}: {score:.2f}/5\n"
-    
-    full_context = f"""
-    Business Problem:
-    {problem.strip()}
-
-    Context:
-    Account: {account}
-    Industry: {industry}
-    {dimension_scores_text}
-    """.strip()
-
-    # Prepare headers with authentication
-    headers = HEADERS_BASE.copy()
-    headers.update({
-        "Tenant-ID": TENANT_ID,
-        "X-Tenant-ID": TENANT_ID
-    })
-
-    if st.session_state.auth_token:
-        headers["Authorization"] = f"Bearer {st.session_state.auth_token}"
-
-    with st.spinner("🔍 Analyzing problem hardness and difficulty..."):
-        progress = st.progress(0)
-        st.session_state.hardness_outputs = {}
+    # Same context and upstream outputs as the full analysis, so both share cached answers
+    hardness_problem, hardness_outputs = hardness_inputs(problem, account, industry, session_results(st.session_state))
 
-        try:
-            with requests.Session() as session:
-                total_apis = len(API_CONFIGS)
-                
-                for i, api_cfg in enumerate(API_CONFIGS):
-                    progress.progress(i / total_apis)
-                    
-                    try:
-                        goal = api_cfg["prompt"](full_context, {})
-                        
-                        # Make API request with timeout
-                        response = session.post(
-                            api_cfg["url"],
-                            headers=headers,
-                            json={"agency_goal": goal},
-                            timeout=60
-                        )
-
-                        if response.status_code == 200:
-                            # Process successful response
-                            result_data = response.json()
-                            text_output = json_to_text(result_data)
-                            cleaned_text = sanitize_text(text_output)
-                            
-                            st.session_state.hardness_outputs[api_cfg["name"]] = cleaned_text
-                        else:
-                            error_msg = f"API Error {response.status_code}: {response.text[:200]}"
-                            st.session_state.hardness_outputs[api_cfg["name"]] = error_msg
-
-                    except requests.exceptions.Timeout:
-                        st.session_state.hardness_outputs[api_cfg["name"]] = "Request timeout: The API took too long to respond."
-                    except Exception as e:
-                        st.session_state.hardness_outputs[api_cfg["name"]] = f"Error: {str(e)}"
-
-                progress.progress(1.0)
-                st.session_state.show_hardness = True
-                st.session_state.analysis_complete = True
-                st.success("✅ Hardness analysis complete!")
+    st.session_state.hardness_outputs = {}
+    st.session_state.show_hardness = False
+    auth_token = st.session_state.auth_token
+    # Last agent in the chain: a slow straggler here delays the whole result, so it may be hedged
+    hedge_budget = session_hedge_budget()
+    # Runs in the background so a rerun or page switch does not throw the analysis away
+    submit_agent_job(
+        "hardness_summary", hardness_problem, hardness_outputs,
+        lambda on_progress, on_partial, on_queue: fetch_configs_concurrently(
+            API_CONFIGS, hardness_problem, hardness_outputs, auth_token,
+            postprocess=lambda data: sanitize_text(json_to_text(data)),
+            on_progress=on_progress,
+            on_partial=on_partial,
+            on_queue=on_queue,
+            hedge_budget=hedge_budget,
+        ),
+    )
 
-        except Exception as e:
-            st.error(f"An unexpected error occurred during analysis: {str(e)}")
+# Pick up a finished background analysis (possibly started before a rerun or page switch)
+finished_job = take_finished_job("hardness_summary")
+if finished_job:
+    if finished_job.status == "failed":
+        st.error(f"An unexpected error occurred during analysis: {finished_job.error}")
+    else:
+        results, errors = finished_job.result
+        st.session_state.hardness_outputs = {
+            api_cfg["name"]: results.get(api_cfg["name"]) if results.get(api_cfg["name"]) is not None
+            else errors.get(api_cfg["name"])
+            for api_cfg in API_CONFIGS
+        }
+        st.session_state.show_hardness = True
+        store_session_outputs("hardness_summary")
+        st.session_state.analysis_complete = True
+        st.success("✅ Hardness analysis complete!")
+else:
+    render_job_progress("hardness_summary", "🔍 Analyzing problem hardness and difficulty...")
 
 # ===============================
 # Display Hardness Results
@@ -544,8 +313,7 @@ if st.session_state.get("show_hardness") and st.session_state.get("hardness_outp
     hardness_output = st.session_state.hardness_outputs.get("hardness_summary", "")
     
     # Extract score and classification
-    hardness_score = extract_hardness_score(hardness_output)
-    hardness_classification = extract_hardness_classification(hardness_output)
+    hardness_score, hardness_classification = parse_hardness_summary(hardness_output)
     
     # Calculate overall score from dimensions if available
     overall_dimension_score = get_overall_hardness_score()
@@ -817,77 +585,82 @@ if st.session_state.get("show_hardness") and st.session_state.get("hardness_outp
     user_id = get_user_id()
 
     # Show feedback section if not submitted - USING AGENT-SPECIFIC STATE
-    if not st.session_state.get('hardness_feedback_submitted', False):
-        fb_choice = st.radio(
-            "Select your feedback type:",
-            options=[
-                "I have read it, found it useful, thanks.",
-                "I have read it, found the assessment to be off.",
-                "The widget seems interesting, but I have some suggestions on the features.",
-            ],
-            index=None,
-            key="hardness_feedback_radio",
-        )
+    @fragment
+    def render_feedback_section():
+        """Feedback form; its widgets rerun only this section"""
+        if not st.session_state.get('hardness_feedback_submitted', False):
+            fb_choice = st.radio(
+                "Select your feedback type:",
+                options=[
+                    "I have read it, found it useful, thanks.",
+                    "I have read it, found the assessment to be off.",
+                    "The widget seems interesting, but I have some suggestions on the features.",
+                ],
+                index=None,
+                key="hardness_feedback_radio",
+            )
 
-        if fb_choice:
-            st.session_state.feedback_option = fb_choice
-
-        # Feedback form 1: Positive feedback
-        if fb_choice == "I have read it, found it useful, thanks.":
-            with st.form("hardness_feedback_form_positive", clear_on_submit=True):
-                st.info("Thank you for your positive feedback!")
-                st.markdown(f'**Employee ID:** {user_id}')
-                submitted = st.form_submit_button("📨 Submit Positive Feedback")
-                if submitted:
-                    if submit_feedback_wrapper(fb_choice, user_id=user_id):
-                        st.rerun()
-
-        # Feedback form 2: Assessment off
-        elif fb_choice == "I have read it, found the assessment to be off.":
-            with st.form("hardness_feedback_form_assessment", clear_on_submit=True):
-                st.markdown("**Please provide details about the assessment issues:**")
-                st.markdown(f'**Employee ID:** {user_id}')
-                
-                assessment_issues = st.text_input(
-                    "What aspects of the hardness assessment seem off?",
-                    placeholder="Please describe which parts of the assessment (score, classification, justification) seem inaccurate and why...",
-                    key="hardness_assessment_issues"
-                )
-                
-                submitted = st.form_submit_button("📨 Submit Feedback")
-                if submitted:
-                    if not assessment_issues.strip():
-                        st.warning("⚠️ Please provide details about the assessment issues.")
-                    else:
-                        if submit_feedback_wrapper(fb_choice, user_id=user_id, additional_feedback=assessment_issues):
+            if fb_choice:
+                st.session_state.feedback_option = fb_choice
+
+            # Feedback form 1: Positive feedback
+            if fb_choice == "I have read it, found it useful, thanks.":
+                with st.form("hardness_feedback_form_positive", clear_on_submit=True):
+                    st.info("Thank you for your positive feedback!")
+                    st.markdown(f'**Employee ID:** {user_id}')
+                    submitted = st.form_submit_button("📨 Submit Positive Feedback")
+                    if submitted:
+                        if submit_feedback_wrapper(fb_choice, user_id=user_id):
                             st.rerun()
 
-        # Feedback form 3: Suggestions
-        elif fb_choice == "The widget seems interesting, but I have some suggestions on the features.":
-            with st.form("hardness_feedback_form_suggestions", clear_on_submit=True):
-                st.markdown("**Please share your suggestions for improvement:**")
-                st.markdown(f'**Employee ID:** {user_id}')
+            # Feedback form 2: Assessment off
+            elif fb_choice == "I have read it, found the assessment to be off.":
+                with st.form("hardness_feedback_form_assessment", clear_on_submit=True):
+                    st.markdown("**Please provide details about the assessment issues:**")
+                    st.markdown(f'**Employee ID:** {user_id}')
                 
-                suggestions = st.text_input(
-                    "Your suggestions:",
-                    placeholder="What features would you like to see improved or added to the hardness assessment?",
-                    key="hardness_suggestions"
-                )
+                    assessment_issues = st.text_input(
+                        "What aspects of the hardness assessment seem off?",
+                        placeholder="Please describe which parts of the assessment (score, classification, justification) seem inaccurate and why...",
+                        key="hardness_assessment_issues"
+                    )
                 
-                submitted = st.form_submit_button("📨 Submit Feedback")
-                if submitted:
-                    if not suggestions.strip():
-                        st.warning("⚠️ Please provide your suggestions.")
-                    else:
-                        if submit_feedback_wrapper(fb_choice, user_id=user_id, suggestions=suggestions):
-                            st.rerun()
+                    submitted = st.form_submit_button("📨 Submit Feedback")
+                    if submitted:
+                        if not assessment_issues.strip():
+                            st.warning("⚠️ Please provide details about the assessment issues.")
+                        else:
+                            if submit_feedback_wrapper(fb_choice, user_id=user_id, additional_feedback=assessment_issues):
+                                st.rerun()
+
+            # Feedback form 3: Suggestions
+            elif fb_choice == "The widget seems interesting, but I have some suggestions on the features.":
+                with st.form("hardness_feedback_form_suggestions", clear_on_submit=True):
+                    st.markdown("**Please share your suggestions for improvement:**")
+                    st.markdown(f'**Employee ID:** {user_id}')
+                
+                    suggestions = st.text_input(
+                        "Your suggestions:",
+                        placeholder="What features would you like to see improved or added to the hardness assessment?",
+                        key="hardness_suggestions"
+                    )
+                
+                    submitted = st.form_submit_button("📨 Submit Feedback")
+                    if submitted:
+                        if not suggestions.strip():
+                            st.warning("⚠️ Please provide your suggestions.")
+                        else:
+                            if submit_feedback_wrapper(fb_choice, user_id=user_id, suggestions=suggestions):
+                                st.rerun()
     
-    else:
-        # Feedback already submitted - show success and option for another submission
-        st.markdown('<div class="feedback-success">✅ Thank you! Your feedback has been recorded.</div>', unsafe_allow_html=True)
-    if st.button("📝 Submit Another Feedback", key="hardness_reopen_feedback_btn", width='stretch'):
-            st.session_state.hardness_feedback_submitted = False
-            st.rerun()
+        else:
+            # Feedback already submitted - show success and option for another submission
+            st.markdown('<div class="feedback-success">✅ Thank you! Your feedback has been recorded.</div>', unsafe_allow_html=True)
+        if st.button("📝 Submit Another Feedback", key="hardness_reopen_feedback_btn", width='stretch'):
+                st.session_state.hardness_feedback_submitted = False
+                st.rerun()
+
+    render_feedback_section()
 
 # =========================================
 # ⬅️ BACK BUTTON
@@ -895,3 +668,6 @@ if st.session_state.get("show_hardness") and st.session_state.get("hardness_outp
 st.markdown("---")
 if st.button("⬅️ Back to Main Page", width='stretch'):
     st.switch_page("Welcome_Agent.py")
+
+# Keep polling while the background analysis is running
+poll_running_jobs("hardness_summary")
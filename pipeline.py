@@ -0,0 +1,263 @@
+"""
+One-click full analysis across all seven agents.
+The agents are modelled as a dependency graph and every node whose inputs are
+ready is sent at once, so the critical path is four levels
+(vocabulary -> current system -> Q1-Q12 -> hardness) instead of ~14 serial calls.
+Results land in the same session keys each agent page already reads.
+"""
+from concurrent.futures import FIRST_COMPLETED, wait
+from functools import partial
+
+from agent_configs import (
+    VOCABULARY_API_CONFIGS,
+    CURRENT_SYSTEM_API_CONFIGS,
+    VOLATILITY_API_CONFIGS,
+    AMBIGUITY_API_CONFIGS,
+    INTERCONNECTEDNESS_API_CONFIGS,
+    UNCERTAINTY_API_CONFIGS,
+    HARDNESS_API_CONFIGS,
+    build_full_context,
+)
+from api_client import FANOUT_MODE, fetch_agency_result, get_fanout_executor
+from text_utils import json_to_text, parse_question_answer, sanitize_text
+
+# ================================
+# 🧭 Pipeline Definition
+# ================================
+
+DIMENSION_CONFIGS = {
+    "volatility": VOLATILITY_API_CONFIGS,
+    "ambiguity": AMBIGUITY_API_CONFIGS,
+    "interconnectedness": INTERCONNECTEDNESS_API_CONFIGS,
+    "uncertainty": UNCERTAINTY_API_CONFIGS,
+}
+
+# (outputs key, show flag) read by each dimension page
+DIMENSION_SESSION_KEYS = {
+    "volatility": ("volatile_outputs", "show_volatility"),
+    "ambiguity": ("ambiguity_outputs", "show_ambiguity"),
+    "interconnectedness": ("interconnectedness_outputs", "show_interconnectedness"),
+    "uncertainty": ("uncertainty_outputs", "show_uncertainty"),
+}
+
+# (outputs key, show flag) of every agent
+AGENT_SESSION_KEYS = {
+    "vocabulary": ("vocab_output", "show_vocabulary"),
+    "current_system": ("current_system_data", "current_system_extracted"),
+    **DIMENSION_SESSION_KEYS,
+    "hardness_summary": ("hardness_outputs", "show_hardness"),
+}
+
+
+def _postprocess(data):
+    return sanitize_text(json_to_text(data))
+
+
+def _postprocess_current_system(data):
+    return sanitize_text(json_to_text(data), strip_rules=True)
+
+
+def _context_outputs(results):
+    return {
+        "vocabulary": results.get("vocabulary") or "",
+        "current_system": results.get("current_system") or "",
+    }
+
+
+def _hardness_outputs(results):
+    outputs = _context_outputs(results)
+    for dimension, configs in DIMENSION_CONFIGS.items():
+        outputs[dimension] = {cfg["name"]: results.get(cfg["name"]) or "" for cfg in configs}
+    return outputs
+
+
+def dimension_scores(results):
+    """
+    {dimension: mean 0-5 score} for dimensions whose every question answer has a score
+    (the same rule as shared_header.mark_agent_completed).
+    """
+    scores = {}
+    for dimension, configs in DIMENSION_CONFIGS.items():
+        values = [parse_question_answer(cfg["name"], results.get(cfg["name"]) or "").score for cfg in configs]
+        if values and all(value is not None for value in values):
+            scores[dimension] = sum(values) / len(values)
+    return scores
+
+
+def hardness_inputs(problem, account, industry, results):
+    """
+    (problem, outputs) sent to the Hardness agent, by the full analysis and the Hardness page alike.
+    results maps vocabulary, current_system and Q1-Q12 to their answer text.
+    """
+    scores = dimension_scores(results)
+    extra = ""
+    if scores:
+        extra = "\n\nDimension Scores:\n" + "".join(
+            f"{dimension.title()}: {score:.2f}/5\n" for dimension, score in scores.items()
+        )
+    return build_full_context(problem, account, industry, extra), _hardness_outputs(results)
+
+
+def session_results(session_state):
+    """The session's agent outputs keyed like pipeline results (the inverse of apply_pipeline_results)."""
+    results = {
+        "vocabulary": session_state.get("vocab_output") or "",
+        "current_system": session_state.get("current_system_data") or "",
+    }
+    for dimension in DIMENSION_CONFIGS:
+        outputs_key, _ = DIMENSION_SESSION_KEYS[dimension]
+        for name, answer in (session_state.get(outputs_key) or {}).items():
+            if isinstance(answer, str):
+                results[name] = answer
+    return results
+
+
+def node_inputs(node, results):
+    """(problem, outputs) a pipeline node's prompt is rendered from, given the finished results."""
+    if "inputs" in node:
+        return node["inputs"](results)
+    return node["problem"], node["outputs"](results)
+
+
+def build_pipeline(problem, account, industry):
+    """
+    Nodes of the analysis graph. Each node mirrors the inputs its agent page sends:
+    - id: result key (agent or question name)
+    - config: API config entry from agent_configs
+    - deps: ids that must finish before the node is sent
+    - problem / outputs: prompt inputs; outputs is built from finished results
+      (or inputs: callable(results) -> (problem, outputs) when the problem depends on them too)
+    """
+    full_context = build_full_context(problem, account, industry)
+    nodes = [
+        {
+            "id": "vocabulary",
+            "config": VOCABULARY_API_CONFIGS[0],
+            "deps": [],
+            "problem": full_context,
+            "outputs": lambda results: {},
+            "postprocess": _postprocess,
+        },
+        {
+            "id": "current_system",
+            "config": CURRENT_SYSTEM_API_CONFIGS[0],
+            "deps": ["vocabulary"],
+            "problem": problem,
+            "outputs": lambda results: {"vocabulary": results.get("vocabulary") or ""},
+            "postprocess": _postprocess_current_system,
+        },
+    ]
+
+    question_ids = []
+    for dimension, configs in DIMENSION_CONFIGS.items():
+        for cfg in configs:
+            question_ids.append(cfg["name"])
+            if dimension == "ambiguity":
+                # The Ambiguity page only sends the problem context, so it can start immediately
+                nodes.append({
+                    "id": cfg["name"],
+                    "config": cfg,
+                    "deps": [],
+                    "problem": full_context,
+                    "outputs": lambda results: {},
+                    "postprocess": _postprocess,
+                })
+            else:
+                nodes.append({
+                    "id": cfg["name"],
+                    "config": cfg,
+                    "deps": ["vocabulary", "current_system"],
+                    "problem": problem,
+                    "outputs": _context_outputs,
+                    "postprocess": _postprocess,
+                })
+
+    nodes.append({
+        "id": "hardness_summary",
+        "config": HARDNESS_API_CONFIGS[0],
+        "deps": ["vocabulary", "current_system"] + question_ids,
+        "inputs": partial(hardness_inputs, problem, account, industry),
+        "postprocess": _postprocess,
+    })
+    return nodes
+
+
+# ================================
+# 🚀 Pipeline Runner
+# ================================
+
+def run_pipeline(problem, account, industry, auth_token="", on_progress=None, on_partial=None, on_queue=None,
+                 hedge_budget=None):
+    """
+    Run every agent, sending each node as soon as its dependencies finish.
+    - on_progress: optional callable(done, total), invoked on the calling thread
+    - on_partial: optional callable(node_id, text_so_far) for streamed answers; may run on worker threads
+    - on_queue: optional callable(node_id, position) while a node waits for its rate limit
+    - hedge_budget: optional hedging.HedgeBudget; slow nodes on the critical path are hedged within it
+    Returns (results, errors), both keyed by node id. A failed node leaves its
+    result as None; dependents still run with an empty context, as the pages do.
+    Makes no Streamlit calls.
+    """
+    nodes = build_pipeline(problem, account, industry)
+    total = len(nodes)
+    results = {}
+    errors = {}
+    pending = {node["id"]: node for node in nodes}
+
+    def ready_nodes():
+        return [node for node in list(pending.values())
+                if all(dep in results for dep in node["deps"])]
+
+    def render(node):
+        # Prompts are rendered on the calling thread from the finished results
+        pending.pop(node["id"])
+        prompt = node["config"]["prompt"](*node_inputs(node, results))
+        on_text = partial(on_partial, node["id"]) if on_partial else None
+        queued = partial(on_queue, node["id"]) if on_queue else None
+        return node["config"]["url"], prompt, auth_token, node["postprocess"], on_text, queued, hedge_budget
+
+    def record(node_id, outcome):
+        results[node_id], errors[node_id] = outcome
+        if on_progress:
+            on_progress(len(results), total)
+
+    if FANOUT_MODE == "sequential":
+        while pending:
+            for node in ready_nodes():
+                record(node["id"], fetch_agency_result(*render(node)))
+        return results, errors
+
+    executor = get_fanout_executor()
+    running = {}
+    while pending or running:
+        for node in ready_nodes():
+            running[executor.submit(fetch_agency_result, *render(node))] = node["id"]
+        finished, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in finished:
+            record(running.pop(future), future.result())
+    return results, errors
+
+
+def apply_pipeline_results(session_state, results, errors):
+    """
+    Copy pipeline results into the session keys read by each agent page.
+    A failed vocabulary call keeps the previous vocabulary, like current_system.
+    """
+    if results.get("vocabulary"):
+        session_state.vocab_output = results["vocabulary"]
+        session_state.show_vocabulary = True
+
+    if results.get("current_system"):
+        session_state.current_system_data = results["current_system"]
+        session_state.current_system_extracted = True
+
+    for dimension, configs in DIMENSION_CONFIGS.items():
+        outputs_key, show_key = DIMENSION_SESSION_KEYS[dimension]
+        session_state[outputs_key] = {
+            cfg["name"]: results.get(cfg["name"]) or "No data available" for cfg in configs
+        }
+        session_state[show_key] = True
+
+    hardness = results.get("hardness_summary") or errors.get("hardness_summary") or "No data available"
+    session_state.hardness_outputs = {"hardness_summary": hardness}
+    session_state.show_hardness = True
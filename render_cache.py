@@ -0,0 +1,75 @@
+"""
+Per-session cache of rendered result HTML.
+Agent pages rerun top to bottom on every widget click; the formatted HTML of an
+unchanged answer is kept here instead of being rebuilt each time. Entries are keyed
+by (kind, raw output hash, display_account, display_industry, theme) and each browser
+session holds a bounded LRU of them in st.session_state.
+"""
+import hashlib
+from collections import OrderedDict
+
+import streamlit as st
+
+from settings import read_setting
+
+RENDER_CACHE_MAX_ENTRIES = int(read_setting("RENDER_CACHE_MAX_ENTRIES", 64))
+# Upper bound on the HTML a single session keeps cached
+RENDER_CACHE_MAX_CHARS = int(read_setting("RENDER_CACHE_MAX_KB", 2048)) * 1024
+
+_SESSION_KEY = "render_cache"
+
+
+def _output_hash(raw):
+    return hashlib.sha256(str(raw).encode("utf-8")).hexdigest()
+
+
+def _session_cache():
+    cache = st.session_state.get(_SESSION_KEY)
+    if cache is None:
+        cache = st.session_state[_SESSION_KEY] = {"entries": OrderedDict(), "chars": 0, "hits": 0, "misses": 0}
+    return cache
+
+
+def _size(html):
+    if isinstance(html, dict):
+        return sum(len(v) for v in html.values())
+    return len(html)
+
+
+def cached_render(kind, raw, display_account, display_industry, render):
+    """
+    Return render() for this raw output, reusing this session's cached HTML when the
+    output, the display names and the theme are unchanged.
+    - kind: which renderer produced the HTML ("vocabulary", "volatility/Q1", ...)
+    - render: zero-argument callable producing the HTML (a str, or a dict of str)
+    """
+    key = (kind, _output_hash(raw), display_account, display_industry, bool(st.session_state.get("dark_mode")))
+    cache = _session_cache()
+    entries = cache["entries"]
+    if key in entries:
+        entries.move_to_end(key)
+        cache["hits"] += 1
+        return entries[key]
+
+    cache["misses"] += 1
+    html = render()
+    size = _size(html)
+    if size > RENDER_CACHE_MAX_CHARS:
+        return html
+    entries[key] = html
+    cache["chars"] += size
+    while entries and (len(entries) > RENDER_CACHE_MAX_ENTRIES or cache["chars"] > RENDER_CACHE_MAX_CHARS):
+        _, evicted = entries.popitem(last=False)
+        cache["chars"] -= _size(evicted)
+    return html
+
+
+def clear_render_cache():
+    """Drop this session's cached HTML (e.g. on Reset)."""
+    st.session_state.pop(_SESSION_KEY, None)
+
+
+def get_render_cache_stats():
+    """Hit/miss counters and current size of this session's render cache."""
+    cache = _session_cache()
+    return {"entries": len(cache["entries"]), "chars": cache["chars"], "hits": cache["hits"], "misses": cache["misses"]}
@@ -0,0 +1,191 @@
+"""
+Retry and circuit-breaker policy for the talos-engine reasoning endpoints.
+Transient failures (connection errors, timeouts, 429/5xx) are retried with jittered
+exponential backoff. Each agency_id has a circuit breaker shared by every session in
+the process: after repeated failures calls to it fail fast for a cool-down period,
+then a single trial call decides whether it is healthy again.
+"""
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+from settings import read_setting
+
+# ================================
+# ⚙️ Resilience Configuration
+# ================================
+
+# Retries after the first attempt; 0 restores the old single-shot behaviour
+MAX_RETRIES = int(read_setting("REASONING_MAX_RETRIES", 2))
+BACKOFF_BASE_SECONDS = float(read_setting("REASONING_BACKOFF_BASE_SECONDS", 1.0))
+BACKOFF_MAX_SECONDS = float(read_setting("REASONING_BACKOFF_MAX_SECONDS", 20.0))
+# Status codes worth retrying; anything else is returned to the caller as is
+RETRY_STATUS_CODES = frozenset((429, 500, 502, 503, 504))
+
+# Consecutive failures that open a circuit, and how long it stays open
+BREAKER_FAILURE_THRESHOLD = int(read_setting("REASONING_BREAKER_FAILURES", 5))
+BREAKER_OPEN_SECONDS = float(read_setting("REASONING_BREAKER_OPEN_SECONDS", 30.0))
+
+
+class TransientError(Exception):
+    """
+    An upstream failure that says something about the endpoint's health.
+    - retry=False: count it against the circuit but do not send the call again (e.g. read timeouts)
+    - unhealthy=False: retry without counting it against the circuit (e.g. 429)
+    """
+
+    def __init__(self, message, retry_after=None, retry=True, unhealthy=True):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.retry = retry
+        self.unhealthy = unhealthy
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit is open."""
+
+
+# ================================
+# 🔁 Circuit Breaker
+# ================================
+
+class CircuitBreaker:
+    """Closed -> open after N consecutive failures -> half-open trial after a cool-down -> closed."""
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD, open_seconds=BREAKER_OPEN_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.failures = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go out now."""
+        with self._lock:
+            if self.state == "open":
+                remaining = self.opened_at + self.open_seconds - time.monotonic()
+                if remaining > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(
+                        f"API Call Failed: {self.name} is unavailable after repeated failures "
+                        f"(retrying in {int(remaining) + 1}s)"
+                    )
+                self.state = "half_open"
+            if self.state == "half_open":
+                if self.trial_in_flight:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"API Call Failed: {self.name} is recovering, try again shortly")
+                self.trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self.trial_in_flight = False
+
+    def release_trial(self):
+        """The call ended without telling us anything about the endpoint's health."""
+        with self._lock:
+            self.trial_in_flight = False
+
+    def record_failure(self, unhealthy=True):
+        with self._lock:
+            self.trial_in_flight = False
+            if not unhealthy:
+                if self.state == "half_open":
+                    # The trial told us nothing; wait for the next one
+                    self.state = "open"
+                    self.opened_at = time.monotonic()
+                return
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "failures": self.failures,
+                "rejected": self.rejected,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def endpoint_name(url):
+    """The agency_id of a reasoning URL (health is tracked per agency), or the URL itself."""
+    agency_ids = parse_qs(urlparse(url).query).get("agency_id")
+    return agency_ids[0] if agency_ids else url
+
+
+def get_circuit_breaker(url):
+    """Process-wide breaker for the agency behind url."""
+    name = endpoint_name(url)
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+    return breaker
+
+
+def get_endpoint_health():
+    """Breaker state and failure counters per agency_id."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+
+# ================================
+# ⏳ Retries
+# ================================
+
+def backoff_delay(retry_number, retry_after=None):
+    """Full-jitter exponential backoff, honouring a server's Retry-After within the cap."""
+    delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** retry_number)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, BACKOFF_MAX_SECONDS))
+    return delay
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (HTTP dates are ignored)."""
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_retries(url, attempt, max_retries=MAX_RETRIES):
+    """
+    Run attempt() under url's circuit breaker, retrying TransientError with backoff.
+    Returns attempt()'s result; raises the last TransientError once retries are spent,
+    or CircuitOpenError when the endpoint is failing fast.
+    """
+    breaker = get_circuit_breaker(url)
+    for retry_number in range(max_retries + 1):
+        breaker.before_call()
+        try:
+            result = attempt()
+        except TransientError as e:
+            breaker.record_failure(e.unhealthy)
+            if retry_number == max_retries or not e.retry:
+                raise
+            time.sleep(backoff_delay(retry_number, e.retry_after))
+            continue
+        except Exception:
+            # Not an upstream health problem (a bad payload, a queue timeout, ...)
+            breaker.release_trial()
+            raise
+        breaker.record_success()
+        return result
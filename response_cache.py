@@ -0,0 +1,125 @@
+"""
+Persistent on-disk cache for reasoning API responses.
+Entries are content-addressed by (agency URL, rendered prompt, tenant), expire after a TTL
+and are evicted least-recently-used once the cache grows past its size budget.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def cache_key(url, prompt, tenant):
+    """sha256 over the agency URL, the fully rendered prompt and the tenant."""
+    digest = hashlib.sha256()
+    for part in (url, prompt, tenant):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of decoded API responses (JSON-serialisable).
+    - path: database file; parent directory is created on first use
+    - ttl_seconds: entries older than this are treated as misses and dropped
+    - max_bytes: total payload budget; least-recently-used entries are evicted past it
+    Safe to share between threads; several processes can use the same file.
+    """
+
+    def __init__(self, path, ttl_seconds, max_bytes):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " body TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key):
+        """Return the cached response for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT body, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            body, created_at = row
+            if now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                self._stats["misses"] += 1
+                self._stats["expired"] += 1
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self._stats["hits"] += 1
+        return json.loads(body)
+
+    def put(self, key, value):
+        """Store a decoded response and evict LRU entries beyond max_bytes."""
+        body = json.dumps(value)
+        size = len(body.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, body, size, now, now),
+            )
+            self._stats["stores"] += 1
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def stats(self):
+        """Hit/miss counters for this process plus the current entry count and size on disk."""
+        with self._lock:
+            stats = dict(self._stats)
+            conn = self._connect()
+            entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = stats["hits"] + stats["misses"]
+        stats["entries"] = entries
+        stats["bytes"] = total
+        stats["hit_ratio"] = (stats["hits"] / lookups) if lookups else 0.0
+        return stats
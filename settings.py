@@ -0,0 +1,17 @@
+"""
+Deployment settings lookup shared by the API client, background jobs and feedback storage.
+"""
+import os
+
+import streamlit as st
+
+
+def read_setting(name, default=""):
+    """Read a setting from the environment first, then Streamlit secrets (same order as AUTH_TOKEN)."""
+    value = os.environ.get(name, "")
+    try:
+        if not value:
+            value = st.secrets.get(name, "")
+    except Exception:
+        pass
+    return value if value not in ("", None) else default
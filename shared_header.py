@@ -8,13 +8,20 @@ import os
 import pandas as pd
 from urllib.parse import unquote
 from datetime import datetime
-
-# Logo URL for the header
-LOGO_URL = "https://yt3.googleusercontent.com/ytc/AIdro_k-7HkbByPWjKpVPO3LCF8XYlKuQuwROO0vf3zo1cqgoaE=s900-c-k-c0x00ffffff-no-rj"
-
-# Feedback file path for admin section
-BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-FEEDBACK_FILE = os.path.join(BASE_DIR, "feedback.csv")
+from analysis_store import rehydrate_analysis
+from change_detection import discard_quick_edit, invalidate_stale_outputs, note_problem_saved
+from feedback_store import FEEDBACK_COLUMNS, get_feedback_store, normalize_feedback_row
+from metrics import METRICS_LOG_PATH, METRICS_PORT, get_cache_counters, get_call_metrics, render_prometheus
+from pipeline import DIMENSION_SESSION_KEYS
+from settings import read_setting
+from static_assets import inject_script, inject_stylesheet
+from text_utils import parse_dimension_answers
+
+# Logo URL for the header (set LOGO_URL to e.g. app/static/logo.png to serve it locally)
+LOGO_URL = read_setting(
+    "LOGO_URL",
+    "https://yt3.googleusercontent.com/ytc/AIdro_k-7HkbByPWjKpVPO3LCF8XYlKuQuwROO0vf3zo1cqgoaE=s900-c-k-c0x00ffffff-no-rj",
+)
 
 # ================================
 # 🏢 Account & Industry Mapping
@@ -183,11 +190,7 @@ def render_account_industry_selectors(page_key_prefix: str = "global"):
 def init_admin_session():
     """Initialize admin session state for all agents"""
     if 'admin_feedback_data' not in st.session_state:
-        st.session_state.admin_feedback_data = pd.DataFrame(
-            columns=["Timestamp","Employee_id", "Feedback", "FeedbackType", 
-                    "OffDefinitions", "Suggestions", "Account", "Industry", 
-                    "ProblemStatement", "Agent"]
-        )
+        st.session_state.admin_feedback_data = pd.DataFrame(columns=FEEDBACK_COLUMNS)
     if 'admin_authenticated' not in st.session_state:
         st.session_state.admin_authenticated = False
     if 'admin_access_requested' not in st.session_state:
@@ -199,98 +202,70 @@ def init_admin_session():
 
 def save_feedback_to_admin_session(feedback_data, agent_name):
     """
-    Save feedback data to admin session storage for all agents
+    The single feedback ingestion path used by every agent page.
+    Maps feedback_data onto the canonical FEEDBACK_COLUMNS schema, keeps an in-memory
+    copy for this session's admin panel and writes the row durably exactly once.
     """
     init_admin_session()  # Ensure session is initialized
     
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    row = dict(feedback_data)
+    row['Agent'] = agent_name
+    row['Timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    feedback_row = pd.DataFrame([normalize_feedback_row(row)], columns=FEEDBACK_COLUMNS)
     
-    # Add agent information to feedback data
-    feedback_data_with_agent = feedback_data.copy()
-    feedback_data_with_agent['Agent'] = agent_name
-    feedback_data_with_agent['Timestamp'] = timestamp
-    
-    # Convert to DataFrame if not already
-    if not isinstance(feedback_data_with_agent, pd.DataFrame):
-        feedback_data_with_agent = pd.DataFrame([feedback_data_with_agent])
-    
-    # Append to admin session storage
+    # In-memory view for the admin panel (not persisted)
     st.session_state.admin_feedback_data = pd.concat(
-        [st.session_state.admin_feedback_data, feedback_data_with_agent], 
+        [st.session_state.admin_feedback_data, feedback_row], 
         ignore_index=True
     )
     
-    # Also save to file for persistence
-    save_feedback_to_file(feedback_data_with_agent)
-    
-    return True
+    # The one durable write
+    return save_feedback_to_file(feedback_row)
 
 def save_feedback_to_file(feedback_data):
     """
-    Save feedback to CSV file with fallback to session state
+    Append feedback rows to the feedback store with fallback to session state
     """
+    rows = [normalize_feedback_row(row) for row in feedback_data.to_dict("records")]
     try:
-        # Ensure the feedback data has all required columns including 'Agent'
-        required_columns = ["Timestamp","Employee_id" , "Feedback", "FeedbackType", 
-                           "OffDefinitions", "Suggestions", "Account", "Industry", 
-                           "ProblemStatement", "Agent"]
-        
-        # Add missing columns with empty values
-        for col in required_columns:
-            if col not in feedback_data.columns:
-                feedback_data[col] = ''
-        
-        if os.path.exists(FEEDBACK_FILE):
-            existing = pd.read_csv(FEEDBACK_FILE)
-            
-            # Handle schema mismatch - ensure existing data also has all columns
-            for col in required_columns:
-                if col not in existing.columns:
-                    existing[col] = ''
-            
-            # Reorder both dataframes to match required columns
-            existing = existing[required_columns]
-            feedback_data = feedback_data[required_columns]
-            
-            updated = pd.concat([existing, feedback_data], ignore_index=True)
-        else:
-            # Create new file with all required columns
-            updated = feedback_data[required_columns]
-        
-        updated.to_csv(FEEDBACK_FILE, index=False)
+        get_feedback_store().append(rows)
         return True
         
     except (PermissionError, OSError) as e:
         # Fallback to session state on Streamlit Cloud
         if 'file_feedback_data' not in st.session_state:
-            st.session_state.file_feedback_data = pd.DataFrame(columns=feedback_data.columns)
+            st.session_state.file_feedback_data = pd.DataFrame(columns=FEEDBACK_COLUMNS)
         
         st.session_state.file_feedback_data = pd.concat(
-            [st.session_state.file_feedback_data, feedback_data], 
+            [st.session_state.file_feedback_data, pd.DataFrame(rows, columns=FEEDBACK_COLUMNS)], 
             ignore_index=True
         )
+        st.info("📝 Feedback saved to session (cloud mode)")
         return True
         
     except Exception as e:
         st.error(f"Error saving feedback to file: {str(e)}")
         return False
 
-def get_all_feedback_data():
+def query_feedback_data(agent=None, feedback_type=None):
     """
-    Get combined feedback data from both file and session state
+    Feedback matching the given filters (None = no filter), from the feedback store
+    plus anything only held in session state (cloud fallback).
+    Store filters run as indexed queries; session rows are few and filtered in pandas.
     """
     file_data = pd.DataFrame()
     session_data = pd.DataFrame()
     
-    # Try to load from file
+    # Try to load from the feedback store
     try:
-        if os.path.exists(FEEDBACK_FILE):
-            file_data = pd.read_csv(FEEDBACK_FILE)
-            # Ensure the file data has Agent column
-            if 'Agent' not in file_data.columns:
-                file_data['Agent'] = 'Unknown Agent'
+        store = get_feedback_store()
+        rows = store.query(agent=agent, feedback_type=feedback_type)
+        file_data = pd.DataFrame(rows, columns=store.columns())
+        # Ensure the file data has Agent column
+        if 'Agent' not in file_data.columns:
+            file_data['Agent'] = 'Unknown Agent'
     except Exception as e:
-        st.warning(f"Could not read feedback file: {e}")
+        st.warning(f"Could not read feedback store: {e}")
     
     # Get from session state
     if 'admin_feedback_data' in st.session_state and not st.session_state.admin_feedback_data.empty:
@@ -298,6 +273,12 @@ def get_all_feedback_data():
     
     if 'file_feedback_data' in st.session_state and not st.session_state.file_feedback_data.empty:
         session_data = pd.concat([session_data, st.session_state.file_feedback_data], ignore_index=True)
+
+    if not session_data.empty:
+        if agent is not None and 'Agent' in session_data.columns:
+            session_data = session_data[session_data['Agent'] == agent]
+        if feedback_type is not None and 'FeedbackType' in session_data.columns:
+            session_data = session_data[session_data['FeedbackType'] == feedback_type]
     
     # Combine data, preferring session data for duplicates
     if not file_data.empty and not session_data.empty:
@@ -310,6 +291,29 @@ def get_all_feedback_data():
     else:
         return pd.DataFrame()
 
+def get_all_feedback_data():
+    """
+    Get combined feedback data from both the feedback store and session state
+    """
+    return query_feedback_data()
+
+def count_feedback_data():
+    """
+    Number of feedback entries in the feedback store plus entries that only reached session state
+    """
+    total = 0
+    try:
+        total += get_feedback_store().count()
+    except Exception:
+        pass
+    if 'file_feedback_data' in st.session_state:
+        total += len(st.session_state.file_feedback_data)
+    return total
+
+# Partial reruns: st.fragment (Streamlit 1.37+) or st.experimental_fragment (1.33+).
+# On older versions the decorated section simply runs as part of the full page.
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
 def _safe_rerun():
     """Safely rerun the app without causing errors."""
     try:
@@ -415,461 +419,10 @@ def render_header(
     if st.session_state.get('current_page', '') == 'admin':
         admin_badge_html = '<span style="margin-left:8px;padding:4px 8px;background:rgba(255,255,255,0.95);color:#8b1e1e;font-weight:700;border-radius:12px;font-size:0.75rem;white-space:nowrap;">ADMIN</span>'
 
-       # Apply comprehensive CSS with Mu Sigma colors and NO GAPS
-    st.markdown(f"""
-    <style>
-    /* Reset Streamlit built-in header COMPLETELY */
-    [data-testid="stHeader"], 
-    header[data-testid="stHeader"],
-    .stApp > header {{
-        height: 0 !important;
-        background: transparent !important;
-        display: none !important;
-        visibility: hidden !important;
-        padding: 0 !important;
-        margin: 0 !important;
-    }}
-
-    /* Fixed Header - ABSOLUTELY NO GAPS */
-    .fixed-header {{
-        position: fixed;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: {header_height}px;
-        background: linear-gradient(135deg, #8b1e1e 0%, #6b1515 100%);
-        box-shadow: 0 2px 20px rgba(0,0,0,0.4);
-        z-index: 999999;
-        display: flex !important;
-        align-items: center;
-        justify-content: space-between;
-        padding: 0 2rem;
-        border-bottom: 3px solid #ff6b35;
-    }}
-
-    .header-logo {{
-        display: flex;
-        align-items: center;
-        cursor: pointer;
-        transition: transform 0.3s ease;
-    }}
-
-    .header-logo:hover {{
-        transform: scale(1.05);
-    }}
-
-    .header-logo img {{
-        width: 48px;
-        height: 48px;
-        border-radius: 50%;
-        border: 2px solid rgba(255,255,255,0.5);
-        box-shadow: 0 2px 8px rgba(0,0,0,0.3);
-    }}
-
-    .header-title {{
-        position: absolute;
-        left: 50%;
-        transform: translateX(-50%);
-        text-align: center;
-    }}
-
-    .header-title h1 {{
-        color: #ffffff !important;
-        font-size: 1.7rem;
-        font-weight: 800;
-        margin: 0;
-        line-height: 1.1;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.3);
-        letter-spacing: -0.5px;
-    }}
-
-    .header-title p {{
-        color: #ffffff;
-        font-size: 0.85rem;
-        font-weight: 500;
-        margin: 3px 0 0 0;
-        text-shadow: 0.5px 0.5px 1px rgba(0,0,0,0.2);
-    }}
-
-    /* CRITICAL: ABSOLUTELY NO GAP - Content starts RIGHT after header */
-    .main .block-container {{
-        padding-top: {header_height}px !important;
-        padding-bottom: 0 !important;
-        margin-top: 0 !important;
-    }}
-
-    .stApp {{
-        margin-top: 0 !important;
-        padding-top: 0 !important;
-    }}
-
-    /* Remove ALL gaps and margins */
-    body, html, .stApp {{
-        overflow-x: hidden !important;
-        margin: 0 !important;
-        padding: 0 !important;
-        overflow-y: auto !important;
-    }}
-
-    /* Remove any Streamlit default padding */
-    [data-testid="stAppViewContainer"] {{
-        padding: 0 !important;
-        margin: 0 !important;
-    }}
-
-    .theme-toggle-capsule {{
-        display: flex;
-        background-color: rgba(255,255,255,0.15);
-        border-radius: 25px;
-        padding: 4px;
-        gap: 4px;
-        backdrop-filter: blur(10px);
-        border: 2px solid rgba(255,255,255,0.3);
-        align-items: center;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.2);
-    }}
-
-    .theme-toggle-btn {{
-        padding: 8px 18px;
-        border: none;
-        border-radius: 20px;
-        font-size: 0.8rem;
-        cursor: pointer;
-        transition: all 0.3s ease;
-        background-color: transparent;
-        color: rgba(255,255,255,0.8);
-        font-weight: 600;
-    }}
-
-    .theme-toggle-btn.active {{
-        background-color: white;
-        color: #8b1e1e;
-        box-shadow: 0 2px 8px rgba(255,255,255,0.4);
-    }}
-
-    .theme-toggle-btn:hover {{
-        transform: scale(1.05);
-        color: white;
-    }}
-
-    /* MU SIGMA COLORS FOR BUTTONS */
-    .stButton > button, 
-    button[kind="primary"], 
-    button[kind="secondary"],
-    .stDownloadButton > button,
-    .stButton > button:not(.theme-toggle-btn) {{
-        background: linear-gradient(135deg, #8b1e1e 0%, #ff6b35 100%) !important;
-        color: white !important;
-        border: none !important;
-        font-weight: 700 !important;
-        border-radius: 10px !important;
-        transition: all 0.3s ease !important;
-        box-shadow: 0 4px 12px rgba(139,30,30,0.4) !important;
-        font-size: 0.95rem !important;
-    }}
-
-    .stButton > button:hover,
-    button[kind="primary"]:hover,
-    button[kind="secondary"]:hover {{
-        transform: translateY(-2px) scale(1.02) !important;
-        box-shadow: 0 6px 20px rgba(139,30,30,0.5) !important;
-        background: linear-gradient(135deg, #a82828 0%, #ff7b45 100%) !important;
-    }}
-
-    /* Secondary buttons with outline */
-    button[kind="secondary"]:not(.theme-toggle-btn) {{
-        background: transparent !important;
-        border: 2px solid #8b1e1e !important;
-        color: #8b1e1e !important;
-        box-shadow: 0 2px 8px rgba(139,30,30,0.2) !important;
-    }}
-
-    button[kind="secondary"]:not(.theme-toggle-btn):hover {{
-        background: linear-gradient(135deg, #8b1e1e 0%, #ff6b35 100%) !important;
-        color: white !important;
-        border-color: transparent !important;
-    }}
-
-        /* ========================================
-       DARK MODE THEME STYLES - Enhanced Visibility
-       ======================================== */
-    /* Fix dropdown selected option visibility in dark mode */
-    body[data-theme="dark"] .stSelectbox [data-baseweb="select"] > div {{
-        background-color: #1f2937 !important;
-        color: #ffffff !important;
-        border: 2px solid rgba(255,255,255,0.3) !important;
-    }}
-    
-    body[data-theme="dark"] .stSelectbox [data-baseweb="select"] > div:hover {{
-        background-color: #374151 !important;
-        border-color: rgba(255,255,255,0.5) !important;
-    }}
-
-    body[data-theme="dark"] .stSelectbox [data-baseweb="popover"] {{
-        background-color: #1f2937 !important;
-        border: 2px solid rgba(255,255,255,0.3) !important;
-    }}
-    
-    body[data-theme="dark"] .stSelectbox [data-baseweb="popover"] div {{
-        background-color: #1f2937 !important;
-        color: #ffffff !important;
-    }}
-    
-    body[data-theme="dark"] .stSelectbox [data-baseweb="popover"] div:hover {{
-        background-color: #374151 !important;
-        color: #ffffff !important;
-    }}
-    
-    body[data-theme="dark"] .stSelectbox [data-baseweb="select"] > div:before {{
-        color: #ffffff !important;
-    }}
-    
-    /* FIX: Ensure selected option text is visible */
-    body[data-theme="dark"] .stSelectbox [data-baseweb="select"] span {{
-        color: #ffffff !important;
-    }}
-    
-    /* Consistent text input backgrounds in dark mode */
-    body[data-theme="dark"] .stTextInput input,
-    body[data-theme="dark"] .stTextArea textarea {{
-        background-color: #1f2937 !important;
-        color: #ffffff !important;
-        border: 2px solid rgba(255,255,255,0.3) !important;
-    }}
-
-    body[data-theme="dark"] .stTextInput input:focus,
-    body[data-theme="dark"] .stTextArea textarea:focus {{
-        background-color: #1f2937 !important;
-        border-color: #8b1e1e !important;
-    }}
-    
-    body[data-theme="dark"] .stTextInput input::placeholder,
-    body[data-theme="dark"] .stTextArea textarea::placeholder {{
-        color: rgba(255,255,255,0.6) !important;
-    }}
-    
-    body[data-theme="dark"] .stRadio label {{
-        color: #ffffff !important;
-        font-weight: 500 !important;
-    }}
-    
-    body[data-theme="dark"] .stRadio [data-testid="stMarkdownContainer"] {{
-        color: #ffffff !important;
-    }}
-    body[data-theme="dark"] .stApp {{
-        background: linear-gradient(135deg, #0b0f14 0%, #18181b 50%, #23272f 100%) !important;
-        color: #f8fafc !important;
-    }}
-
-    /* Fix cursor visibility in dark mode for all input fields */
-    body[data-theme="dark"] .stTextInput input,
-    body[data-theme="dark"] .stTextArea textarea,
-    body[data-theme="dark"] .stSelectbox [data-baseweb="select"] > div {{
-        caret-color: #ffffff !important;
-    }}
-    
-    /* Ensure text selection is visible in dark mode */
-    body[data-theme="dark"] ::selection {{
-        background-color: rgba(255, 255, 255, 0.3) !important;
-        color: #ffffff !important;
-    }}
-
-    body[data-theme="dark"] ::-moz-selection {{
-        background-color: rgba(255, 255, 255, 0.3) !important;
-        color: #ffffff !important;
-    }}
-
-    /* Dark mode - Clean headings without blur/shadow */
-    body[data-theme="dark"] h1,
-    body[data-theme="dark"] h2,
-    body[data-theme="dark"] h3,
-    body[data-theme="dark"] h4,
-    body[data-theme="dark"] h5,
-    body[data-theme="dark"] h6 {{
-        color: #f8fafc !important;
-        text-shadow: none !important;
-        filter: none !important;
-        font-weight: 700 !important;
-    }}
-
-    body[data-theme="dark"] .stMarkdown h1,
-    body[data-theme="dark"] .stMarkdown h2,
-    body[data-theme="dark"] .stMarkdown h3 {{
-        color: #f8fafc !important;
-        text-shadow: none !important;
-        filter: none !important;
-    }}
-
-    /* Dark mode - Enhanced text inputs */
-    body[data-theme="dark"] .stTextInput input,
-    body[data-theme="dark"] .stTextArea textarea {{
-        background: #1f2937 !important;
-        color: #ffffff !important;
-        border: 2px solid rgba(255,255,255,0.2) !important;
-        font-weight: 500 !important;
-    }}
-
-    body[data-theme="dark"] .stTextInput input::placeholder,
-    body[data-theme="dark"] .stTextArea textarea::placeholder {{
-        color: rgba(255,255,255,0.5) !important;
-        font-weight: 400 !important;
-    }}
-
-    /* DARK MODE DROPDOWN FIX - CRITICAL */
-    body[data-theme="dark"] .stSelectbox [data-baseweb="select"] > div {{
-        background-color: #1f2937 !important;
-        color: #ffffff !important;
-        border: 2px solid rgba(255,255,255,0.3) !important;
-    }}
-
-    body[data-theme="dark"] .stSelectbox [data-baseweb="select"] > div:hover {{
-        background-color: #374151 !important;
-        border-color: rgba(255,255,255,0.5) !important;
-    }}
-
-    body[data-theme="dark"] .stSelectbox [data-baseweb="popover"] {{
-        background-color: #1f2937 !important;
-        border: 2px solid rgba(255,255,255,0.3) !important;
-    }}
-
-    body[data-theme="dark"] .stSelectbox [data-baseweb="popover"] div {{
-        background-color: #1f2937 !important;
-        color: #ffffff !important;
-    }}
-
-    body[data-theme="dark"] .stSelectbox [data-baseweb="popover"] div:hover {{
-        background-color: #374151 !important;
-        color: #ffffff !important;
-    }}
-
-    body[data-theme="dark"] .stSelectbox [data-baseweb="select"] > div:before {{
-        color: #ffffff !important;
-    }}
-
-    /* NEW: Style for empty ID and submit button */
-    body[data-theme="dark"] .empty-id-text {{
-        color: #ff6b6b !important;
-        background-color: rgba(255, 107, 107, 0.1) !important;
-        padding: 8px 12px !important;
-        border-radius: 4px !important;
-        border: 1px solid rgba(255, 107, 107, 0.3) !important;
-        font-weight: 500 !important;
-    }}
-
-    /* Style submit button to match other buttons */
-    body[data-theme="dark"] .stButton button {{
-        background-color: #8b1e1e !important;
-        color: white !important;
-        border: none !important;
-        padding: 0.5rem 1rem !important;
-        border-radius: 4px !important;
-        font-weight: 600 !important;
-    }}
-
-    body[data-theme="dark"] .stButton button:hover {{
-        background-color: #a52a2a !important;
-        color: white !important;
-    }}
-
-    /* Success message styling */
-    body[data-theme="dark"] .feedback-success {{
-        background-color: rgba(34, 197, 94, 0.1) !important;
-        color: #22c55e !important;
-        padding: 12px !important;
-        border-radius: 4px !important;
-        border: 1px solid rgba(34, 197, 94, 0.3) !important;
-        margin: 10px 0 !important;
-    }}
-
-    /* ========================================
-       LIGHT MODE THEME STYLES - Clean Headings
-       ======================================== */
-    body[data-theme="light"] .stApp {{
-        background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%) !important;
-        color: #1e293b !important;
-    }}
-
-    /* Light mode - Clean headings without blur/shadow
-       Updated: force headings to WHITE in light theme for improved contrast */
-    body[data-theme="light"] .stApp h1,
-    body[data-theme="light"] .stApp h2,
-    body[data-theme="light"] .stApp h3,
-    body[data-theme="light"] .stApp h4,
-    body[data-theme="light"] .stApp h5,
-    body[data-theme="light"] .stApp h6 {{
-        color: #ffffff !important;
-        text-shadow: none !important;
-        filter: none !important;
-        font-weight: 700 !important;
-    }}
-
-    body[data-theme="light"] .stApp .stMarkdown h1,
-    body[data-theme="light"] .stApp .stMarkdown h2,
-    body[data-theme="light"] .stApp .stMarkdown h3 {{
-        color: #ffffff !important;
-        text-shadow: none !important;
-        filter: none !important;
-    }}
-
-    /* Light mode - Enhanced text inputs */
-    body[data-theme="light"] .stTextInput input,
-    body[data-theme="light"] .stTextArea textarea {{
-        background: #ffffff !important;
-        color: #1e293b !important;
-        border: 2px solid #e2e8f0 !important;
-        font-weight: 500 !important;
-    }}
-
-    /* Enhanced section titles with Mu Sigma colors */
-    .section-title-box {{
-        background: linear-gradient(135deg, #8b1e1e 0%, #ff6b35 100%) !important;
-        border-radius: 10px;
-        padding: 1rem 2rem;
-        margin: 0 0 1rem 0 !important;
-        text-align: center;
-        box-shadow: 0 4px 12px rgba(139,30,30,0.3);
-    }}
-
-    .section-title-box h3 {{
-        color:#ffffff!important;
-        margin:0!important;
-        font-weight:700!important;
-        font-size:1.3rem!important;
-        text-shadow: none !important;
-    }}
-
-    /* Enhanced font visibility - NO BLUR */
-    .stApp * {{
-        font-family: 'Inter', sans-serif !important;
-        text-shadow: none !important;
-        filter: none !important;
-    }}
-
-    body[data-theme="dark"] .stApp * {{
-        color: #f8fafc !important;
-    }}
-
-    /* Keep general app text darker in light theme, but headings are explicitly forced white above */
-    body[data-theme="light"] .stApp * {{
-        color: #1e293b !important;
-    }}
-
-    /* Remove any text shadows from all elements */
-    * {{
-        text-shadow: none !important;
-    }}
-
-    /* Ensure clean typography */
-    h1, h2, h3, h4, h5, h6,
-    .stMarkdown h1, .stMarkdown h2, .stMarkdown h3,
-    .stMarkdown h4, .stMarkdown h5, .stMarkdown h6 {{
-        text-shadow: none !important;
-        filter: none !important;
-        -webkit-font-smoothing: antialiased !important;
-        -moz-osx-font-smoothing: grayscale !important;
-    }}
-    </style>
-    """, unsafe_allow_html=True)
+    # Header CSS (Mu Sigma colors, NO GAPS) is a cached static file
+    inject_stylesheet("header.css")
+    # Only the header height varies between pages
+    st.markdown(f"<style>:root {{ --header-height: {header_height}px; }}</style>", unsafe_allow_html=True)
 
     # Build admin href - Direct navigation
     admin_href = "?adminPanelToggled=true" if enable_admin_access else "#"
@@ -894,120 +447,7 @@ def render_header(
     """, unsafe_allow_html=True)
 
     # Add JavaScript for theme switching with persistent session state
-    components.html(f"""
-    <script>
-    (function() {{
-        const doc = window.parent.document;
-        
-        // Function to apply theme and update Streamlit session state
-        function applyTheme(theme) {{
-            // Apply to DOM
-            doc.body.setAttribute('data-theme', theme);
-            localStorage.setItem('appTheme', theme);
-            
-            // Update button states
-            const lightBtn = doc.getElementById('theme-light-btn');
-            const darkBtn = doc.getElementById('theme-dark-btn');
-            
-            if (lightBtn && darkBtn) {{
-                if (theme === 'light') {{
-                    lightBtn.classList.add('active');
-                    darkBtn.classList.remove('active');
-                }} else {{
-                    darkBtn.classList.add('active');
-                    lightBtn.classList.remove('active');
-                }}
-            }}
-            
-            // Send theme to Streamlit session state
-            if (window.parent.Streamlit) {{
-                window.parent.Streamlit.setComponentValue({{
-                    theme: theme,
-                    timestamp: new Date().getTime()
-                }});
-            }}
-        }}
-        
-        // Initialize theme from localStorage or default
-        function initTheme() {{
-            const savedTheme = localStorage.getItem('appTheme') || 'light';
-            applyTheme(savedTheme);
-            
-            // Set up button event listeners
-            const lightBtn = doc.getElementById('theme-light-btn');
-            const darkBtn = doc.getElementById('theme-dark-btn');
-            
-            if (lightBtn) {{
-                lightBtn.onclick = function(e) {{
-                    e.preventDefault();
-                    e.stopPropagation();
-                    applyTheme('light');
-                    return false;
-                }};
-            }}
-            
-            if (darkBtn) {{
-                darkBtn.onclick = function(e) {{
-                    e.preventDefault();
-                    e.stopPropagation();
-                    applyTheme('dark');
-                    return false;
-                }};
-            }}
-        }}
-        
-        // Enhanced initialization with retry logic
-        function tryInit(attempts = 0) {{
-            if (attempts > 15) {{
-                console.log('Theme initialization failed after max attempts');
-                return;
-            }}
-            
-            const lightBtn = doc.getElementById('theme-light-btn');
-            const darkBtn = doc.getElementById('theme-dark-btn');
-            
-            if (lightBtn && darkBtn) {{
-                initTheme();
-                console.log('Theme initialized successfully');
-            }} else {{
-                setTimeout(() => tryInit(attempts + 1), 150);
-            }}
-        }}
-        
-        // Listen for theme changes from other components
-        function setupThemeListener() {{
-            window.addEventListener('storage', function(e) {{
-                if (e.key === 'appTheme') {{
-                    applyTheme(e.newValue);
-                }}
-            }});
-            
-            window.addEventListener('themeChange', function(e) {{
-                if (e.detail && e.detail.theme) {{
-                    applyTheme(e.detail.theme);
-                }}
-            }});
-        }}
-        
-        // Start initialization
-        if (doc.readyState === 'loading') {{
-            doc.addEventListener('DOMContentLoaded', function() {{
-                tryInit();
-                setupThemeListener();
-            }});
-        }} else {{
-            tryInit();
-            setupThemeListener();
-        }}
-        
-        // Force theme application on page load
-        window.addEventListener('load', function() {{
-            const savedTheme = localStorage.getItem('appTheme') || 'light';
-            applyTheme(savedTheme);
-        }});
-    }})();
-    </script>
-    """, height=0)
+    inject_script("theme.js")
 
 def get_shared_data():
     """Get shared data from session state or URL parameters"""
@@ -1254,6 +694,12 @@ def render_unified_business_inputs(page_key_prefix: str = "global", show_titles:
                 not st.session_state.business_problem.strip()):
                 st.error("⚠️ Please select an Account, Industry, and provide a Business Problem description.")
             else:
+                # Decide whether existing results still describe the edited problem
+                note_problem_saved((
+                    st.session_state.business_account,
+                    st.session_state.business_industry,
+                    st.session_state.business_problem,
+                ))
                 st.session_state.saved_account = st.session_state.business_account
                 st.session_state.saved_industry = st.session_state.business_industry
                 st.session_state.saved_problem = st.session_state.business_problem
@@ -1262,6 +708,39 @@ def render_unified_business_inputs(page_key_prefix: str = "global", show_titles:
                 st.success("✅ Problem details saved!")
                 _safe_rerun()
 
+    # Reuse a stored analysis of the saved problem (from any session) instead of re-running the agents
+    restored = rehydrate_analysis(
+        st.session_state.saved_account,
+        st.session_state.saved_industry,
+        st.session_state.saved_problem,
+    )
+    if restored:
+        for agent in restored:
+            if agent in DIMENSION_SESSION_KEYS:
+                record_dimension_scores(agent)
+        st.toast(f"♻️ Loaded a previous analysis of this problem ({len(restored)} agents)")
+
+    # Results produced for an earlier version of the problem (or from upstream outputs that have since changed)
+    dropped = invalidate_stale_outputs()
+    for agent in dropped:
+        if agent in DIMENSION_SESSION_KEYS:
+            reset_dimension_scores(agent)
+    if dropped:
+        names = ", ".join(agent.replace("_", " ").title() for agent in dropped)
+        st.info(f"🔄 The problem details changed, so these results were cleared: {names}. Run those agents again.")
+    if "quick_edit_similarity" in st.session_state:
+        qc1, qc2 = st.columns([4, 1])
+        with qc1:
+            st.caption(
+                f"✏️ Minor wording edit ({st.session_state.quick_edit_similarity:.0%} similar): "
+                "existing results were kept."
+            )
+        with qc2:
+            if st.button("Re-analyse", key=f"{page_key_prefix}_discard_quick_edit",
+                         help="Treat the edit as a new problem and clear the existing results"):
+                discard_quick_edit()
+                _safe_rerun()
+
     return (
         st.session_state.business_account,
         st.session_state.business_industry,
@@ -1361,6 +840,164 @@ def get_all_question_scores():
     
     return all_scores
 
+def record_dimension_scores(dimension):
+    """
+    Parse a finished dimension's Q answers into QuestionScore records and feed the scoring
+    system, replacing the dimension's previous scores. The dimension only counts as completed
+    when at least one answer had a score. Call when the answers land in st.session_state
+    (or are restored).
+    """
+    outputs_key, _ = DIMENSION_SESSION_KEYS[dimension]
+    records = parse_dimension_answers(st.session_state.get(outputs_key))
+    # Start clean so scores from a previous run with more answers do not linger
+    reset_dimension_scores(dimension)
+    scores = {q: r.score for q, r in records.items() if r.score is not None}
+    if scores:
+        mark_agent_completed(dimension, scores)
+
+def reset_dimension_scores(dimension):
+    """Forget a dimension's scores, e.g. when its answers were invalidated."""
+    initialize_scoring_system()
+    st.session_state.agents_completed[dimension] = False
+    st.session_state.agent_scores[dimension] = None
+    st.session_state.pop(f'{dimension}_scores', None)
+
+@fragment
+def _render_feedback_report(total_feedback):
+    """Filters, table and download; changing a filter reruns only this section"""
+    if total_feedback:
+        # Add TWO filter dropdowns
+        st.markdown("#### 🔍 Filter Options")
+        
+        col_filter1, col_filter2 = st.columns(2)
+        
+        with col_filter1:
+            # Agent filter dropdown
+            agent_filter = st.selectbox(
+                "🤖 Select Agent:",
+                options=[
+                    "All Agents",
+                    "Vocabulary Agent",
+                    "Current System Agent",
+                    "Volatility Agent",
+                    "Ambiguity Agent",
+                    "Interconnectedness Agent",
+                    "Uncertainty Agent",
+                    "Hardness Agent"
+                ],
+                key="admin_agent_filter",
+                help="Filter feedback by specific agent"
+            )
+        
+        with col_filter2:
+            # Feedback type filter dropdown
+            feedback_type_filter = st.selectbox(
+                "📋 Select Feedback Type:",
+                options=[
+                    "All Feedback Types",
+                    "I have read it, found it useful, thanks.",
+                    "I have read it, found some definitions to be off.",
+                    "The widget seems interesting, but I have some suggestions on the features."
+                ],
+                key="admin_feedback_type_filter",
+                help="Filter by specific feedback type"
+            )
+
+        # Apply BOTH filters as an indexed store query
+        filtered_df = query_feedback_data(
+            agent=None if agent_filter == "All Agents" else agent_filter,
+            feedback_type=None if feedback_type_filter == "All Feedback Types" else feedback_type_filter,
+        )
+
+        # Show count with filter summary
+        filter_summary = []
+        if agent_filter != "All Agents":
+            filter_summary.append(f"Agent: **{agent_filter}**")
+        if feedback_type_filter != "All Feedback Types":
+            filter_summary.append(f"Type: **{feedback_type_filter[:50]}...**")
+        
+        if filter_summary:
+            st.info(f"📊 Showing **{len(filtered_df)}** of **{total_feedback}** feedback entries | Filters: {' | '.join(filter_summary)}")
+        else:
+            st.info(f"📊 Showing **{len(filtered_df)}** total feedback entries (no filters applied)")
+
+        # Display filtered feedback data table
+        if not filtered_df.empty:
+            st.markdown("#### 📋 Feedback Data")
+            st.dataframe(filtered_df, use_container_width=True, height=400)
+
+            st.markdown("<br>", unsafe_allow_html=True)
+
+            # Download filtered feedback
+            feedback_csv = filtered_df.to_csv(index=False).encode("utf-8")
+            
+            # Create descriptive filename
+            agent_part = agent_filter.replace(' ', '_') if agent_filter != "All Agents" else "AllAgents"
+            type_part = feedback_type_filter.replace(' ', '_').replace('.', '').replace(',', '')[:30] if feedback_type_filter != "All Feedback Types" else "AllTypes"
+            download_filename = f"feedback_{agent_part}_{type_part}_{datetime.now().strftime('%Y%m%d')}.csv"
+
+            col_dl1, col_dl2, col_dl3 = st.columns([1, 2, 1])
+            with col_dl2:
+                st.download_button(
+                    "⬇️ Download Filtered Feedback Report",
+                    feedback_csv,
+                    download_filename,
+                    "text/csv",
+                    use_container_width=True,
+                    type="primary"
+                )
+        else:
+            st.warning(f"⚠️ No feedback found matching your filters.")
+            st.info("💡 Try adjusting the filters to see more results.")
+    else:
+        st.info("📭 No feedback data available yet. Submit feedback from the main page to see it here.")
+
+@fragment
+def _render_api_metrics():
+    """Per-question latency, errors and sizes of reasoning calls made by this server process"""
+    rows = get_call_metrics()
+    if not rows:
+        st.info("📭 No reasoning API calls recorded since the server started.")
+        return
+
+    cache = get_cache_counters()
+    calls = sum(row["calls"] for row in rows)
+    col_m1, col_m2, col_m3, col_m4 = st.columns(4)
+    col_m1.metric("Calls", calls)
+    col_m2.metric("Errors", sum(row["errors"] for row in rows))
+    col_m3.metric("Timeouts", sum(row["timeouts"] for row in rows))
+    col_m4.metric("Cache Hit Rate", f"{cache.get('hit', 0) / calls:.0%}" if calls else "—")
+
+    metrics_df = pd.DataFrame(rows).rename(columns={
+        "agent": "Agent",
+        "question": "Question",
+        "calls": "Calls",
+        "errors": "Errors",
+        "cached": "Cached",
+        "timeouts": "Timeouts",
+        "p50_seconds": "p50 (s)",
+        "p95_seconds": "p95 (s)",
+        "avg_bytes": "Avg Bytes",
+    })
+    st.dataframe(metrics_df.round(2), use_container_width=True, hide_index=True)
+    st.caption("p50/p95 are estimated from histogram buckets and include cache hits.")
+
+    exports = []
+    if METRICS_PORT:
+        exports.append(f"Prometheus endpoint on port **{METRICS_PORT}** (`/metrics`)")
+    if METRICS_LOG_PATH:
+        exports.append(f"call log at `{METRICS_LOG_PATH}`")
+    if exports:
+        st.caption("Also exported: " + ", ".join(exports))
+
+    st.download_button(
+        "⬇️ Download Metrics (Prometheus text)",
+        render_prometheus().encode("utf-8"),
+        f"reasoning_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prom",
+        "text/plain",
+        key="admin_metrics_download",
+    )
+
 def render_admin_panel(admin_password="admin123"):
     """
     Render admin panel with password authentication and feedback download.
@@ -1437,104 +1074,14 @@ def render_admin_panel(admin_password="admin123"):
             # Admin download options
             st.markdown("### 📋 Feedback Report Management")
 
-            # Get combined feedback data from all sources
-            df = get_all_feedback_data()
-
-            if df is not None and not df.empty:
-                # Add TWO filter dropdowns
-                st.markdown("#### 🔍 Filter Options")
-                
-                col_filter1, col_filter2 = st.columns(2)
-                
-                with col_filter1:
-                    # Agent filter dropdown
-                    agent_filter = st.selectbox(
-                        "🤖 Select Agent:",
-                        options=[
-                            "All Agents",
-                            "Vocabulary Agent",
-                            "Current System Agent",
-                            "Volatility Agent",
-                            "Ambiguity Agent",
-                            "Interconnectedness Agent",
-                            "Uncertainty Agent",
-                            "Hardness Agent"
-                        ],
-                        key="admin_agent_filter",
-                        help="Filter feedback by specific agent"
-                    )
-                
-                with col_filter2:
-                    # Feedback type filter dropdown
-                    feedback_type_filter = st.selectbox(
-                        "📋 Select Feedback Type:",
-                        options=[
-                            "All Feedback Types",
-                            "I have read it, found it useful, thanks.",
-                            "I have read it, found some definitions to be off.",
-                            "The widget seems interesting, but I have some suggestions on the features."
-                        ],
-                        key="admin_feedback_type_filter",
-                        help="Filter by specific feedback type"
-                    )
-
-                # Apply BOTH filters
-                filtered_df = df.copy()
-                
-                # Filter by Agent (if Agent column exists)
-                if 'Agent' in df.columns:
-                    if agent_filter != "All Agents":
-                        filtered_df = filtered_df[filtered_df['Agent'] == agent_filter]
-                else:
-                    if agent_filter != "All Agents":
-                        st.warning("⚠️ 'Agent' column not found in feedback data. Showing all agents.")
-                
-                # Filter by Feedback Type
-                if feedback_type_filter != "All Feedback Types":
-                    filtered_df = filtered_df[filtered_df['FeedbackType'] == feedback_type_filter]
-
-                # Show count with filter summary
-                filter_summary = []
-                if agent_filter != "All Agents":
-                    filter_summary.append(f"Agent: **{agent_filter}**")
-                if feedback_type_filter != "All Feedback Types":
-                    filter_summary.append(f"Type: **{feedback_type_filter[:50]}...**")
-                
-                if filter_summary:
-                    st.info(f"📊 Showing **{len(filtered_df)}** of **{len(df)}** feedback entries | Filters: {' | '.join(filter_summary)}")
-                else:
-                    st.info(f"📊 Showing **{len(filtered_df)}** total feedback entries (no filters applied)")
-
-                # Display filtered feedback data table
-                if not filtered_df.empty:
-                    st.markdown("#### 📋 Feedback Data")
-                    st.dataframe(filtered_df, use_container_width=True, height=400)
+            # Count feedback from all sources (indexed COUNT, no full load)
+            total_feedback = count_feedback_data()
 
-                    st.markdown("<br>", unsafe_allow_html=True)
+            _render_feedback_report(total_feedback)
 
-                    # Download filtered feedback
-                    feedback_csv = filtered_df.to_csv(index=False).encode("utf-8")
-                    
-                    # Create descriptive filename
-                    agent_part = agent_filter.replace(' ', '_') if agent_filter != "All Agents" else "AllAgents"
-                    type_part = feedback_type_filter.replace(' ', '_').replace('.', '').replace(',', '')[:30] if feedback_type_filter != "All Feedback Types" else "AllTypes"
-                    download_filename = f"feedback_{agent_part}_{type_part}_{datetime.now().strftime('%Y%m%d')}.csv"
-
-                    col_dl1, col_dl2, col_dl3 = st.columns([1, 2, 1])
-                    with col_dl2:
-                        st.download_button(
-                            "⬇️ Download Filtered Feedback Report",
-                            feedback_csv,
-                            download_filename,
-                            "text/csv",
-                            use_container_width=True,
-                            type="primary"
-                        )
-                else:
-                    st.warning(f"⚠️ No feedback found matching your filters.")
-                    st.info("💡 Try adjusting the filters to see more results.")
-            else:
-                st.info("📭 No feedback data available yet. Submit feedback from the main page to see it here.")
+            st.markdown("---")
+            st.markdown("### 📈 Reasoning API Metrics")
+            _render_api_metrics()
 
         elif password and password != "":
             st.session_state.admin_authenticated = False
@@ -0,0 +1,110 @@
+(function() {
+    const doc = window.parent.document;
+
+    // Function to apply theme and update Streamlit session state
+    function applyTheme(theme) {
+        // Apply to DOM
+        doc.body.setAttribute('data-theme', theme);
+        localStorage.setItem('appTheme', theme);
+
+        // Update button states
+        const lightBtn = doc.getElementById('theme-light-btn');
+        const darkBtn = doc.getElementById('theme-dark-btn');
+
+        if (lightBtn && darkBtn) {
+            if (theme === 'light') {
+                lightBtn.classList.add('active');
+                darkBtn.classList.remove('active');
+            } else {
+                darkBtn.classList.add('active');
+                lightBtn.classList.remove('active');
+            }
+        }
+
+        // Send theme to Streamlit session state
+        if (window.parent.Streamlit) {
+            window.parent.Streamlit.setComponentValue({
+                theme: theme,
+                timestamp: new Date().getTime()
+            });
+        }
+    }
+
+    // Initialize theme from localStorage or default
+    function initTheme() {
+        const savedTheme = localStorage.getItem('appTheme') || 'light';
+        applyTheme(savedTheme);
+
+        // Set up button event listeners
+        const lightBtn = doc.getElementById('theme-light-btn');
+        const darkBtn = doc.getElementById('theme-dark-btn');
+
+        if (lightBtn) {
+            lightBtn.onclick = function(e) {
+                e.preventDefault();
+                e.stopPropagation();
+                applyTheme('light');
+                return false;
+            };
+        }
+
+        if (darkBtn) {
+            darkBtn.onclick = function(e) {
+                e.preventDefault();
+                e.stopPropagation();
+                applyTheme('dark');
+                return false;
+            };
+        }
+    }
+
+    // Enhanced initialization with retry logic
+    function tryInit(attempts = 0) {
+        if (attempts > 15) {
+            console.log('Theme initialization failed after max attempts');
+            return;
+        }
+
+        const lightBtn = doc.getElementById('theme-light-btn');
+        const darkBtn = doc.getElementById('theme-dark-btn');
+
+        if (lightBtn && darkBtn) {
+            initTheme();
+            console.log('Theme initialized successfully');
+        } else {
+            setTimeout(() => tryInit(attempts + 1), 150);
+        }
+    }
+
+    // Listen for theme changes from other components
+    function setupThemeListener() {
+        window.addEventListener('storage', function(e) {
+            if (e.key === 'appTheme') {
+                applyTheme(e.newValue);
+            }
+        });
+
+        window.addEventListener('themeChange', function(e) {
+            if (e.detail && e.detail.theme) {
+                applyTheme(e.detail.theme);
+            }
+        });
+    }
+
+    // Start initialization
+    if (doc.readyState === 'loading') {
+        doc.addEventListener('DOMContentLoaded', function() {
+            tryInit();
+            setupThemeListener();
+        });
+    } else {
+        tryInit();
+        setupThemeListener();
+    }
+
+    // Force theme application on page load
+    window.addEventListener('load', function() {
+        const savedTheme = localStorage.getItem('appTheme') || 'light';
+        applyTheme(savedTheme);
+    });
+})();
@@ -0,0 +1,63 @@
+"""
+Static CSS/JS for the page chrome (header, theme toggle, Welcome page styles).
+
+The files live in static/ and are served by Streamlit's static file server
+(server.enableStaticServing in .streamlit/config.toml) at app/static/<name>.
+Each rerun then only sends a <link>/<script src> tag; the ?v=<content hash> in the
+URL changes whenever a file does, so browsers and any caching proxy in front of the
+app can keep an asset for as long as they like and still never serve a stale one.
+If static serving is switched off, the file contents are inlined as before.
+"""
+import hashlib
+import html
+import os
+from functools import lru_cache
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+# Relative on purpose: resolves under the app's base URL from every page
+STATIC_URL_PREFIX = "app/static"
+
+
+@lru_cache(maxsize=None)
+def _read_asset(name):
+    """(contents, short content hash) of static/<name>, read once per process."""
+    with open(os.path.join(STATIC_DIR, name), encoding="utf-8") as f:
+        contents = f.read()
+    return contents, hashlib.sha256(contents.encode("utf-8")).hexdigest()[:12]
+
+
+def static_serving_enabled():
+    try:
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+def asset_url(name):
+    """Versioned URL of static/<name>."""
+    _, version = _read_asset(name)
+    return f"{STATIC_URL_PREFIX}/{name}?v={version}"
+
+
+def stylesheet_tag(name):
+    """<link> to static/<name>, or an inline <style> when static serving is off."""
+    if static_serving_enabled():
+        return f'<link rel="stylesheet" href="{html.escape(asset_url(name))}">'
+    contents, _ = _read_asset(name)
+    return f"<style>\n{contents}\n</style>"
+
+
+def inject_stylesheet(name):
+    st.markdown(stylesheet_tag(name), unsafe_allow_html=True)
+
+
+def inject_script(name):
+    """Run static/<name> in a zero-height component frame (it reaches the page via window.parent)."""
+    if static_serving_enabled():
+        components.html(f'<script src="{html.escape(asset_url(name))}"></script>', height=0)
+    else:
+        contents, _ = _read_asset(name)
+        components.html(f"<script>\n{contents}\n</script>", height=0)
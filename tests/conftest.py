@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+# The app's modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def mock_reasoning_api(monkeypatch):
+    """
+    start(config) runs a mock reasoning server for the test and returns
+    (MockConfig, url_for(agency_id)). The response cache and retry backoff are
+    switched off so every call reaches the mock straight away.
+    """
+    import api_client
+    import resilience
+    from mock_reasoning_server import MockConfig, start_in_thread
+
+    monkeypatch.setattr(api_client, "RESPONSE_CACHE_ENABLED", False)
+    monkeypatch.setattr(resilience, "BACKOFF_MAX_SECONDS", 0.0)
+    servers = []
+
+    def start(config=None):
+        mock_config = MockConfig.from_dict({"chunk_delay": 0, **(config or {})}, seed=1)
+        server, base_url = start_in_thread(mock_config, "127.0.0.1", 0)
+        servers.append(server)
+        return mock_config, lambda agency_id: f"{base_url}?agency_id={agency_id}&level=1"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
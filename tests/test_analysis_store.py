@@ -0,0 +1,95 @@
+"""
+AnalysisStore: outputs round-trip under the normalised problem key and the current
+PROMPT_VERSION, and are loaded back into a session by rehydrate_analysis.
+"""
+import logging
+import types
+
+import pytest
+
+import analysis_store
+import change_detection
+from analysis_store import AnalysisStore, analysis_key, rehydrate_analysis, store_agent_output
+
+PROBLEM = "Our regional warehouses keep running out of stock during seasonal demand peaks."
+VOLATILITY = {"Q1": "**Score: 4**\n\nDemand swings every quarter."}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AnalysisStore(str(tmp_path / "analyses.sqlite3"))
+
+
+def test_key_ignores_case_and_whitespace():
+    assert analysis_key("Acme", "Retail", PROBLEM) == analysis_key(" acme", "RETAIL ", "  " + PROBLEM.upper())
+    assert analysis_key("Acme", "Retail", PROBLEM) != analysis_key("Globex", "Retail", PROBLEM)
+
+
+def test_round_trip(store):
+    store.save("Acme", "Retail", PROBLEM, "volatility", VOLATILITY, {"Q1": 4})
+    loaded = store.load("acme", "retail", PROBLEM)
+    assert list(loaded) == ["volatility"]
+    assert loaded["volatility"]["output"] == VOLATILITY
+    assert loaded["volatility"]["scores"] == {"Q1": 4}
+
+
+def test_save_replaces_the_previous_output(store):
+    store.save("Acme", "Retail", PROBLEM, "vocabulary", "old")
+    store.save("Acme", "Retail", PROBLEM, "vocabulary", "new")
+    assert store.load("Acme", "Retail", PROBLEM)["vocabulary"]["output"] == "new"
+    assert store.stats() == {"analyses": 1, "outputs": 1, "stale_outputs": 0}
+
+
+def test_outputs_of_another_prompt_version_are_not_loaded(store, monkeypatch):
+    monkeypatch.setattr(analysis_store, "PROMPT_VERSION", "old-prompts")
+    store.save("Acme", "Retail", PROBLEM, "vocabulary", "old prompt answer")
+    monkeypatch.undo()
+    assert store.load("Acme", "Retail", PROBLEM) == {}
+    assert store.load("Acme", "Retail", PROBLEM, prompt_version="old-prompts")["vocabulary"]["output"] \
+        == "old prompt answer"
+    assert store.stats()["stale_outputs"] == 1
+
+
+def test_delete(store):
+    store.save("Acme", "Retail", PROBLEM, "vocabulary", "answer")
+    store.delete("Acme", "Retail", PROBLEM)
+    assert store.load("Acme", "Retail", PROBLEM) == {}
+
+
+def test_incomplete_outputs_are_not_stored(store, monkeypatch):
+    monkeypatch.setattr(analysis_store, "_store", store)
+    store_agent_output("volatility", "Acme", "Retail", PROBLEM, {"Q1": "API Error: 503 - busy"})
+    store_agent_output("vocabulary", "Acme", "Retail", PROBLEM, "")
+    assert store.load("Acme", "Retail", PROBLEM) == {}
+
+
+def test_write_failures_are_logged(monkeypatch, caplog):
+    class BrokenStore:
+        def save(self, *args):
+            raise OSError("disk full")
+
+    monkeypatch.setattr(analysis_store, "_store", BrokenStore())
+    with caplog.at_level(logging.WARNING, logger="analysis_store"):
+        store_agent_output("vocabulary", "Acme", "Retail", PROBLEM, "answer")
+    assert "Analysis store write failed: disk full" in caplog.text
+
+
+class _SessionState(dict):
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+
+def test_rehydrate_loads_stored_outputs_once(store, monkeypatch):
+    state = _SessionState(saved_account="Acme", saved_industry="Retail", saved_problem=PROBLEM)
+    session = types.SimpleNamespace(session_state=state)
+    monkeypatch.setattr(analysis_store, "st", session)
+    monkeypatch.setattr(change_detection, "st", session)
+    monkeypatch.setattr(analysis_store, "_store", store)
+    store.save("Acme", "Retail", PROBLEM, "volatility", VOLATILITY)
+
+    assert rehydrate_analysis("Acme", "Retail", PROBLEM) == ["volatility"]
+    assert state.volatile_outputs == VOLATILITY
+    assert state.show_volatility is True
+    assert change_detection.stale_agents() == []
+    # Already rehydrated for this problem: the session's outputs are left alone
+    assert rehydrate_analysis("Acme", "Retail", PROBLEM) == []
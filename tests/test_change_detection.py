@@ -0,0 +1,108 @@
+"""
+Edit classification and output fingerprints: which problem edits keep the existing
+results, and which outputs go stale when the problem or an upstream output changes.
+"""
+import types
+
+import pytest
+
+import change_detection
+from change_detection import (
+    classify_edit,
+    classify_problem_edit,
+    invalidate_stale_outputs,
+    mark_analysed,
+    note_problem_saved,
+    stale_agents,
+)
+
+PROBLEM = "Our regional warehouses keep running out of stock during seasonal demand peaks."
+
+
+@pytest.mark.parametrize("old, new, kind", [
+    (PROBLEM, PROBLEM, "identical"),
+    (PROBLEM, "  our regional WAREHOUSES keep running out of stock\nduring seasonal demand peaks. ", "identical"),
+    (PROBLEM, PROBLEM.replace(".", "!").replace("warehouses", "warehouses,"), "cosmetic"),
+    (PROBLEM, PROBLEM.replace("warehouses", "warehouse"), "cosmetic"),
+    (PROBLEM, PROBLEM.replace("seasonal", "seasnoal"), "cosmetic"),
+    (PROBLEM, PROBLEM.replace("regional", "central"), "substantive"),
+    (PROBLEM, PROBLEM.replace("stock", "stock and staff"), "substantive"),
+    (PROBLEM, PROBLEM.replace(" regional", ""), "substantive"),
+    (PROBLEM, "Customer churn is rising after the price change.", "substantive"),
+])
+def test_classify_edit(old, new, kind):
+    assert classify_edit(old, new)[0] == kind
+
+
+def test_too_many_typo_fixes_are_substantive():
+    edited = PROBLEM.replace("regional", "regonal").replace("warehouses", "warehuoses") \
+        .replace("seasonal", "seasnal").replace("demand", "demnad")
+    assert classify_edit(PROBLEM, edited)[0] == "substantive"
+
+
+def test_new_account_is_substantive():
+    assert classify_problem_edit(("Acme", "Retail", PROBLEM), ("Globex", "Retail", PROBLEM)) == ("substantive", 0.0)
+    assert classify_problem_edit(("Acme", "Retail", PROBLEM), ("acme ", "retail", PROBLEM))[0] == "identical"
+
+
+class _SessionState(dict):
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+
+@pytest.fixture
+def session(monkeypatch):
+    state = _SessionState(saved_account="Acme", saved_industry="Retail", saved_problem=PROBLEM)
+    monkeypatch.setattr(change_detection, "st", types.SimpleNamespace(session_state=state))
+    return state
+
+
+def _analyse(session, *agents):
+    for agent in agents:
+        outputs_key, show_key = change_detection.AGENT_SESSION_KEYS[agent]
+        session[outputs_key] = f"{agent} output"
+        session[show_key] = True
+    mark_analysed(*agents)
+
+
+def test_fresh_outputs_are_not_stale(session):
+    _analyse(session, "vocabulary", "current_system", "volatility", "ambiguity")
+    assert stale_agents() == []
+
+
+def test_substantive_edit_makes_every_output_stale(session):
+    _analyse(session, "vocabulary", "ambiguity")
+    session.saved_problem = "Customer churn is rising after the price change."
+    assert note_problem_saved(("Acme", "Retail", session.saved_problem)) == "substantive"
+    assert sorted(stale_agents()) == ["ambiguity", "vocabulary"]
+    assert sorted(invalidate_stale_outputs()) == ["ambiguity", "vocabulary"]
+    assert session.vocab_output == ""
+    assert session.show_vocabulary is False
+
+
+def test_cosmetic_edit_keeps_outputs_in_quick_mode(session, monkeypatch):
+    monkeypatch.setattr(change_detection, "QUICK_MODE", True)
+    _analyse(session, "vocabulary")
+    session.saved_problem = PROBLEM.replace("seasonal", "seasnoal")
+    assert note_problem_saved(("Acme", "Retail", session.saved_problem)) == "cosmetic"
+    assert stale_agents() == []
+    assert "quick_edit_similarity" in session
+
+
+def test_discarded_quick_edit_makes_outputs_stale(session, monkeypatch):
+    monkeypatch.setattr(change_detection, "QUICK_MODE", True)
+    _analyse(session, "vocabulary")
+    session.saved_problem = PROBLEM.replace("seasonal", "seasnoal")
+    note_problem_saved(("Acme", "Retail", session.saved_problem))
+    change_detection.discard_quick_edit()
+    assert stale_agents() == ["vocabulary"]
+
+
+def test_changed_upstream_output_invalidates_only_its_consumers(session):
+    _analyse(session, "vocabulary", "current_system", "volatility", "ambiguity")
+    session.vocab_output = "a different vocabulary"
+    mark_analysed("vocabulary")
+    # Ambiguity does not read the vocabulary; the others were built from the old one
+    assert sorted(stale_agents()) == ["current_system", "volatility"]
+    assert invalidate_stale_outputs() == ["current_system", "volatility"]
+    assert session.ambiguity_outputs == "ambiguity output"
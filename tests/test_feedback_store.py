@@ -0,0 +1,125 @@
+"""Feedback storage: concurrent appends, the canonical row schema and the SQLite migration."""
+import csv
+import sqlite3
+import threading
+
+from feedback_store import (
+    FEEDBACK_COLUMNS,
+    CsvFeedbackStore,
+    SqliteFeedbackStore,
+    append_feedback_rows,
+    normalize_feedback_row,
+)
+
+
+def _feedback(i, agent="Volatility"):
+    return {"Timestamp": f"2026-01-01 00:00:{i:02d}", "Employee_id": f"emp{i}", "Feedback": f"note {i}",
+            "FeedbackType": "Positive", "Agent": agent}
+
+
+def _read(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        return reader.fieldnames, list(reader)
+
+
+def test_concurrent_appends_keep_every_row(tmp_path):
+    path = str(tmp_path / "feedback.csv")
+    threads = [
+        threading.Thread(target=append_feedback_rows, args=(path, [_feedback(i)], FEEDBACK_COLUMNS))
+        for i in range(40)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    header, rows = _read(path)
+    assert header == FEEDBACK_COLUMNS
+    assert sorted(row["Employee_id"] for row in rows) == sorted(f"emp{i}" for i in range(40))
+    # One header line plus one line per row: nothing interleaved
+    with open(path, encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 41
+
+
+def test_new_column_widens_the_header(tmp_path):
+    path = str(tmp_path / "feedback.csv")
+    append_feedback_rows(path, [{"Agent": "Vocabulary"}])
+    append_feedback_rows(path, [{"Agent": "Ambiguity", "Account": "Acme"}])
+    header, rows = _read(path)
+    assert header == ["Agent", "Account"]
+    assert rows == [{"Agent": "Vocabulary", "Account": ""}, {"Agent": "Ambiguity", "Account": "Acme"}]
+
+
+def test_append_after_a_missing_trailing_newline(tmp_path):
+    path = tmp_path / "feedback.csv"
+    path.write_text("Agent,Feedback\nVocabulary,first", encoding="utf-8")
+    append_feedback_rows(str(path), [{"Agent": "Volatility", "Feedback": "second"}])
+    _, rows = _read(path)
+    assert [row["Feedback"] for row in rows] == ["first", "second"]
+
+
+def test_legacy_columns_are_mapped():
+    row = normalize_feedback_row({"EmployeeID": "42", "Additional Feedback": "good", "Problem": "p",
+                                  "Agent": "Uncertainty", "Unrelated": "x"})
+    assert list(row) == FEEDBACK_COLUMNS
+    assert (row["Employee_id"], row["Feedback"], row["ProblemStatement"]) == ("42", "good", "p")
+
+
+def test_name_and_email_become_the_employee_id():
+    assert normalize_feedback_row({"Name": "Ada", "Email": "ada@example.com"})["Employee_id"] == "Ada <ada@example.com>"
+    assert normalize_feedback_row({"Email": "ada@example.com"})["Employee_id"] == "ada@example.com"
+
+
+def test_csv_store_rewrites_a_legacy_file_once(tmp_path):
+    path = tmp_path / "feedback.csv"
+    path.write_text("EmployeeID,FeedbackText,Agent\n7,old,Vocabulary\n", encoding="utf-8")
+    store = CsvFeedbackStore(str(path))
+    store.append([_feedback(1)])
+    assert store.columns() == FEEDBACK_COLUMNS
+    assert [row["Employee_id"] for row in store.query()] == ["7", "emp1"]
+    assert store.normalize() == 0
+
+
+def test_sqlite_store_migrates_the_legacy_csv_once(tmp_path):
+    legacy = tmp_path / "feedback.csv"
+    legacy.write_text("EmployeeID,FeedbackText,Agent\n7,old,Vocabulary\n8,older,Volatility\n", encoding="utf-8")
+    db_path = str(tmp_path / "feedback.db")
+    store = SqliteFeedbackStore(db_path, legacy_csv=str(legacy))
+    assert store.count() == 2
+    assert store.columns() == FEEDBACK_COLUMNS
+    assert store.query(agent="Vocabulary") == [{**{c: "" for c in FEEDBACK_COLUMNS},
+                                                "Employee_id": "7", "Feedback": "old", "Agent": "Vocabulary"}]
+
+    # Reopening (e.g. another process) must not import the CSV again
+    assert SqliteFeedbackStore(db_path, legacy_csv=str(legacy)).count() == 2
+
+
+def test_sqlite_store_normalizes_a_legacy_table_once(tmp_path):
+    db_path = str(tmp_path / "feedback.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE feedback (id INTEGER PRIMARY KEY AUTOINCREMENT, "EmployeeID" TEXT, "Agent" TEXT)')
+    conn.execute('INSERT INTO feedback ("EmployeeID", "Agent") VALUES (?, ?)', ("9", "Ambiguity"))
+    conn.commit()
+    conn.close()
+
+    store = SqliteFeedbackStore(db_path)
+    assert store.columns() == FEEDBACK_COLUMNS
+    assert store.query()[0]["Employee_id"] == "9"
+    assert store.normalize() == 0
+
+
+def test_sqlite_store_filters_and_limits(tmp_path):
+    store = SqliteFeedbackStore(str(tmp_path / "feedback.db"))
+    store.append([_feedback(i, agent="Volatility" if i % 2 else "Ambiguity") for i in range(10)])
+    assert store.count(agent="Volatility") == 5
+    assert [row["Employee_id"] for row in store.query(agent="Ambiguity", limit=2)] == ["emp6", "emp8"]
+
+
+def test_sqlite_store_concurrent_appends(tmp_path):
+    store = SqliteFeedbackStore(str(tmp_path / "feedback.db"))
+    threads = [threading.Thread(target=store.append, args=([_feedback(i)],)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store.count() == 20
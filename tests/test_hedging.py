@@ -0,0 +1,79 @@
+"""
+run_hedged: the first successful call wins, the other one is told to stop, and the
+per-user budget caps how many duplicates are sent.
+"""
+import time
+
+from hedging import HedgeBudget, run_hedged
+
+
+def _attempt(durations, events, outcomes=None):
+    """attempt(cancelled, primary) that sleeps for its duration unless cancelled first."""
+    def attempt(cancelled, primary):
+        name = "primary" if primary else "hedge"
+        events[name] = cancelled
+        stopped = cancelled.wait(durations[name])
+        if stopped:
+            return None, f"{name} cancelled"
+        return (outcomes or {}).get(name, (name, None))
+    return attempt
+
+
+def test_fast_primary_is_not_hedged():
+    budget = HedgeBudget(ratio=0, burst=1)
+    events = {}
+    data, error = run_hedged(_attempt({"primary": 0.01, "hedge": 0.01}, events), 0.2, budget)
+    assert (data, error) == ("primary", None)
+    assert "hedge" not in events
+    assert budget.snapshot()["hedges"] == 0
+
+
+def test_hedge_wins_and_primary_is_cancelled():
+    budget = HedgeBudget(ratio=0, burst=1)
+    events = {}
+    started = time.monotonic()
+    data, error = run_hedged(_attempt({"primary": 5, "hedge": 0.01}, events), 0.05, budget)
+    assert (data, error) == ("hedge", None)
+    assert time.monotonic() - started < 1
+    assert events["primary"].is_set()
+    assert not events["hedge"].is_set()
+    assert budget.snapshot() == {"calls": 0, "hedges": 1, "hedge_wins": 1}
+
+
+def test_primary_wins_and_hedge_is_cancelled():
+    budget = HedgeBudget(ratio=0, burst=1)
+    events = {}
+    data, error = run_hedged(_attempt({"primary": 0.1, "hedge": 5}, events), 0.05, budget)
+    assert (data, error) == ("primary", None)
+    assert events["hedge"].is_set()
+    assert budget.snapshot()["hedge_wins"] == 0
+
+
+def test_failed_hedge_does_not_beat_a_successful_primary():
+    budget = HedgeBudget(ratio=0, burst=1)
+    events = {}
+    attempt = _attempt({"primary": 0.15, "hedge": 0.01}, events, {"hedge": (None, "API Error: 503")})
+    assert run_hedged(attempt, 0.05, budget) == ("primary", None)
+
+
+def test_both_failing_returns_the_primary_error():
+    budget = HedgeBudget(ratio=0, burst=1)
+    outcomes = {"primary": (None, "primary failed"), "hedge": (None, "hedge failed")}
+    attempt = _attempt({"primary": 0.1, "hedge": 0.01}, {}, outcomes)
+    assert run_hedged(attempt, 0.05, budget) == (None, "primary failed")
+
+
+def test_no_hedge_without_budget():
+    budget = HedgeBudget(ratio=0, burst=0)
+    events = {}
+    data, error = run_hedged(_attempt({"primary": 0.1, "hedge": 0.01}, events), 0.02, budget)
+    assert (data, error) == ("primary", None)
+    assert "hedge" not in events
+
+
+def test_budget_grows_with_calls():
+    budget = HedgeBudget(ratio=0.1, burst=0)
+    for _ in range(10):
+        budget.note_call()
+    assert budget.try_spend()
+    assert not budget.try_spend()
@@ -0,0 +1,125 @@
+"""
+Background analysis jobs: submission, lookup for the problem on screen, pickup and
+discarding jobs left over from before the problem was edited.
+"""
+import threading
+import time
+import types
+import uuid
+
+import pytest
+
+import jobs
+from jobs import discard_job, find_job, get_job_stats, submit_job, take_finished_job
+
+
+def _wait(job):
+    for _ in range(500):
+        if job.finished:
+            return job
+        time.sleep(0.01)
+    pytest.fail("job did not finish")
+
+
+@pytest.fixture
+def session_id():
+    return uuid.uuid4().hex
+
+
+def test_job_runs_in_the_background(session_id):
+    def analyse(on_progress, on_partial, on_queue):
+        on_progress(1, 2)
+        on_partial("Q1", "partial text")
+        on_queue("Q2", 3)
+        return {"Q1": "answer"}
+
+    job = _wait(submit_job(session_id, "hash", "volatility", analyse))
+    assert (job.status, job.result, job.error) == ("done", {"Q1": "answer"}, None)
+    assert job.fraction == 0.5
+    assert job.partials == {"Q1": "partial text"}
+    assert job.queue_positions == {"Q2": 3}
+
+
+def test_failed_job_keeps_the_error(session_id):
+    def analyse(*callbacks):
+        raise RuntimeError("upstream down")
+
+    job = _wait(submit_job(session_id, "hash", "volatility", analyse))
+    assert (job.status, job.error) == ("failed", "upstream down")
+
+
+def test_running_job_is_not_submitted_twice(session_id):
+    release = threading.Event()
+    first = submit_job(session_id, "hash", "ambiguity", lambda *callbacks: release.wait(5))
+    second = submit_job(session_id, "hash", "ambiguity", lambda *callbacks: "second")
+    assert second is first
+    release.set()
+    _wait(first)
+    # Once finished, the same key starts a fresh job
+    assert _wait(submit_job(session_id, "hash", "ambiguity", lambda *callbacks: "again")).result == "again"
+
+
+def test_find_and_discard(session_id):
+    job = _wait(submit_job(session_id, "hash", "uncertainty", lambda *callbacks: "done"))
+    assert find_job(session_id, "uncertainty") is job
+    assert find_job(session_id, "volatility") is None
+    assert find_job(uuid.uuid4().hex, "uncertainty") is None
+    discard_job(job)
+    assert find_job(session_id, "uncertainty") is None
+
+
+def test_find_matches_the_problem_key(session_id):
+    old = _wait(submit_job(session_id, "h1", "vocabulary", lambda *callbacks: "old", problem_key="old problem"))
+    new = _wait(submit_job(session_id, "h2", "vocabulary", lambda *callbacks: "new", problem_key="new problem"))
+    assert find_job(session_id, "vocabulary", "old problem") is old
+    assert find_job(session_id, "vocabulary", "new problem") is new
+    assert find_job(session_id, "vocabulary", "another problem") is None
+
+
+def test_job_stats(session_id):
+    before = get_job_stats()["done"]
+    job = _wait(submit_job(session_id, "hash", "hardness_summary", lambda *callbacks: "done"))
+    assert get_job_stats()["done"] == before + 1
+    discard_job(job)
+
+
+class _SessionState(dict):
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+
+@pytest.fixture
+def session(monkeypatch, session_id):
+    state = _SessionState(analysis_session_id=session_id, business_account="Acme", business_industry="Retail",
+                          business_problem="Stock runs out during seasonal peaks.")
+    monkeypatch.setattr(jobs, "st", types.SimpleNamespace(session_state=state))
+    return state
+
+
+def test_take_finished_job_picks_up_the_result_once(session):
+    job = _wait(jobs.submit_agent_job("volatility", "problem", {}, lambda *callbacks: "answer"))
+    assert take_finished_job("volatility") is job
+    assert take_finished_job("volatility") is None
+
+
+def test_running_job_is_not_taken(session):
+    release = threading.Event()
+    job = jobs.submit_agent_job("volatility", "problem", {}, lambda *callbacks: release.wait(5))
+    assert take_finished_job("volatility") is None
+    release.set()
+    _wait(job)
+    assert take_finished_job("volatility") is job
+
+
+def test_job_for_an_edited_problem_is_discarded(session):
+    job = _wait(jobs.submit_agent_job("volatility", "problem", {}, lambda *callbacks: "old answer"))
+    session.business_problem = "Customer churn is rising after the price change."
+    assert take_finished_job("volatility") is None
+    assert find_job(session.analysis_session_id, "volatility") is None
+    assert job.result == "old answer"
+
+
+def test_whitespace_and_case_edits_keep_the_job(session):
+    job = _wait(jobs.submit_agent_job("volatility", "problem", {}, lambda *callbacks: "answer"))
+    session.business_problem = "  stock runs out during SEASONAL peaks. "
+    assert take_finished_job("volatility") is job
@@ -0,0 +1,84 @@
+"""Histogram quantiles, the Prometheus text export and the per-question admin summary."""
+import pytest
+
+import api_client
+import metrics
+from metrics import Histogram, get_cache_counters, get_call_metrics, increment, observe, render_prometheus
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset_metrics()
+    yield
+    metrics.reset_metrics()
+
+
+def test_quantile_interpolates_inside_the_bucket():
+    histogram = Histogram((1, 2, 5))
+    for value in (0.5, 1.5, 1.5, 3):
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == pytest.approx(1.5)
+    assert histogram.quantile(0.25) == pytest.approx(1.0)
+    assert histogram.quantile(1.0) == pytest.approx(5.0)
+
+
+def test_quantile_of_values_past_the_last_bucket():
+    histogram = Histogram((1, 2))
+    histogram.observe(10)
+    assert histogram.quantile(0.95) == 2
+    assert Histogram((1, 2)).quantile(0.5) is None
+
+
+def test_prometheus_counter_and_labels():
+    increment("reasoning_cache_total", result="hit")
+    increment("reasoning_cache_total", 2, result="hit")
+    increment("reasoning_responses_total", agent="vocabulary", question='say "hi"\n', status=200)
+    text = render_prometheus()
+    assert "# TYPE reasoning_cache_total counter" in text
+    assert 'reasoning_cache_total{result="hit"} 3' in text
+    assert 'reasoning_responses_total{agent="vocabulary",question="say \\"hi\\"\\n",status="200"} 1' in text
+
+
+def test_prometheus_histogram_is_cumulative():
+    for value in (0.5, 1.5, 30):
+        observe("reasoning_call_seconds", value, buckets=(1, 2), agent="a", question="q", outcome="ok")
+    lines = render_prometheus().splitlines()
+    assert "# TYPE reasoning_call_seconds histogram" in lines
+    labels = 'agent="a",outcome="ok",question="q"'
+    assert f'reasoning_call_seconds_bucket{{{labels},le="1"}} 1' in lines
+    assert f'reasoning_call_seconds_bucket{{{labels},le="2"}} 2' in lines
+    assert f'reasoning_call_seconds_bucket{{{labels},le="+Inf"}} 3' in lines
+    assert f"reasoning_call_seconds_sum{{{labels}}} 32.0" in lines
+    assert f"reasoning_call_seconds_count{{{labels}}} 3" in lines
+
+
+def test_fractional_bucket_bounds_keep_their_decimals():
+    observe("reasoning_attempt_seconds", 0.2, agent="a", question="q")
+    text = render_prometheus()
+    assert 'le="0.25"} 1' in text
+    assert 'le="1"} 1' in text
+
+
+def test_call_summary_per_question():
+    for seconds, outcome in ((0.4, "ok"), (0.4, "ok"), (0.1, "cached"), (50, "error")):
+        observe("reasoning_call_seconds", seconds, agent="volatility", question="Q1", outcome=outcome)
+    increment("reasoning_responses_total", agent="volatility", question="Q1", status="read_timeout")
+    observe("reasoning_response_bytes", 1000, buckets=metrics.BYTES_BUCKETS, agent="volatility", question="Q1")
+    observe("reasoning_response_bytes", 3000, buckets=metrics.BYTES_BUCKETS, agent="volatility", question="Q1")
+    [row] = get_call_metrics()
+    assert (row["agent"], row["question"]) == ("volatility", "Q1")
+    assert (row["calls"], row["errors"], row["cached"], row["timeouts"]) == (4, 1, 1, 1)
+    assert row["avg_bytes"] == 2000
+    assert 0.25 <= row["p50_seconds"] <= 0.5
+    assert row["p95_seconds"] > 45
+
+
+def test_calls_to_the_mock_server_are_recorded(mock_reasoning_api):
+    config, url_for = mock_reasoning_api({"agencies": {"metered-400": {"error_rate": 1.0, "error_statuses": [400]}}})
+    assert api_client.fetch_agency_result(url_for("metered"), "prompt")[1] is None
+    assert api_client.fetch_agency_result(url_for("metered-400"), "prompt")[1].startswith("API Error: 400")
+    text = render_prometheus()
+    assert 'reasoning_responses_total{agent="unknown",question="metered",status="200"} 1' in text
+    assert 'reasoning_responses_total{agent="unknown",question="metered-400",status="400"} 1' in text
+    assert 'reasoning_call_seconds_count{agent="unknown",outcome="error",question="metered-400"} 1' in text
+    assert get_cache_counters() == {"miss": 2}
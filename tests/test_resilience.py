@@ -0,0 +1,106 @@
+"""
+Circuit breaker states and the retry policy of reasoning calls, the latter against
+the mock reasoning server.
+"""
+import time
+
+import pytest
+
+import api_client
+from resilience import MAX_RETRIES, CircuitBreaker, CircuitOpenError, get_circuit_breaker
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("agency", failure_threshold=3, open_seconds=60)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker("agency", failure_threshold=2, open_seconds=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_allows_one_trial():
+    breaker = CircuitBreaker("agency", failure_threshold=1, open_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_failed_trial_reopens_the_circuit():
+    breaker = CircuitBreaker("agency", failure_threshold=1, open_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_rate_limited_trial_does_not_count_as_a_failure():
+    breaker = CircuitBreaker("agency", failure_threshold=1, open_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_failure(unhealthy=False)
+    assert breaker.state == "open"
+    assert breaker.snapshot()["failures"] == 1
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_retryable_statuses_are_sent_again(mock_reasoning_api, status):
+    agency = f"retry-{status}"
+    config, url_for = mock_reasoning_api({"agencies": {agency: {"error_rate": 1.0, "error_statuses": [status]}}})
+    result, error = api_client.fetch_agency_result(url_for(agency), "prompt")
+    assert result is None
+    assert error.startswith(f"API Error: {status}")
+    assert config.stats()[agency]["requests"] == MAX_RETRIES + 1
+
+
+def test_other_statuses_are_not_retried(mock_reasoning_api):
+    config, url_for = mock_reasoning_api({"agencies": {"bad-request": {"error_rate": 1.0, "error_statuses": [400]}}})
+    result, error = api_client.fetch_agency_result(url_for("bad-request"), "prompt")
+    assert error.startswith("API Error: 400")
+    assert config.stats()["bad-request"]["requests"] == 1
+
+
+def test_read_timeout_is_not_retried(mock_reasoning_api, monkeypatch):
+    config, url_for = mock_reasoning_api({"agencies": {"slow": {"latency": "fixed:0.5"}}})
+    post = api_client.post_agency_goal
+    monkeypatch.setattr(
+        api_client, "post_agency_goal",
+        lambda url, prompt, auth_token="": post(url, prompt, auth_token, timeout=(1, 0.1)),
+    )
+    result, error = api_client.fetch_agency_result(url_for("slow"), "prompt")
+    assert result is None
+    assert "Read timed out" in error
+    time.sleep(0.5)
+    assert config.stats()["slow"]["requests"] == 1
+    # The timeout still counts against the agency's health
+    assert get_circuit_breaker(url_for("slow")).snapshot()["consecutive_failures"] == 1
+
+
+def test_retry_recovers_from_a_transient_error(mock_reasoning_api):
+    config, url_for = mock_reasoning_api({"agencies": {"flaky": {"error_rate": 0.5, "error_statuses": [503]}}})
+    result, error = api_client.fetch_agency_result(url_for("flaky"), "prompt")
+    assert error is None
+    assert "Score" in str(result)
@@ -0,0 +1,67 @@
+"""ResponseCache: hits, TTL expiry and least-recently-used eviction past the size budget."""
+import json
+import time
+
+from response_cache import ResponseCache, cache_key
+
+
+def _entry_size(value):
+    return len(json.dumps(value).encode("utf-8"))
+
+
+def test_key_covers_url_prompt_and_tenant():
+    key = cache_key("url", "prompt", "tenant")
+    assert key == cache_key("url", "prompt", "tenant")
+    assert key != cache_key("url", "prompt!", "tenant")
+    assert key != cache_key("url", "prompt", "other")
+    # Parts are separated, so moving text between them changes the key
+    assert cache_key("ab", "c", "t") != cache_key("a", "bc", "t")
+
+
+def test_round_trip(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=60, max_bytes=10_000)
+    assert cache.get("k") is None
+    cache.put("k", {"result": "**Score: 3**"})
+    assert cache.get("k") == {"result": "**Score: 3**"}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_entries_expire_after_the_ttl(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=0.05, max_bytes=10_000)
+    cache.put("k", {"result": "old"})
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    stats = cache.stats()
+    assert stats["expired"] == 1
+    assert stats["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    value = {"result": "x" * 100}
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=60, max_bytes=_entry_size(value) * 2)
+    cache.put("a", value)
+    time.sleep(0.01)
+    cache.put("b", value)
+    time.sleep(0.01)
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("a") == value
+    time.sleep(0.01)
+    cache.put("c", value)
+    assert cache.get("b") is None
+    assert cache.get("a") == value
+    assert cache.get("c") == value
+    assert cache.stats()["evictions"] == 1
+
+
+def test_oversized_entries_are_not_stored(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=60, max_bytes=10)
+    cache.put("k", {"result": "far too long for the budget"})
+    assert cache.get("k") is None
+    assert cache.stats()["stores"] == 0
+
+
+def test_entries_survive_a_new_cache_object(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    ResponseCache(path, ttl_seconds=60, max_bytes=10_000).put("k", ["answer"])
+    assert ResponseCache(path, ttl_seconds=60, max_bytes=10_000).get("k") == ["answer"]
@@ -0,0 +1,46 @@
+"""
+Single-flight coalescing: identical reasoning calls in flight at the same time share
+one upstream request to the mock reasoning server.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import api_client
+
+
+def _fetch_all(url, prompts):
+    with ThreadPoolExecutor(max_workers=len(prompts)) as executor:
+        return list(executor.map(lambda prompt: api_client.fetch_agency_result(url, prompt), prompts))
+
+
+def test_identical_calls_share_one_request(mock_reasoning_api):
+    config, url_for = mock_reasoning_api({"agencies": {"coalesce": {"latency": "fixed:0.3"}}})
+    coalesced = api_client.get_pool_stats()["coalesced"]
+    outcomes = _fetch_all(url_for("coalesce"), ["same prompt"] * 5)
+    assert config.stats()["coalesce"]["requests"] == 1
+    assert all(error is None for _, error in outcomes)
+    assert len({str(result) for result, _ in outcomes}) == 1
+    assert api_client.get_pool_stats()["coalesced"] - coalesced == 4
+
+
+def test_different_prompts_are_sent_separately(mock_reasoning_api):
+    config, url_for = mock_reasoning_api({"agencies": {"separate": {"latency": "fixed:0.2"}}})
+    outcomes = _fetch_all(url_for("separate"), ["first", "second", "third"])
+    assert config.stats()["separate"]["requests"] == 3
+    assert all(error is None for _, error in outcomes)
+
+
+def test_followers_share_the_leaders_error(mock_reasoning_api):
+    config, url_for = mock_reasoning_api({
+        "agencies": {"failing": {"latency": "fixed:0.2", "error_rate": 1.0, "error_statuses": [400]}},
+    })
+    outcomes = _fetch_all(url_for("failing"), ["same prompt"] * 3)
+    assert config.stats()["failing"]["requests"] == 1
+    assert all(result is None and error.startswith("API Error: 400") for result, error in outcomes)
+
+
+def test_later_calls_send_a_new_request(mock_reasoning_api):
+    # Coalescing only joins calls already in flight; with the cache off a later call goes upstream
+    config, url_for = mock_reasoning_api()
+    api_client.fetch_agency_result(url_for("sequential"), "prompt")
+    api_client.fetch_agency_result(url_for("sequential"), "prompt")
+    assert config.stats()["sequential"]["requests"] == 2
@@ -0,0 +1,64 @@
+"""
+Golden-output checks for text_utils. The fixture holds reasoning API answers with the
+sanitized text, formatted answer card and scores the pre-precompilation helpers produced
+for them; the current helpers must reproduce them exactly.
+"""
+import json
+import os
+
+import pytest
+
+from text_utils import (
+    format_dimension_answer,
+    json_to_text,
+    parse_hardness_summary,
+    parse_question_answer,
+    postprocess_response,
+    sanitize_text,
+)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "golden_outputs.json")
+
+with open(FIXTURE, encoding="utf-8") as f:
+    GOLDEN = json.load(f)
+
+CASES = GOLDEN["cases"]
+
+
+def _ids(cases):
+    return [case["id"] for case in cases]
+
+
+@pytest.mark.parametrize("case", CASES, ids=_ids(CASES))
+def test_sanitized_text(case):
+    raw = json_to_text(case["data"])
+    assert sanitize_text(raw) == case["sanitized"]
+    assert sanitize_text(raw, strip_rules=True) == case["sanitized_strip_rules"]
+    assert postprocess_response(case["data"]) == case["sanitized"]
+
+
+@pytest.mark.parametrize("case", CASES, ids=_ids(CASES))
+def test_sanitize_is_stable_across_calls(case):
+    # Results are memoised; a cached answer must not differ from the first one
+    raw = json_to_text(case["data"])
+    assert sanitize_text(raw) == sanitize_text(raw)
+
+
+DIMENSION_CASES = [case for case in CASES if case["kind"] == "dimension"]
+
+
+@pytest.mark.parametrize("case", DIMENSION_CASES, ids=_ids(DIMENSION_CASES))
+def test_dimension_answer(case):
+    formatted = format_dimension_answer(case["sanitized"], GOLDEN["account"], GOLDEN["industry"])
+    assert formatted == case["formatted"]
+    assert parse_question_answer(case["question"], case["sanitized"]).score == case["score"]
+
+
+HARDNESS_CASES = [case for case in CASES if case["kind"] == "hardness"]
+
+
+@pytest.mark.parametrize("case", HARDNESS_CASES, ids=_ids(HARDNESS_CASES))
+def test_hardness_summary(case):
+    assessment = parse_hardness_summary(case["sanitized"])
+    assert assessment.score == case["score"]
+    assert assessment.classification == case["classification"]
@@ -0,0 +1,102 @@
+"""
+EndpointGovernor: first-come, first-served queueing, queue timeouts and the
+queue-position callbacks reported to waiting callers.
+"""
+import threading
+import time
+
+import pytest
+
+from throttle import EndpointGovernor, QueueTimeout, TokenBucket
+
+
+def _queue_behind(governor, names, order, positions):
+    """Start one waiting caller per name, in order; each holds its slot briefly."""
+    threads = []
+    for name in names:
+        def call(name=name):
+            governor.acquire(lambda position: positions.setdefault(name, []).append(position))
+            order.append(name)
+            time.sleep(0.01)
+            governor.release()
+        thread = threading.Thread(target=call)
+        thread.start()
+        threads.append(thread)
+        # Let each caller take its place in the queue before the next one arrives
+        while len(governor.waiting) < len(threads):
+            time.sleep(0.005)
+    return threads
+
+
+def test_no_limits_means_no_queue():
+    governor = EndpointGovernor("agency", rate_per_second=0, max_in_flight=0)
+    for _ in range(10):
+        governor.acquire(on_queue=lambda position: pytest.fail("should not queue"))
+    assert governor.snapshot()["in_flight"] == 10
+
+
+def test_waiting_callers_go_in_arrival_order():
+    governor = EndpointGovernor("agency", rate_per_second=0, max_in_flight=1)
+    governor.acquire()
+    order, positions = [], {}
+    threads = _queue_behind(governor, "abcd", order, positions)
+    governor.release()
+    for thread in threads:
+        thread.join(5)
+    assert order == list("abcd")
+    assert governor.snapshot()["max_queue_depth"] == 4
+
+
+def test_queue_positions_count_down_to_zero():
+    governor = EndpointGovernor("agency", rate_per_second=0, max_in_flight=1)
+    governor.acquire()
+    order, positions = [], {}
+    threads = _queue_behind(governor, "abc", order, positions)
+    governor.release()
+    for thread in threads:
+        thread.join(5)
+    assert positions == {"a": [1, 0], "b": [2, 1, 0], "c": [3, 2, 1, 0]}
+
+
+def test_callback_may_use_the_governor():
+    # Callbacks run with the lock released, so reading the governor must not deadlock
+    governor = EndpointGovernor("agency", rate_per_second=0, max_in_flight=1)
+    governor.acquire()
+    snapshots = []
+    thread = threading.Thread(target=lambda: governor.acquire(lambda position: snapshots.append(governor.snapshot())))
+    thread.start()
+    while not snapshots:
+        time.sleep(0.005)
+    governor.release()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert snapshots[0]["queued_now"] == 1
+
+
+def test_queue_timeout_gives_up_and_leaves_the_queue():
+    governor = EndpointGovernor("agency", rate_per_second=0, max_in_flight=1)
+    governor.acquire()
+    started = time.monotonic()
+    with pytest.raises(QueueTimeout):
+        governor.acquire(timeout=0.1)
+    assert time.monotonic() - started < 1
+    assert governor.snapshot()["queued_now"] == 0
+    governor.release()
+    governor.acquire(timeout=0.1)
+
+
+def test_token_bucket_spreads_calls_at_the_rate():
+    bucket = TokenBucket(rate_per_second=10, burst=2)
+    assert bucket.try_take() == 0
+    assert bucket.try_take() == 0
+    wait = bucket.try_take()
+    assert 0 < wait <= 0.1
+
+
+def test_rate_limited_callers_wait_for_tokens():
+    governor = EndpointGovernor("agency", rate_per_second=20, burst=1, max_in_flight=0)
+    started = time.monotonic()
+    for _ in range(3):
+        governor.acquire()
+    # The first call uses the burst token, the next two wait ~50ms each
+    assert time.monotonic() - started >= 0.09
@@ -0,0 +1,334 @@
+"""
+Response text and score helpers shared by the agent pages, the full-analysis
+pipeline and the batch CLI. Patterns are compiled once at import.
+"""
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+# ================================
+# 🧹 Response Text
+# ================================
+
+def json_to_text(data):
+    """Extract text from JSON response"""
+    if data is None:
+        return ""
+    if isinstance(data, str):
+        return data
+    if isinstance(data, dict):
+        for key in ("result", "output", "content", "text", "answer", "response"):
+            if key in data and data[key]:
+                return json_to_text(data[key])
+        if "data" in data:
+            return json_to_text(data["data"])
+        # Try to extract any string values
+        for value in data.values():
+            if isinstance(value, str) and len(value) > 10:
+                return value
+        return "\n".join(f"{k}: {json_to_text(v)}" for k, v in data.items() if v)
+    if isinstance(data, list):
+        return "\n".join(json_to_text(x) for x in data if x)
+    return str(data)
+
+
+# Patterns are compiled once at import, and a pass is skipped when the text cannot match
+# it (no "*", no "<", ...). Results are memoised: pages re-sanitise the same stored
+# answers on every Streamlit rerun.
+_STRAY_S_START = re.compile(r'^\s*s\s+')
+_STRAY_S_LINE = re.compile(r'\n\s*s\s+')
+_RULE_LINE = re.compile(r'^---\s*$', re.MULTILINE)
+_ANSWER_EXPLANATION = re.compile(r'Q\d+\s*Answer\s*Explanation\s*:', re.IGNORECASE)
+_BOLD = re.compile(r'\*\*(.*?)\*\*')
+_ITALIC = re.compile(r'\*(.*?)\*')
+_CODE = re.compile(r'`(.*?)`')
+_HEADING_MARK = re.compile(r'#+\s*')
+_IMAGE = re.compile(r'!\[.*?\]\(.*?\)')
+_LINK = re.compile(r'\[(.*?)\]\(.*?\)')
+_BULLET = re.compile(r'^\s*[-*]\s+', re.MULTILINE)
+_HTML_TAG = re.compile(r'<\/?[^>]+>')
+_BLANK_LINES = re.compile(r'\n{3,}')
+_SPACE_RUNS = re.compile(r' {2,}')
+
+
+def _collapse_whitespace(text):
+    # Runs of newlines and runs of spaces never overlap, so the order does not matter
+    if "\n\n\n" in text:
+        text = _BLANK_LINES.sub('\n\n', text)
+    if "  " in text:
+        text = _SPACE_RUNS.sub(' ', text)
+    return text
+
+
+@lru_cache(maxsize=512)
+def _sanitize(text, strip_rules):
+    # Fix the "s" character issue
+    text = _STRAY_S_START.sub('', text.strip())
+    text = _STRAY_S_LINE.sub('\n', text)
+
+    if strip_rules and "---" in text:
+        text = _RULE_LINE.sub('', text)
+
+    text = _ANSWER_EXPLANATION.sub('', text)
+    if "*" in text:
+        text = _BOLD.sub(r'\1', text)
+        text = _ITALIC.sub(r'\1', text)
+    if "`" in text:
+        text = _CODE.sub(r'\1', text)
+    if "#" in text:
+        text = _HEADING_MARK.sub('', text)
+    if "](" in text:
+        text = _IMAGE.sub('', text)
+        text = _LINK.sub(r'\1', text)
+    text = _collapse_whitespace(text)
+    if "-" in text or "*" in text:
+        text = _BULLET.sub('• ', text)
+    if "<" in text:
+        text = _HTML_TAG.sub('', text)
+    text = text.replace('& Key Takeaway:', 'Key Takeaway:')
+
+    return text.strip()
+
+
+def sanitize_text(text, strip_rules=False):
+    """Remove markdown artifacts and clean up text (strip_rules also drops --- lines, as on the Current System page)"""
+    if not text:
+        return ""
+    return _sanitize(text, bool(strip_rules))
+
+
+def postprocess_response(data):
+    """Decoded API JSON -> clean display text."""
+    return sanitize_text(json_to_text(data))
+
+
+# ================================
+# 🧾 Dimension Answers
+# ================================
+
+# Shared by the Volatility, Ambiguity, Interconnectedness and Uncertainty pages
+_ANY_TAG = re.compile(r'<[^>]+>')
+_QUESTION_PREFIXES = (
+    (re.compile(r'^(Q\d+\.?\s*)', re.MULTILINE | re.IGNORECASE), ''),
+    (re.compile(r'\n(Q\d+\.?\s*)', re.MULTILINE | re.IGNORECASE), '\n'),
+    (re.compile(r'^(Question\s*\d+\.?\s*)', re.MULTILINE | re.IGNORECASE), ''),
+    (re.compile(r'\n(Question\s*\d+\.?\s*)', re.MULTILINE | re.IGNORECASE), '\n'),
+)
+_ANSWER_LABEL = re.compile(r'^(Answer|Analysis)\s*:\s*', re.MULTILINE | re.IGNORECASE)
+_SCORE_RANGE = re.compile(r'Score\s*\(0[-–]5\)\s*:', re.IGNORECASE)
+_LINE_INDENT = re.compile(r'^\s+', re.MULTILINE)
+_NEWLINE_INDENT = re.compile(r'\n\s+')
+_THE_COMPANY = re.compile(r'\bthe company\b', re.IGNORECASE)
+_THE_INDUSTRY = re.compile(r'\bthe industry\b', re.IGNORECASE)
+_LIST_ITEM = re.compile(r'(?m)^\s*(?:\d+\.|-)\s+(.*)')
+_COLON_BULLET = re.compile(r':\s*•')
+_COLON_BEFORE_BULLET = re.compile(r'(:)\s+(?=•)')
+_INLINE_BULLET = re.compile(r'(?<!\n)\s*•')
+_LABEL = re.compile(r'(^|[\n])\s*(•\s*)?([^:\n]{2,80}):')
+_NEWLINE_RUNS = re.compile(r'\n{2,}')
+
+
+def _bold_label(match):
+    return f"{match.group(1)}{match.group(2) or ''}<strong>{match.group(3).strip()}:</strong>"
+
+
+def clean_dimension_output(text, empty_message="No data available"):
+    """Clean a dimension answer by removing Q1/Q2/Q3 prefixes, HTML tags, and fixing formatting"""
+    if not text:
+        return empty_message
+
+    clean_text = _ANY_TAG.sub('', text) if "<" in text else text
+    if "q" in clean_text or "Q" in clean_text:
+        for pattern, replacement in _QUESTION_PREFIXES:
+            clean_text = pattern.sub(replacement, clean_text)
+    clean_text = _ANSWER_LABEL.sub('', clean_text)
+    clean_text = _SCORE_RANGE.sub('Score:', clean_text)
+    clean_text = _LINE_INDENT.sub('', clean_text)
+    clean_text = _NEWLINE_INDENT.sub('\n', clean_text)
+    clean_text = _collapse_whitespace(clean_text)
+    return clean_text.strip()
+
+
+def format_dimension_answer(text, display_account, display_industry, empty_message="No data available"):
+    """
+    Raw dimension answer -> HTML body for the answer card: cleaned, company/industry
+    names filled in, lists turned into bullets and "Label:" prefixes in bold.
+    """
+    formatted_output = clean_dimension_output(text, empty_message)
+
+    # Replace company/industry names
+    if display_account and display_account != "Unknown Company":
+        formatted_output = _THE_COMPANY.sub(lambda _: display_account, formatted_output)
+    if display_industry and display_industry != "Unknown Industry":
+        formatted_output = _THE_INDUSTRY.sub(lambda _: display_industry, formatted_output)
+
+    # Convert numbered and dash lists to bullets
+    formatted_output = _LIST_ITEM.sub(r'• \1', formatted_output)
+    if "•" in formatted_output:
+        # Ensure bullets always start on a new line (even if inline after colon)
+        formatted_output = _COLON_BULLET.sub(':\n•', formatted_output)
+        # Handle sentences ending with ":" followed by bullet text
+        formatted_output = _COLON_BEFORE_BULLET.sub(r'\1\n', formatted_output)
+        # Add newline before bullets (to separate from paragraphs)
+        formatted_output = _INLINE_BULLET.sub('\n•', formatted_output)
+
+    # Bold text before colon, including bullets
+    formatted_output = _LABEL.sub(_bold_label, formatted_output)
+
+    # Remove extra blank lines, then newlines -> <br>
+    formatted_output = _NEWLINE_RUNS.sub('\n', formatted_output)
+    return formatted_output.replace('\n', '<br>')
+
+
+# ================================
+# 🔢 Score Extraction
+# ================================
+
+_QUESTION_SCORE_PATTERNS = [
+    re.compile(r'Score\s*(?:\(0\s*[-–]\s*5\))?\s*[:\-]?\s*(\d+\.?\d*)', re.IGNORECASE),
+    re.compile(r'(\d+\.?\d*)\s*\/\s*5', re.IGNORECASE),
+    re.compile(r'(\d+\.?\d*)\s*out of\s*5', re.IGNORECASE),
+]
+
+
+def _question_score_match(text):
+    """(score, match) for the first 0-5 score in a dimension answer, or (None, None)."""
+    for pattern in _QUESTION_SCORE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            try:
+                score = float(match.group(1))
+            except ValueError:
+                continue
+            if 0 <= score <= 5:
+                return score, match
+    return None, None
+
+
+# Tried in order; the first 0-5 match wins
+_HARDNESS_SCORE_PATTERNS = [
+    re.compile(r'Overall Difficulty Score\s*[:\-]?\s*(\d+\.?\d*)', re.IGNORECASE),
+    re.compile(r'Score\s*[:\-]?\s*(\d+\.?\d*)', re.IGNORECASE),
+    re.compile(r'(\d+\.?\d*)\s*\/\s*5', re.IGNORECASE),
+    re.compile(r'(\d+\.?\d*)\s*out of\s*5', re.IGNORECASE),
+    re.compile(r'Hardness Level.*?(\d+\.?\d*)', re.IGNORECASE),
+]
+_ANY_NUMBER = re.compile(r'\b(\d+\.?\d*)\b')
+
+
+def extract_hardness_score(text):
+    """Extract the hardness score from the API response"""
+    if not text:
+        return None
+    
+    # Look for score patterns in the Overall Difficulty Score section
+    for pattern in _HARDNESS_SCORE_PATTERNS:
+        matches = pattern.search(text)
+        if matches:
+            try:
+                score = float(matches.group(1))
+                if 0 <= score <= 5:
+                    return score
+            except ValueError:
+                continue
+    
+    # If no specific score found, look for any number between 0-5
+    numbers = _ANY_NUMBER.findall(text)
+    for num in numbers:
+        try:
+            score = float(num)
+            if 0 <= score <= 5:
+                return score
+        except ValueError:
+            continue
+    
+    return None
+
+
+def extract_hardness_classification(text):
+    """Extract hardness classification from text"""
+    if not text:
+        return "UNKNOWN"
+    
+    text_lower = text.lower()
+    
+    if any(word in text_lower for word in ['hard', 'difficult', 'complex', 'challenging', '4.1', '4.2', '4.3', '4.4', '4.5', '4.6', '4.7', '4.8', '4.9', '5.0']):
+        return "HARD"
+    elif any(word in text_lower for word in ['moderate', 'medium', 'average', '3.1', '3.2', '3.3', '3.4', '3.5', '3.6', '3.7', '3.8', '3.9', '4.0']):
+        return "MODERATE"
+    elif any(word in text_lower for word in ['easy', 'simple', 'straightforward', '0.', '1.', '2.', '3.0']):
+        return "NOT HARD"
+    else:
+        # Fallback: use score if available
+        score = extract_hardness_score(text)
+        if score is not None:
+            if score >= 4.0:
+                return "HARD"
+            else:
+                return "NOT HARD"
+        return "UNKNOWN"
+
+
+# ================================
+# 🧮 Structured Scores
+# ================================
+
+class QuestionScore(NamedTuple):
+    """One parsed Q1-Q12 answer."""
+    question: str
+    score: Optional[float]
+    justification: str
+    # (start, end) of the justification in the answer text
+    justification_span: Optional[Tuple[int, int]]
+
+
+class HardnessAssessment(NamedTuple):
+    """Parsed Hardness Summary answer."""
+    score: Optional[float]
+    classification: str
+
+
+_JUSTIFICATION_LABEL = re.compile(r'(?:Justification|Explanation|Rationale|Reasoning)\s*[:\-–]\s*', re.IGNORECASE)
+
+
+def _strip_span(text, start, end):
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+@lru_cache(maxsize=1024)
+def parse_question_answer(question, text):
+    """
+    Parse a dimension answer into a QuestionScore, once per distinct answer.
+    The justification is the labelled Justification/Explanation section when there is one,
+    otherwise the longer side of the answer around the score.
+    """
+    text = text or ""
+    score, match = _question_score_match(text)
+    label = _JUSTIFICATION_LABEL.search(text)
+    if label:
+        start = label.end()
+        end = match.start() if match and match.start() > start else len(text)
+    elif match:
+        before, after = (0, match.start()), (match.end(), len(text))
+        start, end = max(before, after, key=lambda span: len(text[span[0]:span[1]].strip()))
+    else:
+        start, end = 0, len(text)
+    start, end = _strip_span(text, start, end)
+    span = (start, end) if end > start else None
+    return QuestionScore(question, score, text[start:end], span)
+
+
+def parse_dimension_answers(outputs):
+    """{question: QuestionScore} for a dimension's {question: answer text} outputs."""
+    return {question: parse_question_answer(question, answer) for question, answer in (outputs or {}).items()
+            if isinstance(answer, str)}
+
+
+@lru_cache(maxsize=256)
+def parse_hardness_summary(text):
+    """Score and classification of a Hardness Summary answer, once per distinct answer."""
+    return HardnessAssessment(extract_hardness_score(text), extract_hardness_classification(text))
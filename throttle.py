@@ -0,0 +1,220 @@
+"""
+Process-wide rate limiting for the talos-engine reasoning endpoints.
+Each agency_id gets a token bucket (sustained requests per second plus a burst) and a
+cap on requests in flight. Callers over the limit wait in a first-come, first-served
+queue and are told their position while they wait, so a burst of users is spread out
+at the rate the upstream can sustain instead of turning into 429s and timeouts.
+No limit applies until one is configured.
+"""
+import json
+import threading
+import time
+from collections import deque
+
+from resilience import endpoint_name
+from settings import read_setting
+
+# ================================
+# ⚙️ Limit Configuration
+# ================================
+
+# Limits are opt-in: unset or 0 means no limit, so calls are sent as soon as they are made.
+# REASONING_RATE_PER_SECOND: sustained calls per second per agency_id
+# REASONING_RATE_BURST: calls allowed at once above that rate (only used with a rate)
+# REASONING_MAX_IN_FLIGHT: calls per agency_id waiting on the upstream at the same time
+# REASONING_LIMITS: per-agency overrides, see _agency_overrides
+RATE_PER_SECOND = float(read_setting("REASONING_RATE_PER_SECOND", 0))
+RATE_BURST = int(read_setting("REASONING_RATE_BURST", 4))
+MAX_IN_FLIGHT = int(read_setting("REASONING_MAX_IN_FLIGHT", 0))
+# Give up on a queued call after this long; keep it well below the page's patience
+QUEUE_TIMEOUT_SECONDS = float(read_setting("REASONING_QUEUE_TIMEOUT_SECONDS", 30))
+
+
+def _agency_overrides():
+    """
+    Per-agency limits from REASONING_LIMITS, e.g.
+    {"<agency_id>": {"rate_per_second": 1, "burst": 2, "max_in_flight": 4}}
+    (a JSON string in the environment, or a table in secrets.toml).
+    """
+    raw = read_setting("REASONING_LIMITS", {})
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            return {}
+    try:
+        return {str(name): dict(limits) for name, limits in dict(raw).items()}
+    except (TypeError, ValueError):
+        return {}
+
+
+AGENCY_LIMITS = _agency_overrides()
+
+
+class QueueTimeout(Exception):
+    """Raised when a call waited longer than QUEUE_TIMEOUT_SECONDS for its turn."""
+
+
+# ================================
+# 🚦 Endpoint Governor
+# ================================
+
+class TokenBucket:
+    """Classic token bucket; not thread-safe on its own (the governor's lock guards it)."""
+
+    def __init__(self, rate_per_second, burst):
+        self.rate = rate_per_second
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def try_take(self):
+        """Take a token and return 0, or return the seconds until one is available."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class EndpointGovernor:
+    """Token bucket + max-in-flight cap for one agency, with a FIFO queue of waiting callers."""
+
+    def __init__(self, name, rate_per_second=RATE_PER_SECOND, burst=RATE_BURST, max_in_flight=MAX_IN_FLIGHT):
+        self.name = name
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.waiting = deque()
+        self.dispatched = 0
+        self.queued = 0
+        self.max_queue_depth = 0
+        self.queue_wait_seconds = 0.0
+        self._next_ticket = 0
+        self._cond = threading.Condition()
+
+    def _has_capacity(self):
+        return self.max_in_flight <= 0 or self.in_flight < self.max_in_flight
+
+    def acquire(self, on_queue=None, timeout=QUEUE_TIMEOUT_SECONDS):
+        """
+        Wait for this caller's turn, then count it as in flight.
+        on_queue(position) is called whenever the caller's queue position changes
+        (1 = next to go) and with 0 once it is sent; it runs with the governor's lock
+        released, so it may draw to the page.
+        """
+        started = time.monotonic()
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self.waiting.append(ticket)
+            position = None
+            try:
+                while True:
+                    wait = None
+                    if self.waiting[0] == ticket and self._has_capacity():
+                        wait = self.bucket.try_take()
+                        if wait == 0:
+                            break
+                    if position is None:
+                        self.queued += 1
+                        self.max_queue_depth = max(self.max_queue_depth, len(self.waiting))
+                    new_position = self.waiting.index(ticket) + 1
+                    if new_position != position:
+                        position = new_position
+                        if on_queue:
+                            self._cond.release()
+                            try:
+                                on_queue(position)
+                            finally:
+                                self._cond.acquire()
+                            # The queue may have moved while the lock was released
+                            continue
+                    remaining = started + timeout - time.monotonic()
+                    if remaining <= 0:
+                        raise QueueTimeout(
+                            f"API Call Failed: {self.name} is busy; gave up after waiting {int(timeout)}s in the queue"
+                        )
+                    self._cond.wait(min(wait, remaining) if wait else remaining)
+            except BaseException:
+                self.waiting.remove(ticket)
+                self._cond.notify_all()
+                raise
+            self.waiting.popleft()
+            self.in_flight += 1
+            self.dispatched += 1
+            if position is not None:
+                self.queue_wait_seconds += time.monotonic() - started
+            # The next caller may be able to go right away (burst tokens left)
+            self._cond.notify_all()
+        if position is not None and on_queue:
+            try:
+                on_queue(0)
+            except BaseException:
+                self.release()
+                raise
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def slot(self, on_queue=None):
+        """Context manager form of acquire()/release()."""
+        return _GovernorSlot(self, on_queue)
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                "in_flight": self.in_flight,
+                "queued_now": len(self.waiting),
+                "dispatched": self.dispatched,
+                "queued_total": self.queued,
+                "max_queue_depth": self.max_queue_depth,
+                "queue_wait_seconds": self.queue_wait_seconds,
+            }
+
+
+class _GovernorSlot:
+    def __init__(self, governor, on_queue):
+        self.governor = governor
+        self.on_queue = on_queue
+
+    def __enter__(self):
+        self.governor.acquire(self.on_queue)
+        return self.governor
+
+    def __exit__(self, exc_type, exc, tb):
+        self.governor.release()
+        return False
+
+
+_governors = {}
+_governors_lock = threading.Lock()
+
+
+def get_governor(url):
+    """Process-wide governor for the agency behind url (limits from REASONING_LIMITS or the defaults)."""
+    name = endpoint_name(url)
+    with _governors_lock:
+        governor = _governors.get(name)
+        if governor is None:
+            limits = AGENCY_LIMITS.get(name, {})
+            governor = _governors[name] = EndpointGovernor(
+                name,
+                rate_per_second=float(limits.get("rate_per_second", RATE_PER_SECOND)),
+                burst=int(limits.get("burst", RATE_BURST)),
+                max_in_flight=int(limits.get("max_in_flight", MAX_IN_FLIGHT)),
+            )
+    return governor
+
+
+def get_throttle_stats():
+    """In-flight, queue and wait counters per agency_id."""
+    with _governors_lock:
+        governors = list(_governors.values())
+    return {governor.name: governor.snapshot() for governor in governors}